@@ -4,3 +4,23 @@ import hashlib
 def hash_email(email: str) -> str:
     """Hash an email address using SHA-256."""
     return hashlib.sha256(email.encode()).hexdigest()
+
+
+def canonicalize_cif(content: bytes) -> bytes:
+    """Normalize CIF content: unify line endings, strip whitespace, drop blank and comment lines."""
+    lines = (line.strip() for line in content.replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n"))
+    return b"\n".join(line for line in lines if line and not line.startswith(b"#"))
+
+
+def hash_cif(content: bytes) -> str:
+    """Hash the canonicalized content of a CIF file using SHA-256."""
+    return hashlib.sha256(canonicalize_cif(content)).hexdigest()
+
+
+def hash_file(path: str, algorithm: str = "sha256", chunk_size: int = 1024 * 1024) -> str:
+    """Hash the content of a file, reading it in chunks."""
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
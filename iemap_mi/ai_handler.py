@@ -1,7 +1,18 @@
-from typing import Dict, Any
+import asyncio
+import glob
+import os
+import time
+from typing import Dict, Any, Optional, Union, Iterable, List, AsyncIterator, Tuple
 from enum import Enum
 import httpx
 from iemap_mi.settings import settings
+from iemap_mi.utils import build_async_client, static_compatible
+from iemap_mi.cache import PredictionCache
+from iemap_mi.request_layer import RequestLayer
+from iemap_mi.rate_limiter import EndpointClass, TokenBucket
+from iemap_mi.models import PredictionResult, PredictionBatchSummary
+from iemap_mi._utils_hash import hash_cif
+from iemap_mi.cif import CifError, parse_cif, NUMPY_AVAILABLE
 
 
 class PredictionType(Enum):
@@ -25,11 +36,32 @@ class AIHandler:
     aiding in the discovery and design of new battery materials.
 
     Attributes:
-        None
+        client (httpx.AsyncClient): Pooled HTTP client shared with the other handlers.
+        prediction_cache (PredictionCache): Predictions memoized by CIF content hash and prediction type.
     """
 
-    @staticmethod
-    async def get_prediction(cif_file_path: str, prediction_type: PredictionType) -> Dict[str, Any]:
+    def __init__(self, client: Optional[httpx.AsyncClient] = None,
+                 prediction_cache: Optional[PredictionCache] = None,
+                 request_layer: Optional[RequestLayer] = None) -> None:
+        """
+        Initialize AIHandler with the shared HTTP client.
+
+        Args:
+            client (Optional[httpx.AsyncClient]): Pooled HTTP client shared with the other handlers.
+                Defaults to a new client built with the settings defaults.
+            prediction_cache (Optional[PredictionCache]): Cache of predictions.
+                Defaults to an in-process LRU cache.
+            request_layer (Optional[RequestLayer]): Request layer (retries, circuit breaker) shared
+                with the other handlers. Defaults to a new one wrapping ``client``.
+        """
+        self.client = client if client is not None else build_async_client()
+        self.prediction_cache = prediction_cache if prediction_cache is not None else PredictionCache()
+        self.request_layer = request_layer if request_layer is not None else RequestLayer(self.client)
+
+    @static_compatible
+    async def get_prediction(self, cif_file_path: str, prediction_type: PredictionType,
+                             use_cache: bool = True, verbose: bool = True,
+                             validate: bool = False, retry: bool = True) -> Dict[str, Any]:
         """
         The geoCGNN model predicts material properties, such as formation energy and redox potential,
         based on crystal structures provided in .cif format. It has been inspired by the research
@@ -39,11 +71,20 @@ class AIHandler:
         Args:
             cif_file_path (str): Path to the .cif file to upload.
             prediction_type (PredictionType): Type of prediction to request.
+            use_cache (bool): Return a cached prediction for the same structure content
+                (SHA-256 of the canonicalized CIF) and prediction type, if any. Defaults to True.
+            verbose (bool): Print waiting/received messages. Defaults to True.
+            validate (bool): Parse the CIF locally first (see ``iemap_mi.cif.parse_cif``) and
+                reject malformed structures without calling the model. Defaults to False.
+            retry (bool): Let the request layer retry transient failures. Defaults to True
+                (``predict_many`` disables it and retries each item itself).
 
         Returns:
             Dict[str, Any]: JSON response from the geoCGNN model.
 
         Raises:
+            ValueError: If the file is missing or unreadable, or is not a valid structure when ``validate`` is set
+                (``CifError``).
             Exception: If the API request fails or the response status is not 200.
         """
         # Base endpoint from settings
@@ -52,29 +93,250 @@ class AIHandler:
         # Construct the full URL
         url = f"{base_endpoint}ai_materials:predict_what"
 
-        # Use a file handle to read the .cif file
+        # Read the .cif file, its canonicalized content hash keys the prediction cache
         try:
             with open(cif_file_path, "rb") as cif_file:
-                files = {"file": (cif_file_path, cif_file, "application/octet-stream")}
-                data = {"predict_what": prediction_type.value}
+                content = cif_file.read()
+        except FileNotFoundError:
+            raise ValueError(f"The file at {cif_file_path} was not found.")
+        except OSError as e:
+            raise ValueError(f"The file at {cif_file_path} cannot be read: {e.strerror or e}")
+        if validate:
+            parse_cif(content)
+
+        cache_key = PredictionCache.make_key(hash_cif(content), prediction_type.value)
+        if use_cache:
+            cached = self.prediction_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            files = {"file": (cif_file_path, content, "application/octet-stream")}
+            data = {"predict_what": prediction_type.value}
 
-                # Print a waiting message
+            # Print a waiting message
+            if verbose:
                 print("Waiting for inference result from geoCGNN model...")
 
-                # Send the request
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(url, files=files, data=data)
+            # Send the request (inference has no side effects, so it can be retried)
+            response = await self.request_layer.post(url, files=files, data=data, idempotent=True,
+                                                     endpoint_class=EndpointClass.AI, compress=True, retry=retry)
 
-                # Raise HTTP errors if any
-                response.raise_for_status()
+            # Raise HTTP errors if any
+            response.raise_for_status()
 
-                # Return the parsed JSON response
+            # Return the parsed JSON response
+            if verbose:
                 print("Inference result received.")
-                return response.json()
+            prediction = response.json()
 
-        except FileNotFoundError:
-            raise ValueError(f"The file at {cif_file_path} was not found.")
         except httpx.RequestError as e:
-            raise RuntimeError(f"An error occurred while making the request: {str(e)}")
+            raise RuntimeError(f"An error occurred while making the request: {str(e)}") from e
         except httpx.HTTPStatusError as e:
-            raise RuntimeError(f"Error response {e.response.status_code}: {e.response.text}")
+            raise RuntimeError(f"Error response {e.response.status_code}: {e.response.text}") from e
+
+        self.prediction_cache.put(cache_key, prediction)
+        return prediction
+
+    def predict_many(
+            self,
+            paths_or_dir: Union[str, Iterable[str]],
+            prediction_type: PredictionType,
+            concurrency: int = 4,
+            retries: int = 2,
+            retry_delay: float = 1.0,
+            rate_limit: Optional[float] = None,
+            use_cache: bool = True,
+            validate: bool = False,
+            dedupe: bool = False
+    ) -> "PredictionBatch":
+        """
+        Request predictions for many CIF files with bounded concurrency.
+
+        Results are streamed as they complete by iterating the returned batch; the batch
+        summary (throughput and failures) is available once iteration is over.
+
+        Args:
+            paths_or_dir (Union[str, Iterable[str]]): A directory (all ``*.cif`` files are used),
+                a single file path, or an iterable of file paths.
+            prediction_type (PredictionType): Type of prediction to request.
+            concurrency (int): Maximum number of predictions in flight. Defaults to 4.
+            retries (int): Additional attempts for an item whose request failed with a transient
+                error (transport error, 429 or 5xx); other errors are not retried. These replace
+                the retries of the request layer for the batch requests. Defaults to 2.
+            retry_delay (float): Base delay in seconds between attempts, doubled after each retry.
+            rate_limit (Optional[float]): Maximum number of requests started per second across
+                the whole batch. Defaults to None (no limit).
+            use_cache (bool): Use the prediction cache. Defaults to True.
+            validate (bool): Parse every CIF locally before any request; malformed files are
+                reported as failed results (``attempts=0``) without calling the model. Defaults to False.
+            dedupe (bool): Validate, then send one request per distinct structure (same
+                ``CifStructure.fingerprint``): the other files get a copy of its result, with
+                ``duplicate_of`` set. Defaults to False.
+
+        Returns:
+            PredictionBatch: Async iterable of PredictionResult.
+
+        Raises:
+            ImportError: If ``validate`` or ``dedupe`` is set and numpy is not installed.
+
+        Example:
+            >>> batch = client.ai_handler.predict_many("./example_cif", PredictionType.FORMATION_ENERGY)
+            >>> async for result in batch:
+            ...     print(result.path, result.prediction or result.error)
+            >>> print(batch.summary)
+        """
+        if isinstance(paths_or_dir, (str, os.PathLike)):
+            if os.path.isdir(paths_or_dir):
+                paths = sorted(glob.glob(os.path.join(paths_or_dir, "*.cif")))
+            else:
+                paths = [os.fspath(paths_or_dir)]
+        else:
+            paths = [os.fspath(path) for path in paths_or_dir]
+        if (validate or dedupe) and not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required to validate CIF files: pip install numpy")
+        return PredictionBatch(self, paths, prediction_type, concurrency, retries, retry_delay, rate_limit, use_cache,
+                               validate or dedupe, dedupe)
+
+
+def _is_transient(error: RuntimeError) -> bool:
+    # transport errors, 429 and 5xx may succeed later; other error responses (e.g. 400/422
+    # for a structure the model rejects) would fail again
+    cause = error.__cause__
+    if isinstance(cause, httpx.HTTPStatusError):
+        return cause.response.status_code == 429 or cause.response.status_code >= 500
+    return True
+
+
+class PredictionBatch:
+    """
+    Async iterable running a batch of geoCGNN predictions (see ``AIHandler.predict_many``).
+
+    Attributes:
+        paths (List[str]): CIF files of the batch, without repeated paths.
+        summary (Optional[PredictionBatchSummary]): Throughput and failures, set when iteration ends.
+    """
+
+    def __init__(self, handler: AIHandler, paths: List[str], prediction_type: PredictionType, concurrency: int,
+                 retries: int, retry_delay: float, rate_limit: Optional[float], use_cache: bool,
+                 validate: bool = False, dedupe: bool = False) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.handler = handler
+        # a file listed twice is predicted (and counted) once
+        self.paths = list(dict.fromkeys(paths))
+        self.prediction_type = prediction_type
+        self.concurrency = concurrency
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.rate_limit = rate_limit
+        self.use_cache = use_cache
+        self.validate = validate
+        self.dedupe = dedupe
+        self.summary: Optional[PredictionBatchSummary] = None
+        self._bucket = TokenBucket(rate_limit, capacity=1) if rate_limit else None
+
+    async def _predict(self, path: str) -> PredictionResult:
+        attempts = 0
+        while True:
+            attempts += 1
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            try:
+                # the batch retries items itself: a single attempt per request
+                prediction = await self.handler.get_prediction(path, self.prediction_type, use_cache=self.use_cache,
+                                                               verbose=False, retry=False)
+                return PredictionResult(path=path, prediction=prediction, attempts=attempts)
+            except ValueError as e:
+                # missing or unreadable files are not retried
+                return PredictionResult(path=path, error=str(e), attempts=attempts)
+            except RuntimeError as e:
+                if attempts > self.retries or not _is_transient(e):
+                    return PredictionResult(path=path, error=str(e), attempts=attempts)
+                await asyncio.sleep(self.retry_delay * 2 ** (attempts - 1))
+            except Exception as e:
+                # every item must produce a result, or the batch would wait for it forever
+                return PredictionResult(path=path, error=f"{type(e).__name__}: {e}", attempts=attempts)
+
+    def _screen(self) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+        # parse every file locally: returns the rejected files and, for each file to send,
+        # the files holding the same structure (empty lists unless deduplicating)
+        rejected: Dict[str, str] = {}
+        groups: Dict[str, List[str]] = {}
+        representatives: Dict[str, str] = {}
+        for path in self.paths:
+            try:
+                with open(path, "rb") as cif_file:
+                    structure = parse_cif(cif_file.read())
+                key = structure.fingerprint() if self.dedupe else path
+            except FileNotFoundError:
+                rejected[path] = f"The file at {path} was not found."
+                continue
+            except OSError as e:
+                rejected[path] = f"The file at {path} cannot be read: {e.strerror or e}"
+                continue
+            except CifError as e:
+                rejected[path] = f"Invalid CIF: {e}"
+                continue
+            if key in representatives:
+                groups[representatives[key]].append(path)
+            else:
+                representatives[key] = path
+                groups[path] = []
+        return rejected, groups
+
+    async def __aiter__(self) -> AsyncIterator[PredictionResult]:
+        started = time.perf_counter()
+        rejected: Dict[str, str] = {}
+        groups: Dict[str, List[str]] = {path: [] for path in self.paths}
+        if self.validate:
+            # parsing is CPU bound: keep the event loop responsive
+            rejected, groups = await asyncio.to_thread(self._screen)
+        queue: "asyncio.Queue[str]" = asyncio.Queue()
+        for path in groups:
+            queue.put_nowait(path)
+        results: "asyncio.Queue[PredictionResult]" = asyncio.Queue()
+
+        async def worker() -> None:
+            while True:
+                try:
+                    path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await results.put(await self._predict(path))
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(self.concurrency, len(groups)))]
+        failures: Dict[str, str] = {}
+        completed = 0
+        duplicates = 0
+        try:
+            for path, error in rejected.items():
+                completed += 1
+                failures[path] = error
+                yield PredictionResult(path=path, error=error, attempts=0)
+            for _ in range(len(groups)):
+                result = await results.get()
+                copies = [result.model_copy(update={"path": path, "duplicate_of": result.path, "attempts": 0})
+                          for path in groups[result.path]]
+                for item in [result, *copies]:
+                    completed += 1
+                    if item.error is not None:
+                        failures[item.path] = item.error
+                    yield item
+                duplicates += len(copies)
+        finally:
+            for task in workers:
+                task.cancel()
+            # wait for the cancellations, so no prediction outlives an early stop
+            await asyncio.gather(*workers, return_exceptions=True)
+            elapsed = time.perf_counter() - started
+            self.summary = PredictionBatchSummary(
+                total=len(self.paths),
+                succeeded=completed - len(failures),
+                failed=len(failures),
+                elapsed=elapsed,
+                throughput=completed / elapsed if elapsed > 0 else 0.0,
+                failures=failures,
+                rejected=len(rejected),
+                duplicates=duplicates
+            )
@@ -0,0 +1,317 @@
+# iemap_mi/auth.py
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Callable, Iterator
+
+from iemap_mi.settings import settings
+from iemap_mi.request_layer import RequestLayer
+from iemap_mi.rate_limiter import EndpointClass
+
+# advisory file locks serialize the token cache writers of different processes
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+def _jwt_claims(token: str) -> Dict:
+    """Decode the payload of a JWT without verifying its signature (empty if it is not a JWT)."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return {}
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+    except ValueError:
+        return {}
+    return claims if isinstance(claims, dict) else {}
+
+
+def decode_jwt_expiry(token: str) -> Optional[float]:
+    """
+    Read the ``exp`` claim of a JWT, without verifying its signature.
+
+    Args:
+        token (str): Encoded JWT.
+
+    Returns:
+        Optional[float]: Expiry as a Unix timestamp, None if the token is not a JWT or has no expiry.
+    """
+    try:
+        return float(_jwt_claims(token)["exp"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def decode_jwt_subject(token: str) -> Optional[str]:
+    """
+    Read the ``sub`` claim of a JWT, without verifying its signature.
+
+    Args:
+        token (str): Encoded JWT.
+
+    Returns:
+        Optional[str]: Subject (the user the token was issued to), None if the token is not a JWT
+        or has no subject.
+    """
+    subject = _jwt_claims(token).get("sub")
+    return str(subject) if subject is not None else None
+
+
+class TokenFileCache:
+    """
+    JSON file sharing JWT tokens between processes of the same user.
+
+    Tokens are stored per login endpoint and username (hashed), the file is readable by
+    its owner only and replaced atomically, so readers never see a partial file. Writers
+    hold an OS lock on a companion ``.lock`` file during the read-modify-replace, so tokens
+    saved at the same time by different processes are all kept.
+
+    Attributes:
+        path (str): Location of the JSON file.
+    """
+
+    def __init__(self, path: str = settings.TOKEN_CACHE_PATH) -> None:
+        """
+        Args:
+            path (str): Location of the JSON file. Defaults to ``settings.TOKEN_CACHE_PATH``.
+        """
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        # the thread lock covers the threads of this process, the file lock the other processes
+        with self._lock:
+            fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    if FCNTL_AVAILABLE:
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+                    else:
+                        os.lseek(fd, 0, os.SEEK_SET)
+                        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(fd)
+
+    @staticmethod
+    def make_key(username: str, endpoint: str = settings.AUTH_JWT_LOGIN) -> str:
+        """Return the key of a user's token (hashed, so usernames are not stored in clear)."""
+        return hashlib.sha256(f"{endpoint}|{username}".encode()).hexdigest()
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.path, "r") as file:
+                tokens = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return tokens if isinstance(tokens, dict) else {}
+
+    def load(self, key: str) -> Optional[str]:
+        """Return the stored token, None if missing."""
+        return self._read().get(key)
+
+    def _write(self, tokens: Dict[str, str]) -> None:
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", prefix=".tokens-")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(tokens, file)
+            os.chmod(temporary, 0o600)
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def save(self, key: str, token: str) -> None:
+        """Store a token, dropping the expired ones."""
+        with self._locked():
+            now = time.time()
+            tokens = {k: v for k, v in self._read().items() if (decode_jwt_expiry(v) or float("inf")) > now}
+            tokens[key] = token
+            self._write(tokens)
+
+    def clear(self, key: str) -> None:
+        """Remove a stored token."""
+        with self._locked():
+            tokens = self._read()
+            if tokens.pop(key, None) is not None:
+                self._write(tokens)
+
+
+class AuthManager:
+    """
+    Keeps the JWT token valid for every handler sharing a RequestLayer.
+
+    Once attached to the request layer, every request sent with an ``Authorization``
+    header gets the current token. The token is refreshed (by logging in again) when it
+    is about to expire, and a request answered with 401 is replayed once after a refresh.
+    Concurrent refreshes are serialized: parallel requests hitting an expired token wait
+    for a single login. With a TokenFileCache, processes of the same user share the token.
+
+    Attributes:
+        request_layer (RequestLayer): Request layer the manager is attached to.
+        refresh_margin (float): Seconds before expiry at which the token is refreshed.
+        token_cache (Optional[TokenFileCache]): Token store shared across processes.
+        token (Optional[str]): Current JWT token.
+        expires_at (Optional[float]): Expiry of the token (Unix timestamp), None if unknown.
+        logins (int): Number of logins sent to the server.
+
+    Example:
+        >>> auth = AuthManager(request_layer, token_cache=TokenFileCache())
+        >>> await auth.login("user", "password")
+        >>> # requests of long jobs keep working after the token expires
+    """
+
+    def __init__(self, request_layer: RequestLayer, refresh_margin: float = settings.AUTH_REFRESH_MARGIN,
+                 token_cache: Optional[TokenFileCache] = None) -> None:
+        """
+        Create the manager and attach it to the request layer.
+
+        Args:
+            request_layer (RequestLayer): Request layer shared by the handlers.
+            refresh_margin (float): Seconds before expiry at which the token is refreshed.
+                Defaults to ``settings.AUTH_REFRESH_MARGIN``.
+            token_cache (Optional[TokenFileCache]): Token store shared across processes.
+                Defaults to None (tokens are kept in memory only).
+        """
+        self.request_layer = request_layer
+        self.refresh_margin = refresh_margin
+        self.token_cache = token_cache
+        self.token: Optional[str] = None
+        self.expires_at: Optional[float] = None
+        self.logins = 0
+        self._credentials: Optional[Dict[str, str]] = None
+        self._lock = asyncio.Lock()
+        self._listeners: List[Callable[[Optional[str]], None]] = []
+        request_layer.auth = self
+
+    def add_listener(self, listener: Callable[[Optional[str]], None]) -> None:
+        """Register a callable receiving every new token."""
+        self._listeners.append(listener)
+
+    @property
+    def can_refresh(self) -> bool:
+        """Return True if the credentials to log in again are known."""
+        return self._credentials is not None
+
+    def _expiring(self, token: Optional[str]) -> bool:
+        if token is None:
+            return True
+        expires_at = decode_jwt_expiry(token)
+        return expires_at is not None and expires_at - self.refresh_margin <= time.time()
+
+    def _set_token(self, token: Optional[str]) -> None:
+        self.token = token
+        self.expires_at = decode_jwt_expiry(token) if token else None
+        for listener in self._listeners:
+            listener(token)
+
+    async def login(self, username: str, password: str, use_cache: bool = True) -> str:
+        """
+        Log in and keep the credentials to refresh the token later.
+
+        Args:
+            username (str): Username for authentication.
+            password (str): Password for authentication.
+            use_cache (bool): Reuse a valid token of the same user from the token cache,
+                if any, instead of logging in. Defaults to True.
+
+        Returns:
+            str: JWT token.
+
+        Raises:
+            httpx.HTTPStatusError: If the credentials are rejected.
+        """
+        self._credentials = {"username": username, "password": password}
+        async with self._lock:
+            if use_cache:
+                cached = self._cached_token()
+                if cached is not None:
+                    self._set_token(cached)
+                    return cached
+            return await self._login()
+
+    def _cached_token(self) -> Optional[str]:
+        if self.token_cache is None or self._credentials is None:
+            return None
+        token = self.token_cache.load(TokenFileCache.make_key(self._credentials["username"]))
+        return token if token is not None and not self._expiring(token) else None
+
+    async def _login(self) -> str:
+        response = await self.request_layer.post(settings.AUTH_JWT_LOGIN, data=self._credentials, idempotent=True,
+                                                 endpoint_class=EndpointClass.OTHER)
+        response.raise_for_status()
+        token = response.json().get("access_token")
+        self.logins += 1
+        self._set_token(token)
+        if self.token_cache is not None and token:
+            self.token_cache.save(TokenFileCache.make_key(self._credentials["username"]), token)
+        return token
+
+    async def get_token(self) -> Optional[str]:
+        """
+        Return a token valid for at least ``refresh_margin`` seconds, refreshing it if needed.
+
+        Returns:
+            Optional[str]: Current token (None if not authenticated). A token about to expire
+            is returned as is when it cannot be refreshed (credentials unknown).
+        """
+        if self._expiring(self.token) and self.can_refresh:
+            await self.refresh(self.token)
+        return self.token
+
+    async def refresh(self, stale_token: Optional[str]) -> Optional[str]:
+        """
+        Replace a stale token, logging in at most once for concurrent callers.
+
+        Callers pass the token that failed or expired: if another caller already replaced
+        it while waiting, the new token is returned without logging in again. A newer token
+        stored by another process in the token cache is used as well.
+
+        Args:
+            stale_token (Optional[str]): Token to replace.
+
+        Returns:
+            Optional[str]: New token.
+
+        Raises:
+            RuntimeError: If the credentials are unknown (``login`` was never called).
+            httpx.HTTPStatusError: If the login is rejected.
+        """
+        if not self.can_refresh:
+            raise RuntimeError("Cannot refresh the token: not authenticated with username and password")
+        async with self._lock:
+            if self.token != stale_token and not self._expiring(self.token):
+                return self.token
+            cached = self._cached_token()
+            if cached is not None and cached != stale_token:
+                self._set_token(cached)
+                return cached
+            logger.info("Refreshing the IEMAP access token")
+            return await self._login()
+
+    def logout(self) -> None:
+        """Forget the token and the credentials (and remove the token from the token cache)."""
+        if self.token_cache is not None and self._credentials is not None:
+            self.token_cache.clear(TokenFileCache.make_key(self._credentials["username"]))
+        self._credentials = None
+        self._set_token(None)
@@ -0,0 +1,190 @@
+# iemap_mi/benchmark.py
+"""
+Offline benchmark of the client against MockIemapServer.
+
+Run with ``python -m iemap_mi.benchmark`` (see ``--help`` for the options). Each scenario
+reports requests/s, p50/p99 latency of the client calls and the peak RSS of the process;
+the mock server runs in the same process, so RSS includes the synthetic catalog.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+import httpx
+
+from iemap_mi.ai_handler import PredictionType
+from iemap_mi.iemap_mi import IemapMI
+from iemap_mi.mock_server import MockIemapServer
+from iemap_mi.models import RequestEvent
+from iemap_mi.projection import LIST_VIEW
+from iemap_mi.request_layer import RetryPolicy
+
+# resource is not available on Windows: peak RSS is then not reported
+try:
+    import resource
+
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+SCENARIOS = ("paging", "querying", "uploading", "predicting")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Return the peak resident set size of the process in MiB, None if unavailable."""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Return the ``q`` percentile (0-100) of the values, by linear interpolation."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+async def _paging(client: IemapMI, server: MockIemapServer, options: argparse.Namespace, workdir: str) -> int:
+    projects = await client.project_handler.fetch_all_projects(page_size=options.page_size,
+                                                               concurrency=options.concurrency)
+    return len(projects)
+
+
+async def _querying(client: IemapMI, server: MockIemapServer, options: argparse.Namespace, workdir: str) -> int:
+    count = 0
+    projection = LIST_VIEW if options.list_view else None
+    async for _ in client.project_handler.iter_query(window=options.page_size, max_window=options.page_size,
+                                                     concurrency=options.concurrency, projection=projection):
+        count += 1
+    return count
+
+
+async def _uploading(client: IemapMI, server: MockIemapServer, options: argparse.Namespace, workdir: str) -> int:
+    paths = []
+    for index in range(options.files):
+        path = os.path.join(workdir, f"file{index}.dat")
+        with open(path, "wb") as file:
+            file.write(os.urandom(options.file_size))
+        paths.append(path)
+    reports = await client.project_handler.add_files_to_project("benchmark", paths, concurrency=options.concurrency)
+    return sum(report.error is None for report in reports)
+
+
+async def _predicting(client: IemapMI, server: MockIemapServer, options: argparse.Namespace, workdir: str) -> int:
+    for index in range(options.files):
+        with open(os.path.join(workdir, f"structure{index}.cif"), "w") as file:
+            file.write(f"data_benchmark{index}\n_cell_length_a {3 + index * 1e-3:.4f}\n")
+    batch = client.ai_handler.predict_many(workdir, PredictionType.FORMATION_ENERGY,
+                                           concurrency=options.concurrency, use_cache=False)
+    return sum([result.error is None async for result in batch])
+
+
+RUNNERS: Dict[str, Callable[[IemapMI, MockIemapServer, argparse.Namespace, str], Awaitable[int]]] = {
+    "paging": _paging,
+    "querying": _querying,
+    "uploading": _uploading,
+    "predicting": _predicting,
+}
+
+
+async def run_scenario(name: str, options: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run a benchmark scenario against a fresh mock server.
+
+    Args:
+        name (str): One of ``SCENARIOS``.
+        options (argparse.Namespace): Parsed command line options (see ``build_parser``).
+
+    Returns:
+        Dict[str, Any]: Scenario name, items processed, requests, elapsed time, requests/s,
+        p50/p99 latency in milliseconds, retries, bytes sent/received on the wire and peak RSS in MiB.
+    """
+    server = MockIemapServer(n_projects=options.projects, sites=options.sites, latency=options.latency,
+                             jitter=options.jitter, error_rate=options.error_rate, seed=options.seed)
+    events: List[RequestEvent] = []
+    async with httpx.AsyncClient(transport=server.transport()) as http_client:
+        client = IemapMI(client=http_client, retry_policy=RetryPolicy(backoff_base=0.01, backoff_max=0.1),
+                         compression=options.compression)
+        await client.authenticate("benchmark", "benchmark")
+        client.metrics.add_hook(events.append)
+        with tempfile.TemporaryDirectory() as workdir:
+            started = time.perf_counter()
+            items = await RUNNERS[name](client, server, options, workdir)
+            elapsed = time.perf_counter() - started
+
+    durations = [event.duration for event in events]
+    return {
+        "scenario": name,
+        "items": items,
+        "requests": len(events),
+        "bytes_sent": sum(event.bytes_sent for event in events),
+        "bytes_received": sum(event.bytes_received for event in events),
+        "elapsed_s": elapsed,
+        "requests_per_s": len(events) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": (percentile(durations, 50) or 0.0) * 1000,
+        "p99_ms": (percentile(durations, 99) or 0.0) * 1000,
+        "retries": sum(event.attempts - 1 for event in events),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the command line parser of the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the iemap-mi client against a local mock server.")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help=f"Scenarios to run, among {', '.join(SCENARIOS)} (default: all).")
+    parser.add_argument("--projects", type=int, default=5000, help="Projects in the mock catalog.")
+    parser.add_argument("--sites", type=int, default=8, help="Sites per structure (payload size).")
+    parser.add_argument("--page-size", type=int, default=100, help="Page/window size for paging and querying.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent requests.")
+    parser.add_argument("--files", type=int, default=50, help="Files uploaded / structures predicted.")
+    parser.add_argument("--file-size", type=int, default=256 * 1024, help="Size in bytes of each uploaded file.")
+    parser.add_argument("--latency", type=float, default=0.005, help="Server latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.005, help="Maximum extra random latency in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 503 response.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the mock server.")
+    parser.add_argument("--list-view", action="store_true",
+                        help="Query only the list view fields (projection) in the querying scenario.")
+    parser.add_argument("--compression", choices=("gzip", "deflate", "br", "zstd"), default=None,
+                        help="Compress large request bodies (uploads) with this coding.")
+    return parser
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """Format benchmark results as a text table."""
+    header = f"{'scenario':<12}{'items':>8}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}" \
+             f"{'retries':>9}{'sent KiB':>10}{'recv KiB':>10}{'peak RSS MiB':>14}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        rss = f"{result['peak_rss_mb']:.1f}" if result["peak_rss_mb"] is not None else "n/a"
+        lines.append(f"{result['scenario']:<12}{result['items']:>8}{result['requests']:>10}"
+                     f"{result['requests_per_s']:>10.1f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                     f"{result['retries']:>9}{result['bytes_sent'] / 1024:>10.0f}"
+                     f"{result['bytes_received'] / 1024:>10.0f}{rss:>14}")
+    return "\n".join(lines)
+
+
+async def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Run the scenarios selected on the command line and print the results."""
+    parser = build_parser()
+    options = parser.parse_args(argv)
+    unknown = set(options.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    results = [await run_scenario(name, options) for name in options.scenarios or SCENARIOS]
+    print(format_results(results))
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
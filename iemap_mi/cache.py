@@ -0,0 +1,398 @@
+# iemap_mi/cache.py
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Mapping, Callable
+
+from iemap_mi.settings import settings
+from iemap_mi.request_layer import RequestLayer
+from iemap_mi.rate_limiter import EndpointClass
+from iemap_mi.metrics import endpoint_label
+from iemap_mi.auth import decode_jwt_subject
+from iemap_mi.models import RequestEvent
+
+
+class ResponseCache:
+    """
+    Persistent cache for responses of read-only endpoints, backed by SQLite.
+
+    Entries are keyed on (endpoint, normalized params, auth identity), expire after a
+    per-endpoint TTL and are evicted in least-recently-used order once the stored bodies
+    exceed ``max_bytes``. Expired entries carrying an ``ETag`` or ``Last-Modified`` header
+    are revalidated with a conditional request instead of being downloaded again.
+
+    Cache hits do not write to disk: access times are kept in memory and saved with the
+    next store, revalidation or close, so lookups stay cheap on the event loop.
+
+    Attributes:
+        path (str): Location of the SQLite database (``":memory:"`` for a process-local cache).
+        ttls (Dict[str, float]): TTL in seconds for each endpoint URL.
+        default_ttl (float): TTL for endpoints not listed in ``ttls``.
+        max_bytes (int): Maximum total size of the stored response bodies.
+        hits (int): Number of requests served from the cache.
+        misses (int): Number of requests that went to the network.
+        revalidations (int): Number of expired entries confirmed by a 304 response.
+        evictions (int): Number of entries removed to respect ``max_bytes``.
+    """
+
+    def __init__(
+            self,
+            path: str = settings.CACHE_PATH,
+            ttls: Optional[Mapping[str, float]] = None,
+            default_ttl: float = settings.CACHE_DEFAULT_TTL,
+            max_bytes: int = settings.CACHE_MAX_BYTES,
+            clock: Callable[[], float] = time.time
+    ) -> None:
+        """
+        Initialize the cache and create its table if needed.
+
+        Args:
+            path (str): Location of the SQLite database. Defaults to ``settings.CACHE_PATH``.
+            ttls (Optional[Mapping[str, float]]): TTL in seconds for each endpoint URL.
+                Defaults to ``settings.CACHE_TTLS``.
+            default_ttl (float): TTL for endpoints not listed in ``ttls``.
+            max_bytes (int): Maximum total size of the stored response bodies.
+            clock (Callable[[], float]): Returns the current time in seconds. Defaults to ``time.time``.
+        """
+        if path != ":memory:":
+            path = os.path.expanduser(path)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttls: Dict[str, float] = dict(settings.CACHE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.clock = clock
+        self._lock = threading.Lock()
+        # access times of the hits not saved yet, keyed by cache key
+        self._accessed: Dict[str, float] = {}
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " endpoint TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " size INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Mapping[str, Any]] = None, token: Optional[str] = None) -> str:
+        """
+        Build the cache key for a request.
+
+        Params are normalized (``None`` values dropped, keys sorted, values stringified the
+        way httpx encodes them). The caller is identified by the ``sub`` claim of the token, so
+        entries survive token refreshes; tokens without a subject are used as a whole. Either
+        is hashed so it is never stored in clear.
+
+        Args:
+            endpoint (str): Endpoint URL.
+            params (Optional[Mapping[str, Any]]): Query parameters.
+            token (Optional[str]): JWT token identifying the caller.
+
+        Returns:
+            str: SHA-256 hex digest identifying the request.
+        """
+        normalized = sorted(
+            (str(key), str(value).lower() if isinstance(value, bool) else str(value))
+            for key, value in (params or {}).items() if value is not None
+        )
+        identity = None
+        if token:
+            subject = decode_jwt_subject(token)
+            principal = f"sub:{subject}" if subject is not None else f"token:{token}"
+            identity = hashlib.sha256(principal.encode()).hexdigest()
+        raw = json.dumps([endpoint, normalized, identity], separators=(",", ":"))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def ttl_for(self, endpoint: str) -> float:
+        """Return the TTL in seconds configured for an endpoint."""
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored entry for a key (fresh or expired), or None.
+
+        Args:
+            key (str): Cache key built by ``make_key``.
+
+        Returns:
+            Optional[Dict[str, Any]]: Entry with ``body``, ``etag``, ``last_modified``,
+            ``stored_at`` and ``fresh`` keys.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT endpoint, body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = self.clock()
+            self._accessed[key] = now
+        endpoint, body, etag, last_modified, stored_at = row
+        return {
+            "body": bytes(body),
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": stored_at,
+            "fresh": now - stored_at < self.ttl_for(endpoint),
+        }
+
+    def store(self, key: str, endpoint: str, body: bytes, etag: Optional[str] = None,
+              last_modified: Optional[str] = None) -> None:
+        """
+        Store (or replace) a response body and evict LRU entries above ``max_bytes``.
+
+        Args:
+            key (str): Cache key built by ``make_key``.
+            endpoint (str): Endpoint URL, used to select the TTL.
+            body (bytes): Raw response body.
+            etag (Optional[str]): ``ETag`` header of the response.
+            last_modified (Optional[str]): ``Last-Modified`` header of the response.
+        """
+        if len(body) > self.max_bytes:
+            return
+        now = self.clock()
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._save_accessed()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, etag, last_modified, now, now, len(body))
+            )
+            self._evict()
+            self._db.commit()
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as freshly validated (after a 304 response)."""
+        now = self.clock()
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._save_accessed()
+            self._db.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self._db.commit()
+
+    def _save_accessed(self) -> None:
+        # written within the transaction of the caller, committed with it
+        if self._accessed:
+            self._db.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?",
+                                 [(accessed_at, key) for key, accessed_at in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._accessed.clear()
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self) -> None:
+        """Save the pending access times and close the underlying database."""
+        with self._lock:
+            self._save_accessed()
+            self._db.commit()
+            self._db.close()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/revalidation/eviction counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+        }
+
+
+async def cached_get_bytes(
+        request_layer: RequestLayer,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        cache: Optional[ResponseCache] = None,
+        token: Optional[str] = None,
+        endpoint_class: Optional[EndpointClass] = None
+) -> bytes:
+    """
+    GET an endpoint and return the raw JSON body, going through the cache if provided.
+
+    Returning bytes lets callers validate the body directly with ``validate_json``
+    instead of decoding it to Python objects first.
+
+    Args:
+        request_layer (RequestLayer): Request layer used for the request.
+        endpoint (str): Endpoint URL.
+        params (Optional[Dict[str, Any]]): Query parameters.
+        headers (Optional[Dict[str, str]]): Request headers.
+        cache (Optional[ResponseCache]): Response cache. Defaults to None (no caching).
+        token (Optional[str]): JWT token, part of the cache key.
+        endpoint_class (Optional[EndpointClass]): Class of the endpoint, for rate limiting.
+
+    Returns:
+        bytes: Response body.
+    """
+    if cache is None:
+        response = await request_layer.get(endpoint, headers=headers, params=params, endpoint_class=endpoint_class)
+        response.raise_for_status()
+        return response.content
+
+    started = time.perf_counter()
+    key = cache.make_key(endpoint, params, token)
+    entry = cache.lookup(key)
+    if entry is not None and entry["fresh"]:
+        cache.hits += 1
+        request_layer.metrics.record(RequestEvent(
+            method="GET", endpoint=endpoint_label(endpoint),
+            endpoint_class=endpoint_class.value if endpoint_class is not None else None,
+            status=200, cache_hit=True, bytes_received=len(entry["body"]),
+            duration=time.perf_counter() - started))
+        return entry["body"]
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry["etag"]:
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = await request_layer.get(endpoint, headers=request_headers, params=params,
+                                       endpoint_class=endpoint_class)
+    if entry is not None and response.status_code == 304:
+        cache.revalidations += 1
+        cache.hits += 1
+        cache.touch(key)
+        return entry["body"]
+
+    response.raise_for_status()
+    cache.misses += 1
+    cache.store(key, endpoint, response.content, response.headers.get("ETag"),
+                response.headers.get("Last-Modified"))
+    return response.content
+
+
+async def cached_get_json(
+        request_layer: RequestLayer,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        cache: Optional[ResponseCache] = None,
+        token: Optional[str] = None,
+        endpoint_class: Optional[EndpointClass] = None
+) -> Any:
+    """
+    GET an endpoint and return the decoded JSON body (see ``cached_get_bytes``).
+
+    Returns:
+        Any: Decoded JSON body.
+    """
+    return json.loads(await cached_get_bytes(request_layer, endpoint, params=params, headers=headers, cache=cache,
+                                             token=token, endpoint_class=endpoint_class))
+
+
+class PredictionCache:
+    """
+    In-process LRU cache of geoCGNN predictions, optionally backed by a ResponseCache.
+
+    Keys are built from the SHA-256 of the canonicalized CIF content and the prediction
+    type, so the same structure saved in different files is inferred only once. Predictions
+    are copied in and out, so callers may modify the dictionaries they receive.
+
+    Attributes:
+        max_entries (int): Maximum number of predictions kept in memory.
+        store (Optional[ResponseCache]): Persistent backing store. Defaults to None.
+        hits (int): Number of predictions served from the cache.
+        misses (int): Number of predictions not found in the cache.
+    """
+
+    def __init__(self, max_entries: int = settings.PREDICTION_CACHE_MAX_ENTRIES,
+                 store: Optional[ResponseCache] = None) -> None:
+        """
+        Initialize the prediction cache.
+
+        Args:
+            max_entries (int): Maximum number of predictions kept in memory.
+            store (Optional[ResponseCache]): Persistent backing store, entries use the TTL
+                configured for ``settings.AI_GEOCGNN``. Defaults to None.
+        """
+        self.max_entries = max_entries
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def make_key(cif_hash: str, prediction_type: str) -> str:
+        """Build the key for a CIF content hash and a prediction type value."""
+        return f"{prediction_type}:{cif_hash}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached prediction for a key, or None.
+
+        Args:
+            key (str): Key built by ``make_key``.
+
+        Returns:
+            Optional[Dict[str, Any]]: Copy of the cached prediction.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(self._entries[key])
+        if self.store is not None:
+            entry = self.store.lookup(key)
+            if entry is not None and entry["fresh"]:
+                prediction = json.loads(entry["body"])
+                self._remember(key, prediction)
+                self.hits += 1
+                return prediction
+        self.misses += 1
+        return None
+
+    def put(self, key: str, prediction: Dict[str, Any]) -> None:
+        """
+        Cache a prediction.
+
+        Args:
+            key (str): Key built by ``make_key``.
+            prediction (Dict[str, Any]): Prediction returned by the geoCGNN model.
+        """
+        self._remember(key, prediction)
+        if self.store is not None:
+            self.store.store(key, settings.AI_GEOCGNN, json.dumps(prediction).encode())
+
+    def _remember(self, key: str, prediction: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = copy.deepcopy(prediction)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all in-memory entries."""
+        self._entries.clear()
@@ -0,0 +1,499 @@
+# iemap_mi/catalog.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Set, Tuple
+
+from iemap_mi.models import ProjectQueryModel, SyncReport, RejectedRecord
+from iemap_mi.project_handler import ProjectHandler
+from iemap_mi.settings import settings
+from iemap_mi.validation import validate_list
+from iemap_mi.projection import Projection
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(document: Dict[str, Any]) -> str:
+    """Hash a project document (canonical JSON) using SHA-256."""
+    return hashlib.sha256(json.dumps(document, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def _to_number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _split_elements(value: str) -> List[str]:
+    return [element.strip() for element in value.split(",") if element.strip()]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # watermarks are stored as naive UTC datetimes
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def _rejected_id(record: RejectedRecord) -> Optional[str]:
+    iemap_id = record.payload.get("iemap_id") if isinstance(record.payload, dict) else None
+    return iemap_id if isinstance(iemap_id, str) else None
+
+
+def _rejected_updated_at(record: RejectedRecord) -> Optional[datetime]:
+    payload = record.payload if isinstance(record.payload, dict) else {}
+    updated_at = (payload.get("provenance") or {}).get("updatedAt")
+    try:
+        return _naive_utc(datetime.fromisoformat(updated_at)) if isinstance(updated_at, str) else None
+    except ValueError:
+        return None
+
+
+# only the ids are needed to detect deletions
+ID_PROJECTION = Projection("iemap_id")
+
+
+class CatalogStore:
+    """
+    Local SQLite store of project documents, keyed by ``iemap_id``.
+
+    Each document is stored with its content hash and ``updatedAt``; a small key/value
+    table keeps the sync state (e.g. the watermark). Indexed side tables (formula,
+    affiliation, process method and agent, elements, parameter and property names/values)
+    are maintained on every upsert so that ``query`` answers filters locally.
+
+    Attributes:
+        path (str): Location of the SQLite database (``":memory:"`` for a process-local store).
+    """
+
+    def __init__(self, path: str = settings.CATALOG_PATH) -> None:
+        """
+        Open (and create if needed) the store.
+
+        Args:
+            path (str): Location of the SQLite database. Defaults to ``settings.CATALOG_PATH``.
+        """
+        if path != ":memory:":
+            path = os.path.expanduser(path)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS projects ("
+            " iemap_id TEXT PRIMARY KEY,"
+            " content_hash TEXT NOT NULL,"
+            " updated_at TEXT,"
+            " document TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);"
+            "CREATE TABLE IF NOT EXISTS project_index ("
+            " iemap_id TEXT PRIMARY KEY,"
+            " formula TEXT, affiliation TEXT, project_name TEXT, email TEXT,"
+            " method TEXT, agent TEXT, is_experiment INTEGER, updated_at TEXT);"
+            "CREATE TABLE IF NOT EXISTS project_elements (iemap_id TEXT, element TEXT);"
+            "CREATE TABLE IF NOT EXISTS project_parameters (iemap_id TEXT, name TEXT, value TEXT, num_value REAL);"
+            "CREATE TABLE IF NOT EXISTS project_properties (iemap_id TEXT, name TEXT, value TEXT, num_value REAL);"
+            "CREATE INDEX IF NOT EXISTS project_index_formula ON project_index (formula);"
+            "CREATE INDEX IF NOT EXISTS project_index_affiliation ON project_index (affiliation);"
+            "CREATE INDEX IF NOT EXISTS project_index_method ON project_index (method, is_experiment);"
+            "CREATE INDEX IF NOT EXISTS project_index_agent ON project_index (agent, is_experiment);"
+            "CREATE INDEX IF NOT EXISTS project_index_updated_at ON project_index (updated_at);"
+            "CREATE INDEX IF NOT EXISTS project_elements_element ON project_elements (element, iemap_id);"
+            "CREATE INDEX IF NOT EXISTS project_elements_id ON project_elements (iemap_id);"
+            "CREATE INDEX IF NOT EXISTS project_parameters_name ON project_parameters (name, value);"
+            "CREATE INDEX IF NOT EXISTS project_parameters_id ON project_parameters (iemap_id);"
+            "CREATE INDEX IF NOT EXISTS project_properties_name ON project_properties (name, value);"
+            "CREATE INDEX IF NOT EXISTS project_properties_id ON project_properties (iemap_id);"
+        )
+        self._db.commit()
+        # stores created before the indexes existed are indexed once
+        if self._db.execute("SELECT COUNT(*) FROM project_index").fetchone()[0] != self.count():
+            self.reindex()
+
+    def get_state(self, key: str) -> Optional[str]:
+        """Return a sync state value, or None."""
+        row = self._db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str) -> None:
+        """Set a sync state value."""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (key, value))
+            self._db.commit()
+
+    def hashes(self) -> Dict[str, str]:
+        """Return the content hash of every stored project, keyed by ``iemap_id``."""
+        return dict(self._db.execute("SELECT iemap_id, content_hash FROM projects"))
+
+    def upsert(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """
+        Insert or replace project documents.
+
+        Args:
+            documents (Iterable[Dict[str, Any]]): JSON-compatible project documents with an ``iemap_id``.
+        """
+        documents = list(documents)
+        rows = [(document["iemap_id"], content_hash(document),
+                 (document.get("provenance") or {}).get("updatedAt"), json.dumps(document))
+                for document in documents]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?)", rows)
+            self._index(documents)
+            self._db.commit()
+
+    def _unindex(self, iemap_ids: List[Tuple[str]]) -> None:
+        for table in ("project_index", "project_elements", "project_parameters", "project_properties"):
+            self._db.executemany(f"DELETE FROM {table} WHERE iemap_id = ?", iemap_ids)
+
+    def _index(self, documents: List[Dict[str, Any]]) -> None:
+        self._unindex([(document["iemap_id"],) for document in documents])
+        index_rows, elements, parameters, properties = [], [], [], []
+        for document in documents:
+            iemap_id = document["iemap_id"]
+            provenance = document.get("provenance") or {}
+            process = document.get("process") or {}
+            material = document.get("material") or {}
+            is_experiment = process.get("isExperiment")
+            index_rows.append((
+                iemap_id, material.get("formula"), provenance.get("affiliation"),
+                (document.get("project") or {}).get("name"), provenance.get("email"), process.get("method"),
+                (process.get("agent") or {}).get("name"), None if is_experiment is None else int(is_experiment),
+                provenance.get("updatedAt")
+            ))
+            elements.extend((iemap_id, element) for element in material.get("elements") or [])
+            for rows, entries in ((parameters, document.get("parameters")), (properties, document.get("properties"))):
+                rows.extend((iemap_id, entry.get("name"), None if entry.get("value") is None else str(entry["value"]),
+                             _to_number(entry.get("value"))) for entry in entries or [])
+        self._db.executemany("INSERT INTO project_index VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", index_rows)
+        self._db.executemany("INSERT INTO project_elements VALUES (?, ?)", elements)
+        self._db.executemany("INSERT INTO project_parameters VALUES (?, ?, ?, ?)", parameters)
+        self._db.executemany("INSERT INTO project_properties VALUES (?, ?, ?, ?)", properties)
+
+    def reindex(self) -> None:
+        """Rebuild the index tables from the stored documents."""
+        with self._lock:
+            for table in ("project_index", "project_elements", "project_parameters", "project_properties"):
+                self._db.execute(f"DELETE FROM {table}")
+            self._index(list(self.documents()))
+            self._db.commit()
+
+    def delete(self, iemap_ids: Iterable[str]) -> None:
+        """Delete projects by ``iemap_id``."""
+        rows = [(i,) for i in iemap_ids]
+        with self._lock:
+            self._db.executemany("DELETE FROM projects WHERE iemap_id = ?", rows)
+            self._unindex(rows)
+            self._db.commit()
+
+    def query(
+            self,
+            affiliation: Optional[str] = None,
+            project_name: Optional[str] = None,
+            provenance_email: Optional[str] = None,
+            material_formula: Optional[str] = None,
+            material_all_elements: Optional[str] = None,
+            material_any_element: Optional[str] = None,
+            iemap_id: Optional[str] = None,
+            isExperiment: Optional[bool] = None,
+            simulationCode: Optional[str] = None,
+            experimentInstrument: Optional[str] = None,
+            simulationMethod: Optional[str] = None,
+            experimentMethod: Optional[str] = None,
+            parameterName: Optional[str] = None,
+            parameterValue: Optional[str] = None,
+            propertyName: Optional[str] = None,
+            propertyValue: Optional[str] = None,
+            limit: int = 100,
+            skip: int = 0,
+            start_date: Optional[str] = None,
+            end_date: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the stored documents using the indexed columns.
+
+        Parameters have the same meaning as in ``ProjectHandler.query_projects`` (exact
+        matching; element lists are comma separated; dates filter ``updatedAt`` by day).
+
+        Returns:
+            List[Dict[str, Any]]: Matching documents ordered by ``iemap_id``.
+        """
+        clauses: List[str] = []
+        args: List[Any] = []
+
+        def where(clause: str, *values: Any) -> None:
+            clauses.append(clause)
+            args.extend(values)
+
+        for column, value in (("affiliation", affiliation), ("project_name", project_name),
+                              ("email", provenance_email), ("formula", material_formula),
+                              ("i.iemap_id", iemap_id)):
+            if value is not None:
+                where(f"{column} = ?", value)
+        if isExperiment is not None:
+            where("is_experiment = ?", int(isExperiment))
+        for column, value, experiment in (("agent", simulationCode, 0), ("agent", experimentInstrument, 1),
+                                          ("method", simulationMethod, 0), ("method", experimentMethod, 1)):
+            if value is not None:
+                where(f"{column} = ? AND is_experiment = ?", value, experiment)
+        if material_all_elements:
+            for element in _split_elements(material_all_elements):
+                where("i.iemap_id IN (SELECT iemap_id FROM project_elements WHERE element = ?)", element)
+        if material_any_element:
+            elements = _split_elements(material_any_element)
+            where(f"i.iemap_id IN (SELECT iemap_id FROM project_elements WHERE element IN "
+                  f"({', '.join('?' * len(elements))}))", *elements)
+        for table, name, value in (("project_parameters", parameterName, parameterValue),
+                                   ("project_properties", propertyName, propertyValue)):
+            if name is None and value is None:
+                continue
+            conditions, values = [], []
+            if name is not None:
+                conditions.append("name = ?")
+                values.append(name)
+            if value is not None:
+                conditions.append("(value = ? OR num_value = ?)")
+                values.extend([str(value), _to_number(value)])
+            where(f"i.iemap_id IN (SELECT iemap_id FROM {table} WHERE {' AND '.join(conditions)})", *values)
+        if start_date is not None:
+            where("substr(updated_at, 1, 10) >= ?", start_date[:10])
+        if end_date is not None:
+            where("substr(updated_at, 1, 10) <= ?", end_date[:10])
+
+        sql = "SELECT p.document FROM project_index i JOIN projects p ON p.iemap_id = i.iemap_id"
+        if clauses:
+            sql += " WHERE " + " AND ".join(f"({clause})" for clause in clauses)
+        sql += " ORDER BY i.iemap_id LIMIT ? OFFSET ?"
+        return [json.loads(document) for (document,) in self._db.execute(sql, [*args, limit, skip])]
+
+    def count(self) -> int:
+        """Return the number of stored projects."""
+        return self._db.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+    def get(self, iemap_id: str) -> Optional[Dict[str, Any]]:
+        """Return a stored project document, or None."""
+        row = self._db.execute("SELECT document FROM projects WHERE iemap_id = ?", (iemap_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def documents(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all stored project documents."""
+        for (document,) in self._db.execute("SELECT document FROM projects ORDER BY iemap_id"):
+            yield json.loads(document)
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._db.close()
+
+
+class CatalogSync:
+    """
+    Incremental synchronization of the project catalog into a CatalogStore.
+
+    Each run queries only the projects changed since the persisted watermark
+    (``query_projects(start_date=...)``, with an overlap to tolerate clock skew and
+    day-granular filters), compares their content hashes with the stored ones and applies
+    only real upserts. Deletions are detected by comparing the local ids with the ids on
+    the server (queried with an ``iemap_id`` projection, so only ids are transferred).
+
+    Records rejected by validation are never stored nor deleted: they are counted in the
+    report and the watermark is kept below the oldest of them, so the next runs query them
+    again until they are valid. A run that would delete more than ``max_delete_fraction`` of
+    the local projects deletes nothing (e.g. the server returned a truncated id list).
+
+    Example:
+        >>> sync = CatalogSync(client.project_handler, CatalogStore())
+        >>> report = await sync.run()
+        >>> print(report.inserted, report.updated, report.deleted)
+    """
+
+    WATERMARK_KEY = "watermark"
+    SYNCED_AT_KEY = "synced_at"
+
+    def __init__(self, project_handler: ProjectHandler, store: Optional[CatalogStore] = None,
+                 overlap: timedelta = timedelta(days=1), page_size: int = 500,
+                 max_delete_fraction: Optional[float] = settings.CATALOG_MAX_DELETE_FRACTION) -> None:
+        """
+        Args:
+            project_handler (ProjectHandler): Handler used to query the server.
+            store (Optional[CatalogStore]): Local store. Defaults to ``CatalogStore()``.
+            overlap (timedelta): Period re-queried before the watermark. Defaults to one day.
+            page_size (int): Page/window size used when querying the server. Defaults to 500.
+            max_delete_fraction (Optional[float]): Largest fraction of the local projects a run
+                may delete; None disables the check. Defaults to ``settings.CATALOG_MAX_DELETE_FRACTION``.
+        """
+        self.project_handler = project_handler
+        self.store = store if store is not None else CatalogStore()
+        self.overlap = overlap
+        self.page_size = page_size
+        self.max_delete_fraction = max_delete_fraction
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        """Return the latest ``updatedAt`` seen by previous runs, or None."""
+        value = self.store.get_state(self.WATERMARK_KEY)
+        return datetime.fromisoformat(value) if value else None
+
+    async def _server_ids(self, rejected: Set[str]) -> Set[str]:
+        ids: Set[str] = set()
+        async for project in self.project_handler.iter_query(
+                window=self.page_size, projection=ID_PROJECTION,
+                on_reject=lambda record: rejected.add(_rejected_id(record))):
+            ids.add(project.iemap_id)
+        return ids
+
+    async def run(self, full: bool = False, detect_deletions: bool = True) -> SyncReport:
+        """
+        Synchronize the local store with the server.
+
+        Args:
+            full (bool): Ignore the watermark and re-query the whole catalog. Defaults to False.
+            detect_deletions (bool): Check for projects deleted on the server. Defaults to True.
+
+        Returns:
+            SyncReport: Number of inserted, updated, unchanged, deleted and rejected projects.
+        """
+        watermark = None if full else self.watermark
+        filters: Dict[str, Any] = {}
+        if watermark is not None:
+            filters["start_date"] = (watermark - self.overlap).date().isoformat()
+
+        known = self.store.hashes()
+        report = SyncReport(watermark=watermark)
+        changed: List[Dict[str, Any]] = []
+        latest = watermark
+        seen: Set[str] = set()
+        rejected: List[RejectedRecord] = []
+
+        async for project in self.project_handler.iter_query(window=self.page_size, on_reject=rejected.append,
+                                                             **filters):
+            document = project.model_dump(mode="json")
+            seen.add(project.iemap_id)
+            previous = known.get(project.iemap_id)
+            if previous is None:
+                report.inserted += 1
+                changed.append(document)
+            elif previous != content_hash(document):
+                report.updated += 1
+                changed.append(document)
+            else:
+                report.unchanged += 1
+            updated_at = _naive_utc(project.provenance.updatedAt)
+            if latest is None or updated_at > latest:
+                latest = updated_at
+            if len(changed) >= self.page_size:
+                self.store.upsert(changed)
+                changed = []
+        self.store.upsert(changed)
+
+        report.rejected = len(rejected)
+        # rejected projects are kept as they are locally, whatever the server has
+        rejected_ids = {_rejected_id(record) for record in rejected}
+        if rejected:
+            oldest = min((_rejected_updated_at(record) for record in rejected), default=None,
+                         key=lambda value: value or datetime.min)
+            # without a date the rejected records can only be found again from the old watermark
+            limit = oldest - timedelta(microseconds=1) if oldest is not None else watermark
+            latest = limit if latest is None or limit is None else min(latest, limit)
+
+        if detect_deletions:
+            if watermark is None:
+                server_ids = seen
+            else:
+                report.full_scan = True
+                server_ids = await self._server_ids(rejected_ids)
+            if None in rejected_ids:
+                # a rejected record without id could be any local project: nothing is deleted
+                deleted: Set[str] = set()
+            else:
+                deleted = set(known) - server_ids - rejected_ids
+            if self.max_delete_fraction is not None and len(deleted) > self.max_delete_fraction * len(known):
+                logger.warning(f"Catalog sync: {len(deleted)} of {len(known)} local projects are missing on the "
+                               f"server, keeping them (more than max_delete_fraction={self.max_delete_fraction})")
+                report.deletions_refused = len(deleted)
+                deleted = set()
+            self.store.delete(deleted)
+            report.deleted = len(deleted)
+
+        # an empty watermark makes the next run query the whole catalog
+        self.store.set_state(self.WATERMARK_KEY, latest.isoformat() if latest is not None else "")
+        self.store.set_state(self.SYNCED_AT_KEY, str(time.time()))
+        report.watermark = latest
+        return report
+
+
+class CatalogMirror:
+    """
+    Local mirror of the project catalog answering ``query_projects`` filters offline.
+
+    The mirror is kept up to date with CatalogSync (through the query endpoint, so local
+    and server results share the ProjectQueryModel shape). Queries are answered from the
+    indexed CatalogStore while the last sync is younger than ``max_age``; otherwise, or
+    for parameters the mirror cannot evaluate (``id``, ``fields``, ``fields_output``
+    projections, ``response_model``, ``sort``), they are forwarded to the server.
+
+    Example:
+        >>> mirror = CatalogMirror(client.project_handler, CatalogStore())
+        >>> await mirror.refresh()
+        >>> docs = await mirror.query_projects(material_any_element="Li", isExperiment=True)
+    """
+
+    def __init__(self, project_handler: ProjectHandler, store: Optional[CatalogStore] = None,
+                 max_age: float = settings.CATALOG_MAX_AGE) -> None:
+        """
+        Args:
+            project_handler (ProjectHandler): Handler used to sync and for server fallback.
+            store (Optional[CatalogStore]): Local store. Defaults to ``CatalogStore()``.
+            max_age (float): Seconds after which the mirror is considered stale.
+        """
+        self.project_handler = project_handler
+        self.sync = CatalogSync(project_handler, store)
+        self.store = self.sync.store
+        self.max_age = max_age
+        self.local_queries = 0
+        self.server_queries = 0
+
+    @property
+    def is_stale(self) -> bool:
+        """Return True if the mirror was never synced or the last sync is older than ``max_age``."""
+        synced_at = self.store.get_state(CatalogSync.SYNCED_AT_KEY)
+        return synced_at is None or time.time() - float(synced_at) > self.max_age
+
+    async def refresh(self, full: bool = False) -> SyncReport:
+        """Synchronize the mirror with the server (see ``CatalogSync.run``)."""
+        return await self.sync.run(full=full)
+
+    async def query_projects(self, fallback: bool = True, **filters: Any) -> List[ProjectQueryModel]:
+        """
+        Query projects locally, falling back to the server when needed.
+
+        Args:
+            fallback (bool): Forward the query to the server when the mirror is stale or
+                cannot evaluate a parameter. If False, such queries raise ValueError. Defaults to True.
+            **filters: Keyword arguments accepted by ``ProjectHandler.query_projects``.
+
+        Returns:
+            List[ProjectQueryModel]: Query results.
+        """
+        server_only = [key for key in ("id", "fields", "response_model", "sort") if filters.get(key) is not None]
+        if filters.get("fields_output", "all") != "all":
+            server_only.append("fields_output")
+        if server_only or self.is_stale:
+            if not fallback:
+                reason = f"unsupported parameters {server_only}" if server_only else "mirror is stale"
+                raise ValueError(f"Cannot answer the query locally: {reason}")
+            self.server_queries += 1
+            return await self.project_handler.query_projects(**filters)
+        trusted = filters.pop("trusted", False)
+        filters.pop("on_reject", None)
+        projection = filters.pop("projection", None)
+        if projection is not None and not isinstance(projection, Projection):
+            projection = Projection(*projection)
+        filters.pop("fields_output", None)
+        for key in ("id", "fields", "response_model", "sort"):
+            filters.pop(key, None)
+        self.local_queries += 1
+        model = projection.model if projection is not None else ProjectQueryModel
+        return validate_list(model, self.store.query(**filters), trusted=trusted)
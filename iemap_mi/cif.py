@@ -0,0 +1,464 @@
+# iemap_mi/cif.py
+import hashlib
+import math
+import re
+from fractions import Fraction
+from functools import reduce
+from typing import Optional, Dict, Any, List, Tuple, Union
+
+# numpy is optional for the package but required to parse structures (pip install iemap-mi[cif])
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+ELEMENTS = frozenset((
+    "H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn Ga Ge As Se Br Kr "
+    "Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb "
+    "Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No Lr "
+    "Rf Db Sg Bh Hs Mt Ds Rg Cn Nh Fl Mc Lv Ts Og D"
+).split())
+CELL_TAGS = ("_cell_length_a", "_cell_length_b", "_cell_length_c",
+             "_cell_angle_alpha", "_cell_angle_beta", "_cell_angle_gamma")
+SYMMETRY_TAGS = ("_symmetry_equiv_pos_as_xyz", "_space_group_symop_operation_xyz")
+
+_TOKEN = re.compile(r"""'(?:[^']|'(?=\S))*'(?=\s|$)|"(?:[^"]|"(?=\S))*"(?=\s|$)|\S+""")
+_SYMBOL = re.compile(r"^([A-Z][a-z]?)")
+_OP_TERM = r"[+-]?(?:(?:\d+(?:\.\d*)?|\.\d+)(?:/\d+)?(?:\*?[xyz])?|[xyz])"
+_OP_COMPONENT = re.compile(rf"(?:{_OP_TERM})+")
+_OP_PARTS = re.compile(r"([+-]?)((?:\d+(?:\.\d*)?|\.\d+)(?:/\d+)?)?\*?([xyz])?")
+
+
+class CifError(ValueError):
+    """Raised when a CIF file cannot be parsed or describes an invalid structure."""
+
+
+def _number(value: str, tag: str) -> float:
+    # numbers may carry a standard uncertainty, e.g. "3.3704(2)"
+    try:
+        number = float(value.split("(")[0])
+    except ValueError:
+        raise CifError(f"Invalid number {value!r} for {tag}")
+    if not math.isfinite(number):
+        raise CifError(f"Invalid number {value!r} for {tag}: must be finite")
+    return number
+
+
+def _tokens(text: str) -> List[str]:
+    tokens: List[str] = []
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        if line.startswith(";"):
+            # semicolon-delimited text field
+            field = [line[1:]]
+            index += 1
+            while index < len(lines) and not lines[index].startswith(";"):
+                field.append(lines[index])
+                index += 1
+            tokens.append("\n".join(field).strip())
+            index += 1
+            continue
+        for token in _TOKEN.findall(line):
+            if token.startswith("#"):
+                break
+            if token[0] in "'\"" and len(token) > 1 and token[-1] == token[0]:
+                token = token[1:-1]
+            tokens.append(token)
+        index += 1
+    return tokens
+
+
+def read_cif_blocks(content: Union[bytes, str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Read the data blocks of a CIF file.
+
+    Args:
+        content (Union[bytes, str]): CIF content.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Data blocks by name; each maps tags to a string value, or
+        to a list of strings for tags defined in a ``loop_``.
+
+    Raises:
+        CifError: If the content has no data block or a malformed loop.
+    """
+    text = content.decode("utf-8", errors="replace") if isinstance(content, bytes) else content
+    tokens = _tokens(text)
+    blocks: Dict[str, Dict[str, Any]] = {}
+    block: Optional[Dict[str, Any]] = None
+    position = 0
+    while position < len(tokens):
+        token = tokens[position]
+        lowered = token.lower()
+        if lowered.startswith("data_"):
+            block = blocks.setdefault(token[5:], {})
+            position += 1
+        elif block is None:
+            position += 1
+        elif lowered == "loop_":
+            position += 1
+            tags = []
+            while position < len(tokens) and tokens[position].startswith("_"):
+                tags.append(tokens[position].lower())
+                position += 1
+            values = []
+            while position < len(tokens) and not tokens[position].startswith("_") and \
+                    tokens[position].lower() not in ("loop_",) and not tokens[position].lower().startswith("data_"):
+                values.append(tokens[position])
+                position += 1
+            if not tags or len(values) % len(tags):
+                raise CifError(f"Malformed loop {tags}: {len(values)} values for {len(tags)} columns")
+            for column, tag in enumerate(tags):
+                block[tag] = values[column::len(tags)]
+        elif token.startswith("_"):
+            if position + 1 >= len(tokens):
+                raise CifError(f"Missing value for {token}")
+            block[lowered] = tokens[position + 1]
+            position += 2
+        else:
+            position += 1
+    if not blocks:
+        raise CifError("No data block found")
+    return blocks
+
+
+def parse_symmetry_operation(operation: str) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Parse a symmetry operation such as ``"-x+1/2, y, z+1/2"``.
+
+    Args:
+        operation (str): Operation in xyz notation.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Rotation matrix (3x3) and translation vector.
+
+    Raises:
+        CifError: If the operation cannot be parsed.
+    """
+    parts = operation.replace(" ", "").lower().split(",")
+    if len(parts) != 3:
+        raise CifError(f"Invalid symmetry operation {operation!r}")
+    rotation = np.zeros((3, 3))
+    translation = np.zeros(3)
+    for row, part in enumerate(parts):
+        if not _OP_COMPONENT.fullmatch(part):
+            raise CifError(f"Invalid symmetry operation {operation!r}")
+        for sign, number, axis in _OP_PARTS.findall(part):
+            if not (number or axis):
+                continue
+            try:
+                value = float(Fraction(number)) if number else 1.0
+            except ZeroDivisionError:
+                raise CifError(f"Invalid symmetry operation {operation!r}")
+            value = -value if sign == "-" else value
+            if axis:
+                rotation[row, "xyz".index(axis)] += value
+            else:
+                translation[row] += value
+    if abs(abs(np.linalg.det(rotation)) - 1) > 1e-6:
+        raise CifError(f"Symmetry operation {operation!r} is not a valid symmetry operation")
+    return rotation, translation
+
+
+def lattice_matrix(a: float, b: float, c: float, alpha: float, beta: float, gamma: float) -> "np.ndarray":
+    """Return the lattice vectors (rows, a along x) of the cell parameters (angles in degrees)."""
+    alpha, beta, gamma = (math.radians(angle) for angle in (alpha, beta, gamma))
+    cos_alpha, cos_beta, cos_gamma = math.cos(alpha), math.cos(beta), math.cos(gamma)
+    sin_gamma = math.sin(gamma)
+    cx = cos_beta
+    cy = (cos_alpha - cos_beta * cos_gamma) / sin_gamma
+    cz_squared = 1 - cx ** 2 - cy ** 2
+    if cz_squared <= 0:
+        raise CifError("Cell angles do not describe a valid cell")
+    return np.array([[a, 0.0, 0.0],
+                     [b * cos_gamma, b * sin_gamma, 0.0],
+                     [c * cx, c * cy, c * math.sqrt(cz_squared)]])
+
+
+def lattice_parameters(matrix: "np.ndarray") -> Tuple[float, ...]:
+    """Return (a, b, c, alpha, beta, gamma) of a lattice matrix (rows are the lattice vectors)."""
+    lengths = np.linalg.norm(matrix, axis=1)
+
+    def angle(i: int, j: int) -> float:
+        cosine = float(np.dot(matrix[i], matrix[j]) / (lengths[i] * lengths[j]))
+        return math.degrees(math.acos(max(-1.0, min(1.0, cosine))))
+
+    return (*map(float, lengths), angle(1, 2), angle(0, 2), angle(0, 1))
+
+
+def niggli_reduce(matrix: "np.ndarray", tolerance: float = 1e-5) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Niggli-reduce a lattice (Krivy-Gruber algorithm with the epsilon-tolerant tests of
+    Grosse-Kunstleve et al., 2004).
+
+    Args:
+        matrix (np.ndarray): Lattice vectors as rows.
+        tolerance (float): Relative tolerance of the comparisons.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Reduced lattice and the integer matrix ``P`` such that
+        ``reduced = P @ matrix``; fractional coordinates transform as ``f @ inv(P)``.
+    """
+    epsilon = tolerance * abs(np.linalg.det(matrix)) ** (1 / 3)
+    transform = np.eye(3)
+
+    def apply(step: List[List[int]]) -> None:
+        nonlocal transform
+        transform = np.array(step, dtype=float).T @ transform
+
+    def g6() -> Tuple[float, ...]:
+        lattice = transform @ matrix
+        metric = lattice @ lattice.T
+        return metric[0, 0], metric[1, 1], metric[2, 2], 2 * metric[1, 2], 2 * metric[0, 2], 2 * metric[0, 1]
+
+    for _ in range(1000):
+        A, B, C, xi, eta, zeta = g6()
+        if A > B + epsilon or (abs(A - B) < epsilon and abs(xi) > abs(eta) + epsilon):
+            apply([[0, -1, 0], [-1, 0, 0], [0, 0, -1]])
+            A, B, C, xi, eta, zeta = g6()
+        if B > C + epsilon or (abs(B - C) < epsilon and abs(eta) > abs(zeta) + epsilon):
+            apply([[-1, 0, 0], [0, 0, -1], [0, -1, 0]])
+            continue
+        l, m, n = (0 if abs(value) < epsilon else (1 if value > 0 else -1) for value in (xi, eta, zeta))
+        if l * m * n == 1:
+            apply([[-1 if l == -1 else 1, 0, 0], [0, -1 if m == -1 else 1, 0], [0, 0, -1 if n == -1 else 1]])
+        else:
+            i, j, k = (-1 if l == 1 else 1), (-1 if m == 1 else 1), (-1 if n == 1 else 1)
+            if i * j * k == -1:
+                if n == 0:
+                    k = -1
+                elif m == 0:
+                    j = -1
+                elif l == 0:
+                    i = -1
+            apply([[i, 0, 0], [0, j, 0], [0, 0, k]])
+        A, B, C, xi, eta, zeta = g6()
+        if abs(xi) > B + epsilon or (abs(xi - B) < epsilon and 2 * eta < zeta - epsilon) or \
+                (abs(xi + B) < epsilon and zeta < -epsilon):
+            apply([[1, 0, 0], [0, 1, -int(math.copysign(1, xi))], [0, 0, 1]])
+            continue
+        if abs(eta) > A + epsilon or (abs(eta - A) < epsilon and 2 * xi < zeta - epsilon) or \
+                (abs(eta + A) < epsilon and zeta < -epsilon):
+            apply([[1, 0, -int(math.copysign(1, eta))], [0, 1, 0], [0, 0, 1]])
+            continue
+        if abs(zeta) > A + epsilon or (abs(zeta - A) < epsilon and 2 * xi < eta - epsilon) or \
+                (abs(zeta + A) < epsilon and eta < -epsilon):
+            apply([[1, -int(math.copysign(1, zeta)), 0], [0, 1, 0], [0, 0, 1]])
+            continue
+        if xi + eta + zeta + A + B < -epsilon or \
+                (abs(xi + eta + zeta + A + B) < epsilon and 2 * (A + eta) + zeta > epsilon):
+            apply([[1, 0, 1], [0, 1, 1], [0, 0, 1]])
+            continue
+        break
+    else:
+        raise CifError("Niggli reduction did not converge")
+    transform = np.rint(transform)
+    return transform @ matrix, transform
+
+
+class CifStructure:
+    """
+    Crystal structure read from a CIF file.
+
+    Attributes:
+        name (str): Name of the data block.
+        cell (Tuple[float, ...]): a, b, c (Angstrom) and alpha, beta, gamma (degrees).
+        symmetry_operations (List[str]): Symmetry operations in xyz notation.
+        species (List[str]): Element of each symmetry-independent site.
+        labels (List[str]): Label of each symmetry-independent site.
+        frac_coords (np.ndarray): Fractional coordinates of the independent sites, shape (n, 3).
+        occupancies (np.ndarray): Occupancy of the independent sites, shape (n,).
+    """
+
+    def __init__(self, name: str, cell: Tuple[float, ...], symmetry_operations: List[str], species: List[str],
+                 labels: List[str], frac_coords: "np.ndarray", occupancies: "np.ndarray") -> None:
+        self.name = name
+        self.cell = cell
+        self.symmetry_operations = symmetry_operations
+        self.species = species
+        self.labels = labels
+        self.frac_coords = frac_coords
+        self.occupancies = occupancies
+        self._expanded: Optional[Tuple[List[str], "np.ndarray", "np.ndarray"]] = None
+
+    def __repr__(self) -> str:
+        return f"CifStructure(name={self.name!r}, formula={self.reduced_formula!r}, sites={len(self.species)})"
+
+    @property
+    def lattice(self) -> "np.ndarray":
+        """Return the lattice vectors as rows of a 3x3 array."""
+        return lattice_matrix(*self.cell)
+
+    @property
+    def volume(self) -> float:
+        """Return the cell volume in cubic Angstrom."""
+        return float(abs(np.linalg.det(self.lattice)))
+
+    def expand(self, tolerance: float = 1e-3) -> Tuple[List[str], "np.ndarray", "np.ndarray"]:
+        """
+        Apply the symmetry operations to the independent sites.
+
+        Args:
+            tolerance (float): Fractional distance under which two generated sites are merged.
+
+        Returns:
+            Tuple[List[str], np.ndarray, np.ndarray]: Species, fractional coordinates in [0, 1)
+            and occupancies of all the sites in the cell.
+        """
+        if self._expanded is not None:
+            return self._expanded
+        operations = [parse_symmetry_operation(operation) for operation in self.symmetry_operations or ["x,y,z"]]
+        species: List[str] = []
+        coords: List["np.ndarray"] = []
+        occupancies: List[float] = []
+        for specie, site, occupancy in zip(self.species, self.frac_coords, self.occupancies):
+            images = np.array([rotation @ site + translation for rotation, translation in operations]) % 1.0
+            unique: List["np.ndarray"] = []
+            for image in images:
+                if not any(np.all(np.abs((image - other + 0.5) % 1.0 - 0.5) < tolerance) for other in unique):
+                    unique.append(image)
+            for image in unique:
+                species.append(specie)
+                coords.append(image)
+                occupancies.append(float(occupancy))
+        self._expanded = (species, np.array(coords).reshape(-1, 3) % 1.0, np.array(occupancies))
+        return self._expanded
+
+    @property
+    def composition(self) -> Dict[str, float]:
+        """Return the occupancy-weighted number of atoms of each element in the cell."""
+        species, _, occupancies = self.expand()
+        composition: Dict[str, float] = {}
+        for specie, occupancy in zip(species, occupancies):
+            composition[specie] = composition.get(specie, 0.0) + occupancy
+        return composition
+
+    @property
+    def reduced_formula(self) -> str:
+        """Return the reduced formula, elements in alphabetical order (e.g. ``"FLi"``)."""
+        composition = {element: round(amount, 3) for element, amount in self.composition.items()}
+        if all(float(amount).is_integer() for amount in composition.values()):
+            divisor = reduce(math.gcd, (int(amount) for amount in composition.values()))
+            composition = {element: amount / divisor for element, amount in composition.items()}
+        return "".join(f"{element}{'' if amount == 1 else f'{amount:g}'}"
+                       for element, amount in sorted(composition.items()))
+
+    def fingerprint(self, decimals: int = 3) -> str:
+        """
+        Return a canonical fingerprint of the structure.
+
+        The fingerprint hashes the reduced formula, the Niggli-reduced cell parameters and
+        the sorted fractional coordinates of all the sites in the reduced cell, with the
+        origin moved to the site that gives the smallest coordinate list. It is therefore
+        independent of the file layout, of the setting of the cell and of the origin, so the
+        same structure saved by different tools gives the same fingerprint.
+
+        Args:
+            decimals (int): Rounding of lengths, angles (one decimal less) and coordinates.
+
+        Returns:
+            str: SHA-256 hex digest.
+        """
+        species, coords, occupancies = self.expand()
+        reduced, transform = niggli_reduce(self.lattice)
+        coords = (coords @ np.linalg.inv(transform)) % 1.0
+        # occupancy is part of the site identity (partially occupied sites differ from full ones)
+        site_keys = [f"{specie}:{occupancy:.2f}" for specie, occupancy in zip(species, occupancies)]
+        rarest = min(set(site_keys), key=lambda key: (site_keys.count(key), key))
+        scale = 10 ** decimals
+
+        def canonical(origin: "np.ndarray") -> List[Tuple[str, int, int, int]]:
+            shifted = np.rint(((coords - origin) % 1.0) * scale).astype(int) % scale
+            return sorted((key, *map(int, position)) for key, position in zip(site_keys, shifted))
+
+        sites = min(canonical(coords[index]) for index, key in enumerate(site_keys) if key == rarest)
+        cell = lattice_parameters(reduced)
+        payload = "|".join([
+            self.reduced_formula,
+            ",".join(f"{value:.{decimals}f}" for value in cell[:3]),
+            ",".join(f"{value:.{max(decimals - 1, 0)}f}" for value in cell[3:]),
+            ";".join(f"{key},{x},{y},{z}" for key, x, y, z in sites),
+        ])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def parse_cif(content: Union[bytes, str]) -> CifStructure:
+    """
+    Parse and validate the first data block of a CIF file.
+
+    Args:
+        content (Union[bytes, str]): CIF content.
+
+    Returns:
+        CifStructure: Parsed structure.
+
+    Raises:
+        CifError: If the file is malformed or describes an invalid structure.
+        ImportError: If numpy is not installed.
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is required to parse CIF files: pip install numpy")
+    name, block = next(iter(read_cif_blocks(content).items()))
+
+    missing = [tag for tag in CELL_TAGS if tag not in block]
+    if missing:
+        raise CifError(f"Missing cell parameters: {', '.join(missing)}")
+    cell = tuple(_number(block[tag], tag) for tag in CELL_TAGS)
+    if any(length <= 0 for length in cell[:3]):
+        raise CifError(f"Cell lengths must be positive: {cell[:3]}")
+    if any(not 0 < angle < 180 for angle in cell[3:]):
+        raise CifError(f"Cell angles must be between 0 and 180 degrees: {cell[3:]}")
+    lattice_matrix(*cell)
+
+    symmetry_operations: List[str] = []
+    for tag in SYMMETRY_TAGS:
+        if tag in block:
+            value = block[tag]
+            symmetry_operations = value if isinstance(value, list) else [value]
+            break
+    for operation in symmetry_operations:
+        parse_symmetry_operation(operation)
+
+    coordinate_tags = ("_atom_site_fract_x", "_atom_site_fract_y", "_atom_site_fract_z")
+    if any(tag not in block for tag in coordinate_tags):
+        raise CifError("Missing _atom_site loop with fractional coordinates")
+    columns = [block[tag] if isinstance(block[tag], list) else [block[tag]] for tag in coordinate_tags]
+    count = len(columns[0])
+    if count == 0:
+        raise CifError("The structure has no atoms")
+
+    def column(tag: str, default: Optional[str] = None) -> List[Optional[str]]:
+        values = block.get(tag, [default] * count)
+        values = values if isinstance(values, list) else [values]
+        if len(values) != count:
+            raise CifError(f"Column {tag} has {len(values)} values for {count} sites")
+        return values
+
+    for tag in coordinate_tags[1:]:
+        column(tag)
+
+    labels = column("_atom_site_label", "")
+    symbols = column("_atom_site_type_symbol")
+    species = []
+    for label, symbol in zip(labels, symbols):
+        match = _SYMBOL.match(symbol or label or "")
+        element = match.group(1) if match else None
+        if element and element not in ELEMENTS and element[0] in ELEMENTS:
+            # labels such as "OW1" or "Cb2": keep the one-letter symbol
+            element = element[0]
+        if element not in ELEMENTS:
+            raise CifError(f"Unknown element for site {label or symbol!r}")
+        species.append(element)
+
+    frac_coords = np.array([[_number(value, tag) for value in values]
+                            for tag, values in zip(coordinate_tags, columns)]).T
+    occupancies = np.array([_number(value, "_atom_site_occupancy") if value not in (None, "?", ".") else 1.0
+                            for value in column("_atom_site_occupancy")])
+    if np.any(occupancies <= 0) or np.any(occupancies > 1 + 1e-3):
+        raise CifError("Site occupancies must be in (0, 1]")
+    return CifStructure(name, cell, symmetry_operations, species, [label or "" for label in labels],
+                        frac_coords, occupancies)
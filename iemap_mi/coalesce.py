@@ -0,0 +1,87 @@
+# iemap_mi/coalesce.py
+import asyncio
+from typing import Optional, Any, Dict, Hashable, Callable, Awaitable, TypeVar
+
+from iemap_mi.metrics import MetricsRecorder
+
+T = TypeVar("T")
+
+
+class Coalescer:
+    """
+    Single-flight execution of identical concurrent reads.
+
+    While a call for a key is in flight, further calls with the same key do not start a
+    new request: they await the same task and receive the same result (or exception).
+    The shared call runs as its own task, so cancelling one caller does not cancel it
+    for the others; it is cancelled (and awaited) once every caller is cancelled. Results
+    are shared objects: callers must not mutate them.
+
+    Attributes:
+        enabled (bool): Coalesce calls; when False every call runs its own request.
+        metrics (Optional[MetricsRecorder]): Recorder counting the coalesced calls per endpoint.
+    """
+
+    def __init__(self, metrics: Optional[MetricsRecorder] = None, enabled: bool = True) -> None:
+        """
+        Args:
+            metrics (Optional[MetricsRecorder]): Recorder counting the coalesced calls. Defaults to None.
+            enabled (bool): Coalesce calls. Defaults to True.
+        """
+        self.metrics = metrics
+        self.enabled = enabled
+        self._in_flight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._waiters: Dict["asyncio.Future[Any]", int] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of distinct calls in flight."""
+        return len(self._in_flight)
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[T]], method: str = "GET",
+                  endpoint: str = "") -> T:
+        """
+        Run ``call``, or join the identical call already in flight.
+
+        Args:
+            key (Hashable): Identity of the call: everything that affects its result
+                (endpoint, parameters, credentials, output model).
+            call (Callable[[], Awaitable[T]]): Coroutine function performing the call.
+            method (str): HTTP method, for the metrics label.
+            endpoint (str): Endpoint path, for the metrics label.
+
+        Returns:
+            T: Result of the shared call.
+        """
+        if not self.enabled:
+            return await call()
+        task = self._in_flight.get(key)
+        if task is not None:
+            if self.metrics is not None:
+                self.metrics.record_coalesced(method, endpoint)
+        else:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters[task] == 1:
+                # last caller gone: nobody needs the result, stop the request
+                if self._in_flight.get(key) is task:
+                    del self._in_flight[key]
+                task.cancel()
+                await asyncio.wait([task])
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+
+    def _forget(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        self._waiters.pop(task, None)
+        if not task.cancelled():
+            # mark the exception as retrieved even if every caller was cancelled
+            task.exception()
@@ -0,0 +1,230 @@
+# iemap_mi/compact.py
+import sys
+from array import array
+from typing import Optional, Dict, Any, List, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from iemap_mi.models import FlattenedProjectBase
+
+# numpy is optional: buffers are plain arrays and numpy views are returned when available
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+LATTICE_FIELDS = ("a", "b", "c", "alpha", "beta", "gamma")
+
+Entry = Tuple[Tuple[str, Any], ...]
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _intern_entries(entries: Optional[List[Dict[str, Any]]]) -> Tuple[Entry, ...]:
+    return tuple(tuple((sys.intern(key), _intern(value)) for key, value in entry.items())
+                 for entry in entries or [])
+
+
+def _flatten(rows: Optional[List[List[float]]]) -> Tuple[array, int]:
+    rows = rows or []
+    width = len(rows[0]) if rows else 0
+    buffer = array("d")
+    for row in rows:
+        if len(row) != width:
+            raise ValueError("rows of sites/cell must all have the same length")
+        buffer.extend(row)
+    return buffer, width
+
+
+def _unflatten(buffer: array, width: int) -> List[List[float]]:
+    if not width:
+        return []
+    return [list(buffer[i:i + width]) for i in range(0, len(buffer), width)]
+
+
+class CompactStructure:
+    """
+    Compact counterpart of the ``Input``/``Output`` structure models.
+
+    Lattice parameters are stored as a float64 array (the original strings are kept only when
+    they do not round-trip through ``float``), ``sites`` and ``cell`` as flat float64 buffers
+    and species as a tuple of interned strings.
+    """
+    __slots__ = ("lattice", "lattice_text", "sites", "site_width", "cell", "cell_width", "species")
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        """
+        Args:
+            data (Dict[str, Any]): Raw ``material.input`` or ``material.output`` dictionary.
+        """
+        lattice = data.get("lattice") or {}
+        values = [lattice.get(field) for field in LATTICE_FIELDS]
+        try:
+            self.lattice = array("d", (float(value) for value in values))
+            round_trip = all(repr(number) == str(value) for number, value in zip(self.lattice, values))
+        except (TypeError, ValueError):
+            self.lattice = array("d", [float("nan")] * len(LATTICE_FIELDS))
+            round_trip = False
+        self.lattice_text = None if round_trip else tuple(
+            None if value is None else sys.intern(str(value)) for value in values)
+        self.sites, self.site_width = _flatten(data.get("sites"))
+        self.cell, self.cell_width = _flatten(data.get("cell"))
+        self.species = tuple(sys.intern(specie) for specie in data.get("species") or [])
+
+    def sites_array(self) -> Any:
+        """Return the sites as an (n, 3) NumPy view of the buffer, or a list of lists without numpy."""
+        if NUMPY_AVAILABLE:
+            return np.frombuffer(self.sites, dtype=np.float64).reshape(-1, self.site_width or 1)
+        return _unflatten(self.sites, self.site_width)
+
+    def cell_array(self) -> Any:
+        """Return the cell as a (3, 3) NumPy view of the buffer, or a list of lists without numpy."""
+        if NUMPY_AVAILABLE:
+            return np.frombuffer(self.cell, dtype=np.float64).reshape(-1, self.cell_width or 1)
+        return _unflatten(self.cell, self.cell_width)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the structure as the raw dictionary expected by the pydantic models."""
+        if self.lattice_text is not None:
+            lattice = dict(zip(LATTICE_FIELDS, self.lattice_text))
+        else:
+            lattice = {field: repr(value) for field, value in zip(LATTICE_FIELDS, self.lattice)}
+        return {
+            "lattice": lattice,
+            "sites": _unflatten(self.sites, self.site_width),
+            "species": list(self.species),
+            "cell": _unflatten(self.cell, self.cell_width),
+        }
+
+
+class CompactProject:
+    """
+    Lightweight record for bulk-loaded projects, an alternative to FlattenedProjectBase.
+
+    Fields live in ``__slots__`` (no per-instance ``__dict__``), repeated strings such as the
+    affiliation, method, agent and element symbols are interned, and structures are stored
+    as CompactStructure buffers. Records are converted back to pydantic models only on
+    demand with ``to_model``.
+
+    The nested ``provenance``, ``project``, ``process`` and ``material`` attributes are
+    rebuilt as dictionaries when accessed, so records can be passed to ColumnarExporter
+    and ElementIndex unchanged.
+
+    Example:
+        >>> records = [record async for record in
+        ...            client.project_handler.iter_projects(model=CompactProject)]
+        >>> records[0].to_model()
+    """
+    __slots__ = (
+        "identifier", "iemap_id", "affiliation", "email", "created_at", "updated_at",
+        "name", "label", "description", "method", "agent_name", "agent_version", "is_experiment",
+        "formula", "elements", "input", "output", "_parameters", "_properties",
+    )
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        """
+        Args:
+            data (Dict[str, Any]): Raw project dictionary, as found in ``ProjectResponse.data``.
+        """
+        provenance = data.get("provenance") or {}
+        project = data.get("project") or {}
+        process = data.get("process") or {}
+        agent = process.get("agent") or {}
+        material = data.get("material") or {}
+
+        self.identifier: Optional[str] = data.get("identifier")
+        self.iemap_id: str = data.get("iemap_id")
+        self.affiliation: str = _intern(provenance.get("affiliation"))
+        self.email: str = provenance.get("email")
+        self.created_at: Any = provenance.get("createdAt")
+        self.updated_at: Any = provenance.get("updatedAt")
+        self.name: str = _intern(project.get("name"))
+        self.label: str = _intern(project.get("label"))
+        self.description: Optional[str] = _intern(project.get("description"))
+        self.method: str = _intern(process.get("method"))
+        self.agent_name: str = _intern(agent.get("name"))
+        self.agent_version: Optional[str] = _intern(agent.get("version"))
+        self.is_experiment: bool = process.get("isExperiment")
+        self.formula: str = _intern(material.get("formula"))
+        self.elements: Tuple[str, ...] = tuple(sys.intern(element) for element in material.get("elements") or [])
+        self.input: Optional[CompactStructure] = (
+            CompactStructure(material["input"]) if material.get("input") else None)
+        self.output: Optional[CompactStructure] = (
+            CompactStructure(material["output"]) if material.get("output") else None)
+        self._parameters = _intern_entries(data.get("parameters"))
+        self._properties = _intern_entries(data.get("properties"))
+
+    @classmethod
+    def model_validate(cls, data: Union[Dict[str, Any], BaseModel]) -> "CompactProject":
+        """
+        Build a record from a raw dictionary or a project model.
+
+        Named like the pydantic method so the class can be passed as ``model`` to
+        ``ProjectHandler.iter_projects``.
+        """
+        if isinstance(data, BaseModel):
+            data = data.model_dump()
+        return cls(data)
+
+    def __repr__(self) -> str:
+        return f"CompactProject(iemap_id={self.iemap_id!r}, formula={self.formula!r})"
+
+    @property
+    def provenance(self) -> Dict[str, Any]:
+        return {"affiliation": self.affiliation, "email": self.email,
+                "createdAt": self.created_at, "updatedAt": self.updated_at}
+
+    @property
+    def project(self) -> Dict[str, Any]:
+        return {"name": self.name, "label": self.label, "description": self.description}
+
+    @property
+    def process(self) -> Dict[str, Any]:
+        return {"method": self.method, "agent": {"name": self.agent_name, "version": self.agent_version},
+                "isExperiment": self.is_experiment}
+
+    @property
+    def material(self) -> Dict[str, Any]:
+        material: Dict[str, Any] = {"formula": self.formula, "elements": list(self.elements)}
+        if self.input is not None:
+            material["input"] = self.input.to_dict()
+        if self.output is not None:
+            material["output"] = self.output.to_dict()
+        return material
+
+    @property
+    def parameters(self) -> List[Dict[str, Any]]:
+        return [dict(entry) for entry in self._parameters]
+
+    @property
+    def properties(self) -> List[Dict[str, Any]]:
+        return [dict(entry) for entry in self._properties]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a raw project dictionary."""
+        return {
+            "identifier": self.identifier,
+            "iemap_id": self.iemap_id,
+            "provenance": self.provenance,
+            "project": self.project,
+            "process": self.process,
+            "material": self.material,
+            "parameters": self.parameters,
+            "properties": self.properties,
+        }
+
+    def to_model(self, model: Type[BaseModel] = FlattenedProjectBase) -> BaseModel:
+        """
+        Convert the record back to a pydantic model.
+
+        Args:
+            model (Type[BaseModel]): Target model. Defaults to FlattenedProjectBase.
+
+        Returns:
+            BaseModel: Validated model instance.
+        """
+        return model.model_validate(self.to_dict())
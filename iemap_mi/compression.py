@@ -0,0 +1,221 @@
+# iemap_mi/compression.py
+import itertools
+import zlib
+from typing import Optional, Any, AsyncIterator, Iterator, Tuple
+
+import httpx
+
+from iemap_mi.settings import settings
+
+# brotli and zstandard are optional (pip install iemap-mi[compression]); httpx decodes the
+# responses with them when installed and supported, gzip and deflate are always available
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi as brotli
+
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+
+    ZSTANDARD_AVAILABLE = True
+except ImportError:
+    ZSTANDARD_AVAILABLE = False
+
+
+
+def _version_tuple(version: str) -> Tuple[int, ...]:
+    """Return the leading numeric release of a version string, e.g. (0, 27, 1) for "0.27.1"."""
+    release = []
+    for part in version.split("."):
+        digits = "".join(itertools.takewhile(str.isdigit, part))
+        if not digits:
+            break
+        release.append(int(digits))
+    return tuple(release)
+
+
+# httpx decodes brotli responses when brotli is installed, zstd ones from httpx 0.27.1 on
+HTTPX_DECODES_ZSTD = _version_tuple(httpx.__version__) >= (0, 27, 1)
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Return the content codings supported in this environment, most effective first."""
+    encodings = []
+    if ZSTANDARD_AVAILABLE:
+        encodings.append("zstd")
+    if BROTLI_AVAILABLE:
+        encodings.append("br")
+    return (*encodings, "gzip", "deflate")
+
+
+def decodable_encodings() -> Tuple[str, ...]:
+    """Return the available content codings httpx can decode in responses, most effective first."""
+    return tuple(encoding for encoding in available_encodings() if encoding != "zstd" or HTTPX_DECODES_ZSTD)
+
+
+def accept_encoding() -> str:
+    """Return the ``Accept-Encoding`` header value offering every coding responses can be decoded from."""
+    return ", ".join(decodable_encodings())
+
+
+class _Compressor:
+    """Incremental compressor with a ``compress``/``flush`` interface for every coding."""
+
+    def __init__(self, encoding: str, level: Optional[int] = None) -> None:
+        check_encoding(encoding)
+        level = level if level is not None else settings.REQUEST_COMPRESSION_LEVELS[encoding]
+        if encoding == "gzip":
+            self._compressor: Any = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._compressor = zlib.compressobj(level)
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        self._brotli = encoding == "br"
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) if self._brotli else self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish() if self._brotli else self._compressor.flush()
+
+
+def check_encoding(encoding: str) -> None:
+    """
+    Check that a content coding can be used to compress request bodies.
+
+    Args:
+        encoding (str): ``"gzip"``, ``"deflate"``, ``"br"`` or ``"zstd"``.
+
+    Raises:
+        ValueError: If the coding is unknown.
+        ImportError: If the coding needs a package that is not installed.
+    """
+    if encoding not in ("gzip", "deflate", "br", "zstd"):
+        raise ValueError(f"Unsupported content encoding {encoding!r}: use gzip, deflate, br or zstd")
+    if encoding not in available_encodings():
+        package = "brotli" if encoding == "br" else "zstandard"
+        raise ImportError(f"{package} is required for {encoding} compression: pip install {package}")
+
+
+def compress_bytes(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Compress a whole body.
+
+    Args:
+        data (bytes): Body to compress.
+        encoding (str): Content coding (see ``check_encoding``).
+        level (Optional[int]): Compression level. Defaults to ``settings.REQUEST_COMPRESSION_LEVELS``.
+
+    Returns:
+        bytes: Compressed body.
+    """
+    compressor = _Compressor(encoding, level)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress_bytes(data: bytes, encoding: str) -> bytes:
+    """
+    Decompress a whole body, e.g. a compressed request received by a test server.
+
+    Args:
+        data (bytes): Compressed body.
+        encoding (str): Content coding (see ``check_encoding``).
+
+    Returns:
+        bytes: Decompressed body.
+    """
+    check_encoding(encoding)
+    if encoding == "gzip":
+        return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return zlib.decompress(data)
+    if encoding == "br":
+        return brotli.decompress(data)
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+class CompressedStream(httpx.AsyncByteStream, httpx.SyncByteStream):
+    """
+    Request body stream compressing another stream chunk by chunk.
+
+    Used for multipart uploads, so files are compressed while they are read from disk
+    and memory use stays bounded. The stream can be iterated again (e.g. on retries) if
+    the wrapped stream can.
+
+    Attributes:
+        bytes_sent (int): Compressed bytes produced by the last iteration.
+    """
+
+    def __init__(self, stream: Any, encoding: str, level: Optional[int] = None) -> None:
+        check_encoding(encoding)
+        self.stream = stream
+        self.encoding = encoding
+        self.level = level
+        self.bytes_sent = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        compressor = _Compressor(self.encoding, self.level)
+        self.bytes_sent = 0
+        for chunk in self.stream:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                self.bytes_sent += len(compressed)
+                yield compressed
+        tail = compressor.flush()
+        self.bytes_sent += len(tail)
+        yield tail
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        compressor = _Compressor(self.encoding, self.level)
+        self.bytes_sent = 0
+        async for chunk in self.stream:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                self.bytes_sent += len(compressed)
+                yield compressed
+        tail = compressor.flush()
+        self.bytes_sent += len(tail)
+        yield tail
+
+
+def compress_request(request: httpx.Request, encoding: str, min_size: int = settings.REQUEST_COMPRESSION_MIN_SIZE,
+                     level: Optional[int] = None) -> httpx.Request:
+    """
+    Return a copy of a request with a compressed body and the matching ``Content-Encoding``.
+
+    In-memory bodies (JSON, form data) are compressed at once; streamed bodies (multipart
+    uploads) are compressed on the fly and sent with chunked transfer encoding. Requests
+    without a body, smaller than ``min_size`` or already encoded are returned unchanged.
+
+    Args:
+        request (httpx.Request): Request built by ``httpx.AsyncClient.build_request``.
+        encoding (str): Content coding (see ``check_encoding``).
+        min_size (int): Minimum body size in bytes worth compressing.
+        level (Optional[int]): Compression level. Defaults to ``settings.REQUEST_COMPRESSION_LEVELS``.
+
+    Returns:
+        httpx.Request: Request to send.
+    """
+    length = request.headers.get("Content-Length")
+    streamed = length is None and "Transfer-Encoding" in request.headers
+    if "Content-Encoding" in request.headers or (length is None and not streamed) or \
+            (length is not None and int(length) < min_size):
+        return request
+    headers = request.headers.copy()
+    headers["Content-Encoding"] = encoding
+    headers.pop("Content-Length", None)
+    if isinstance(request.stream, httpx.ByteStream):
+        return httpx.Request(request.method, request.url, headers=headers, extensions=request.extensions,
+                             content=compress_bytes(request.read(), encoding, level))
+    headers["Transfer-Encoding"] = "chunked"
+    return httpx.Request(request.method, request.url, headers=headers, extensions=request.extensions,
+                         stream=CompressedStream(request.stream, encoding, level))
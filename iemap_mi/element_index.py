@@ -0,0 +1,174 @@
+# iemap_mi/element_index.py
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Union
+
+from pydantic import BaseModel
+
+from iemap_mi.utils import get_field
+
+ProjectLike = Union[BaseModel, Dict[str, Any]]
+
+
+def _to_bitmap(positions: List[int], size: int) -> int:
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _positions(bitmap: int) -> Iterator[int]:
+    for byte_index, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")):
+        if byte:
+            for bit in range(8):
+                if byte >> bit & 1:
+                    yield byte_index * 8 + bit
+
+
+class ElementIndex:
+    """
+    In-memory inverted index of projects by element, for fast composition searches.
+
+    Every project gets a position; each element maps to a bitmap (a Python int used as a
+    bitset) of the positions of the projects containing it, so all/any/none-of queries are
+    bitwise AND/OR/NOT operations. Bitmaps by number of elements and a sorted formula list
+    support element-count ranges and formula-prefix lookups.
+
+    Example:
+        >>> index = ElementIndex(projects)
+        >>> lithium_oxides = index.search(all_of=["Li", "O"], none_of=["Co"], max_elements=3)
+    """
+
+    def __init__(self, projects: Optional[Iterable[ProjectLike]] = None) -> None:
+        """
+        Args:
+            projects (Optional[Iterable[ProjectLike]]): Project models or raw project dictionaries
+                (``material.elements`` and ``material.formula`` are indexed).
+        """
+        self.projects: List[ProjectLike] = []
+        self._element_positions: Dict[str, List[int]] = defaultdict(list)
+        self._count_positions: Dict[int, List[int]] = defaultdict(list)
+        self._formulas: List[tuple] = []
+        self._bitmaps: Optional[Dict[str, int]] = None
+        self._count_bitmaps: Optional[Dict[int, int]] = None
+        self._formulas_sorted = True
+        if projects is not None:
+            self.extend(projects)
+
+    def __len__(self) -> int:
+        return len(self.projects)
+
+    def add(self, project: ProjectLike) -> int:
+        """
+        Add a project to the index.
+
+        Args:
+            project (ProjectLike): Project model or raw project dictionary.
+
+        Returns:
+            int: Position of the project in the index.
+        """
+        position = len(self.projects)
+        self.projects.append(project)
+        material = get_field(project, "material")
+        elements = set(get_field(material, "elements") or [])
+        for element in elements:
+            self._element_positions[element].append(position)
+        self._count_positions[len(elements)].append(position)
+        formula = get_field(material, "formula")
+        if formula is not None:
+            self._formulas.append((formula, position))
+            self._formulas_sorted = False
+        self._bitmaps = None
+        self._count_bitmaps = None
+        return position
+
+    def extend(self, projects: Iterable[ProjectLike]) -> None:
+        """Add many projects to the index."""
+        for project in projects:
+            self.add(project)
+
+    def _build(self) -> None:
+        size = len(self.projects)
+        if self._bitmaps is None:
+            self._bitmaps = {element: _to_bitmap(positions, size)
+                             for element, positions in self._element_positions.items()}
+        if self._count_bitmaps is None:
+            self._count_bitmaps = {count: _to_bitmap(positions, size)
+                                   for count, positions in self._count_positions.items()}
+        if not self._formulas_sorted:
+            self._formulas.sort()
+            self._formulas_sorted = True
+
+    @property
+    def elements(self) -> List[str]:
+        """Return the indexed elements, sorted."""
+        return sorted(self._element_positions)
+
+    def element_counts(self) -> Dict[str, int]:
+        """Return the number of projects containing each element."""
+        return {element: len(positions) for element, positions in sorted(self._element_positions.items())}
+
+    def bitmap(
+            self,
+            all_of: Optional[Iterable[str]] = None,
+            any_of: Optional[Iterable[str]] = None,
+            none_of: Optional[Iterable[str]] = None,
+            min_elements: Optional[int] = None,
+            max_elements: Optional[int] = None,
+            formula_prefix: Optional[str] = None
+    ) -> int:
+        """
+        Return the bitmap of the projects matching all the given conditions.
+
+        Args:
+            all_of (Optional[Iterable[str]]): Elements that must all be present.
+            any_of (Optional[Iterable[str]]): Elements of which at least one must be present.
+            none_of (Optional[Iterable[str]]): Elements that must be absent.
+            min_elements (Optional[int]): Minimum number of distinct elements.
+            max_elements (Optional[int]): Maximum number of distinct elements.
+            formula_prefix (Optional[str]): Prefix of ``material.formula``.
+
+        Returns:
+            int: Bitmap of matching positions.
+        """
+        self._build()
+        result = (1 << len(self.projects)) - 1
+        for element in all_of or []:
+            result &= self._bitmaps.get(element, 0)
+        if any_of is not None:
+            matches = 0
+            for element in any_of:
+                matches |= self._bitmaps.get(element, 0)
+            result &= matches
+        for element in none_of or []:
+            result &= ~self._bitmaps.get(element, 0)
+        if min_elements is not None or max_elements is not None:
+            low = min_elements if min_elements is not None else 0
+            high = max_elements if max_elements is not None else max(self._count_bitmaps, default=0)
+            matches = 0
+            for count, count_bitmap in self._count_bitmaps.items():
+                if low <= count <= high:
+                    matches |= count_bitmap
+            result &= matches
+        if formula_prefix is not None:
+            start = bisect_left(self._formulas, (formula_prefix,))
+            positions = []
+            for formula, position in self._formulas[start:]:
+                if not formula.startswith(formula_prefix):
+                    break
+                positions.append(position)
+            result &= _to_bitmap(positions, len(self.projects))
+        return result
+
+    def positions(self, **conditions: Any) -> List[int]:
+        """Return the positions of the matching projects (see ``bitmap`` for the conditions)."""
+        return list(_positions(self.bitmap(**conditions)))
+
+    def count(self, **conditions: Any) -> int:
+        """Return the number of matching projects (see ``bitmap`` for the conditions)."""
+        return bin(self.bitmap(**conditions)).count("1")
+
+    def search(self, **conditions: Any) -> List[ProjectLike]:
+        """Return the matching projects in insertion order (see ``bitmap`` for the conditions)."""
+        return [self.projects[position] for position in _positions(self.bitmap(**conditions))]
@@ -7,8 +7,8 @@
 import asyncio
 # stdiomask is used to hide the password input
 import stdiomask
-# TypeAdapter is used to validate the project data
-from pydantic import TypeAdapter
+# validate_list validates the project data with a cached TypeAdapter
+from iemap_mi.validation import validate_list
 # Import the IemapMI class from the iemap_mi module
 from iemap_mi import IemapMI
 # typing is used to define the type hints
@@ -22,8 +22,9 @@ from iemap_mi.models import (IEMAPProject, Project, Material, Process, Agent,
 # - Add a file to a project
 from iemap_mi.project_handler import ProjectHandler
 
-# Import the flatten_project_data function from the iemap_mi.utils module to easily flatten project data for display
-from iemap_mi.utils import flatten_project_data
+# Import the ColumnarExporter class from the iemap_mi.export module to convert project data into columns
+# (Arrow tables or pandas DataFrames) for display and analysis
+from iemap_mi.export import ColumnarExporter
 
 # Import the PredictionType enumeration to use it in the get_prediction function
 from iemap_mi.ai_handler import PredictionType
@@ -60,6 +61,7 @@ async def iterate_projects(client: IemapMI, page_size: int = 40) -> None:
         or converts to a pandas DataFrame if pandas is available.
 
         This function fetches projects in pages, with each page containing up to `page_size` projects.
+        Pages are fetched concurrently using `ProjectHandler.fetch_all_projects`.
         It can optionally include email addresses in the output if `show_email` is True and the user has
         the necessary permissions.
 
@@ -84,36 +86,28 @@ async def iterate_projects(client: IemapMI, page_size: int = 40) -> None:
             asyncio.run(main())
         ```
         """
-    page_number = 1
-    all_projects: List[FlattenedProjectBase] = []
-    total_projects = None  # Initialize total_projects to None
-
-    while True:
-        projects_response = await client.project_handler.get_projects(page_size=page_size, page_number=page_number)
-        if not projects_response.data:
-            break
-
-        adapter = TypeAdapter(FlattenedProjectHashEmail)
-
-        projects = [adapter.validate_python(project) for project in projects_response.data]
-
-        all_projects.extend(projects)
-        page_number += 1
+    def report_progress(fetched: int, total: int) -> None:
+        if TQDM_AVAILABLE:
+            tqdm.write(f"Total projects so far: {fetched}/{total}")
 
-        if total_projects is None:
-            total_projects = projects_response.number_docs
+    # Pages are fetched concurrently (at most 4 at a time) and returned in order
+    raw_projects = await client.project_handler.fetch_all_projects(page_size=page_size, concurrency=4,
+                                                                   progress=report_progress)
 
-        if TQDM_AVAILABLE:
-            tqdm.write(f"Page {page_number - 1} fetched. Total projects so far: {len(all_projects)}/{total_projects}")
+    all_projects: List[FlattenedProjectBase] = validate_list(FlattenedProjectHashEmail, raw_projects)
 
     if PANDAS_AVAILABLE:
         # Set the option to display all columns
         pd.set_option('display.max_columns', None)
-        # Convert the projects to a pandas DataFrame
-        # df = pd.DataFrame([project.model_dump() for project in all_projects])
-        flat_projects = [flatten_project_data(project) for project in all_projects]
-        df = pd.DataFrame(flat_projects)
-        print(df)
+        # Convert the projects to pandas DataFrames using the columnar exporter:
+        # one frame for projects and long-format frames for parameters and properties
+        # (alternatively use `flatten_project_data` for one flat dictionary per project)
+        exporter = ColumnarExporter()
+        exporter.extend(all_projects)
+        frames = exporter.to_pandas()
+        print(frames["projects"])
+        print(frames["parameters"])
+        print(frames["properties"])
     else:
         # Print the projects as a list of dictionaries
         for project in all_projects:
@@ -263,8 +257,9 @@ async def main():
     # Also missing are parameters and properties, which are required fields
 
     # Build and validate the project payload
-    # as the payload is invalid, the function will return None and will
-    # print the error message that caused the payload to be invalid.
+    # as the payload is invalid, the function will return an empty dictionary and will
+    # log the error message that caused the payload to be invalid
+    # (pass `on_reject` to receive the errors as a RejectedRecord instead).
     # In this case, the error message is:
     #
     # Validation Error: The provided data is not valid.
@@ -365,6 +360,10 @@ async def main():
     # Finally an example of how to fetch statistics data from IEMAP DB
     client.stat_handler.get_stats()
 
+    # Release the pooled HTTP connections shared by all handlers
+    # (alternatively use the client as an async context manager: `async with IemapMI() as client:`)
+    await client.aclose()
+
     # to view all functionalities consult documentation at
     # https://iemap-mi-module.readthedocs.io/en/latest/iemap_mi.html
     # Note that current module is in development and not a stable release.
@@ -0,0 +1,263 @@
+# iemap_mi/export.py
+from array import array
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable, AsyncIterable, Union
+
+from pydantic import BaseModel
+
+from iemap_mi.utils import get_field
+
+# numpy, pyarrow and pandas are optional: columns are kept in plain Python buffers
+# and converted only when an Arrow or pandas output is requested
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import pandas as pd
+
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+LATTICE_FIELDS = ("a", "b", "c", "alpha", "beta", "gamma")
+
+STRING_COLUMNS = (
+    "identifier", "iemap_id", "provenance_affiliation", "provenance_email", "project_name", "project_label",
+    "project_description", "process_method", "process_agent_name", "process_agent_version", "material_formula",
+)
+TIMESTAMP_COLUMNS = ("provenance_created_at", "provenance_updated_at")
+STRUCTURE_PREFIXES = ("input", "output")
+FLOAT_COLUMNS = tuple(f"{prefix}_lattice_{field}" for prefix in STRUCTURE_PREFIXES for field in LATTICE_FIELDS)
+NESTED_COLUMNS = ("material_elements",) + tuple(
+    f"{prefix}_{field}" for prefix in STRUCTURE_PREFIXES for field in ("sites", "species", "cell"))
+LONG_COLUMNS = ("project_row", "iemap_id", "name", "value", "value_numeric", "unit")
+
+ProjectLike = Union[BaseModel, Dict[str, Any]]
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+class ColumnarExporter:
+    """
+    Columnar exporter for projects, an alternative to per-record ``flatten_project_data``.
+
+    Projects (validated models such as FlattenedProjectBase, or the raw dictionaries of
+    ``ProjectResponse.data``) are appended directly into column buffers: lattice parameters
+    are stored as float64 arrays, elements/species/sites/cell stay nested lists, and
+    parameters/properties are exploded into long-format tables (one row per entry, linked to
+    the project by ``project_row`` and ``iemap_id``) with both the raw and the numeric value.
+
+    Output is available as plain column dictionaries, Arrow tables (requires ``pyarrow``)
+    or pandas DataFrames (requires ``pandas``).
+
+    Example:
+        >>> exporter = ColumnarExporter()
+        >>> await exporter.consume(client.project_handler.iter_projects(page_size=500))
+        >>> tables = exporter.to_arrow()
+        >>> tables["parameters"].num_rows
+    """
+
+    def __init__(self) -> None:
+        self.projects: Dict[str, Any] = {}
+        for column in STRING_COLUMNS + TIMESTAMP_COLUMNS + NESTED_COLUMNS:
+            self.projects[column] = []
+        self.projects["process_is_experiment"] = []
+        for column in FLOAT_COLUMNS:
+            self.projects[column] = array("d")
+        self.parameters: Dict[str, Any] = self._long_table()
+        self.properties: Dict[str, Any] = self._long_table()
+        self.num_rows = 0
+
+    @staticmethod
+    def _long_table() -> Dict[str, Any]:
+        table: Dict[str, Any] = {column: [] for column in LONG_COLUMNS}
+        table["project_row"] = array("q")
+        table["value_numeric"] = array("d")
+        return table
+
+    def append(self, project: ProjectLike) -> None:
+        """
+        Append a single project to the column buffers.
+
+        Args:
+            project (ProjectLike): A project model or a raw project dictionary.
+        """
+        columns = self.projects
+        provenance = get_field(project, "provenance")
+        project_info = get_field(project, "project")
+        process = get_field(project, "process")
+        agent = get_field(process, "agent")
+        material = get_field(project, "material")
+        iemap_id = get_field(project, "iemap_id")
+
+        for column, value in (
+                ("identifier", get_field(project, "identifier")),
+                ("iemap_id", iemap_id),
+                ("provenance_affiliation", get_field(provenance, "affiliation")),
+                ("provenance_email", get_field(provenance, "email")),
+                ("project_name", get_field(project_info, "name")),
+                ("project_label", get_field(project_info, "label")),
+                ("project_description", get_field(project_info, "description")),
+                ("process_method", get_field(process, "method")),
+                ("process_agent_name", get_field(agent, "name")),
+                ("process_agent_version", get_field(agent, "version")),
+                ("material_formula", get_field(material, "formula")),
+        ):
+            columns[column].append(value)
+        columns["provenance_created_at"].append(_to_datetime(get_field(provenance, "createdAt")))
+        columns["provenance_updated_at"].append(_to_datetime(get_field(provenance, "updatedAt")))
+        columns["process_is_experiment"].append(get_field(process, "isExperiment"))
+        columns["material_elements"].append(list(get_field(material, "elements") or []))
+
+        for prefix in STRUCTURE_PREFIXES:
+            structure = get_field(material, prefix)
+            lattice = get_field(structure, "lattice")
+            for field in LATTICE_FIELDS:
+                columns[f"{prefix}_lattice_{field}"].append(_to_float(get_field(lattice, field)))
+            for field in ("sites", "species", "cell"):
+                value = get_field(structure, field)
+                columns[f"{prefix}_{field}"].append(list(value) if value is not None else None)
+
+        for table, entries in ((self.parameters, get_field(project, "parameters")),
+                               (self.properties, get_field(project, "properties"))):
+            for entry in entries or []:
+                value = get_field(entry, "value")
+                table["project_row"].append(self.num_rows)
+                table["iemap_id"].append(iemap_id)
+                table["name"].append(get_field(entry, "name"))
+                table["value"].append(None if value is None else str(value))
+                table["value_numeric"].append(_to_float(value))
+                table["unit"].append(get_field(entry, "unit"))
+
+        self.num_rows += 1
+
+    def extend(self, projects: Iterable[ProjectLike]) -> None:
+        """
+        Append a page (or any iterable) of projects.
+
+        Args:
+            projects (Iterable[ProjectLike]): Project models or raw project dictionaries.
+        """
+        for project in projects:
+            self.append(project)
+
+    async def consume(self, projects: AsyncIterable[ProjectLike]) -> None:
+        """
+        Append every project of an async stream, e.g. ``ProjectHandler.iter_projects``.
+
+        Args:
+            projects (AsyncIterable[ProjectLike]): Async iterable of projects.
+        """
+        async for project in projects:
+            self.append(project)
+
+    def to_columns(self) -> Dict[str, Dict[str, List[Any]]]:
+        """
+        Return the buffers as plain Python lists.
+
+        Returns:
+            Dict[str, Dict[str, List[Any]]]: ``projects``, ``parameters`` and ``properties`` tables.
+        """
+        return {name: {column: list(values) for column, values in table.items()}
+                for name, table in (("projects", self.projects), ("parameters", self.parameters),
+                                    ("properties", self.properties))}
+
+    @staticmethod
+    def _float_values(buffer: array) -> Any:
+        # zero-copy view of the float64 buffer when numpy is available
+        return np.frombuffer(buffer, dtype=np.float64) if NUMPY_AVAILABLE else list(buffer)
+
+    def to_arrow(self) -> Dict[str, "pa.Table"]:
+        """
+        Return the buffers as typed Arrow tables.
+
+        Returns:
+            Dict[str, pa.Table]: ``projects``, ``parameters`` and ``properties`` tables.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for Arrow export: pip install pyarrow")
+
+        nested_types = {
+            "material_elements": pa.list_(pa.string()),
+            "input_species": pa.list_(pa.string()),
+            "output_species": pa.list_(pa.string()),
+        }
+        projects = {}
+        for column, values in self.projects.items():
+            if column in FLOAT_COLUMNS:
+                projects[column] = pa.array(self._float_values(values), type=pa.float64())
+            elif column in TIMESTAMP_COLUMNS:
+                projects[column] = pa.array(values, type=pa.timestamp("us"))
+            elif column == "process_is_experiment":
+                projects[column] = pa.array(values, type=pa.bool_())
+            elif column in nested_types:
+                projects[column] = pa.array(values, type=nested_types[column])
+            elif column in NESTED_COLUMNS:
+                projects[column] = pa.array(values, type=pa.list_(pa.list_(pa.float64())))
+            else:
+                projects[column] = pa.array(values, type=pa.string())
+
+        tables = {"projects": pa.table(projects)}
+        for name, table in (("parameters", self.parameters), ("properties", self.properties)):
+            tables[name] = pa.table({
+                "project_row": pa.array(list(table["project_row"]), type=pa.int64()),
+                "iemap_id": pa.array(table["iemap_id"], type=pa.string()),
+                "name": pa.array(table["name"], type=pa.string()),
+                "value": pa.array(table["value"], type=pa.string()),
+                "value_numeric": pa.array(self._float_values(table["value_numeric"]), type=pa.float64()),
+                "unit": pa.array(table["unit"], type=pa.string()),
+            })
+        return tables
+
+    def to_pandas(self) -> Dict[str, "pd.DataFrame"]:
+        """
+        Return the buffers as pandas DataFrames (through Arrow when pyarrow is installed).
+
+        Returns:
+            Dict[str, pd.DataFrame]: ``projects``, ``parameters`` and ``properties`` frames.
+
+        Raises:
+            ImportError: If pandas is not installed.
+        """
+        if not PANDAS_AVAILABLE:
+            raise ImportError("pandas is required for DataFrame export: pip install pandas")
+        if PYARROW_AVAILABLE:
+            return {name: table.to_pandas() for name, table in self.to_arrow().items()}
+
+        frames = {}
+        for name, table in (("projects", self.projects), ("parameters", self.parameters),
+                            ("properties", self.properties)):
+            frames[name] = pd.DataFrame({
+                column: self._float_values(values) if isinstance(values, array) and values.typecode == "d"
+                else list(values)
+                for column, values in table.items()
+            })
+        return frames
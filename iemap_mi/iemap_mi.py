@@ -2,12 +2,19 @@
 import asyncio
 import logging
 import httpx
-from typing import Optional, Dict, Any
+from types import TracebackType
+from typing import Optional, Dict, Any, Type
 from iemap_mi.project_handler import ProjectHandler
 from iemap_mi.iemap_stat import IemapStat
 from iemap_mi.ai_handler import AIHandler
 from iemap_mi.__version__ import __version__
 from iemap_mi.settings import settings
+from iemap_mi.utils import build_async_client
+from iemap_mi.cache import ResponseCache, PredictionCache
+from iemap_mi.request_layer import RequestLayer, RetryPolicy, CircuitBreaker
+from iemap_mi.rate_limiter import RateLimiter
+from iemap_mi.metrics import MetricsRecorder
+from iemap_mi.auth import AuthManager, TokenFileCache
 
 
 class IemapMI:
@@ -15,51 +22,151 @@ class IemapMI:
 IemapMI is a class designed to interact with the Iemap Management Interface (IEMI) API.
 It provides functionalities to authenticate users, handle projects, and gather statistical data.
 
+A single pooled httpx.AsyncClient is owned by the instance and shared by all handlers, so
+connections (DNS, TCP and TLS setup) are reused across requests. Use the instance as an async
+context manager (``async with IemapMI() as client:``) or call ``aclose()`` to release the pool.
+
 Attributes:
     token (Optional[str]): JWT token for authenticated API access. Initially None until authentication.
+    client (httpx.AsyncClient): Pooled HTTP client shared by all handlers.
+    cache (Optional[ResponseCache]): Opt-in cache for read-only endpoints (project list/query, stats).
+    request_layer (RequestLayer): Rate limiter, retry policy and circuit breaker applied to every request.
+    auth (AuthManager): Keeps the JWT token fresh: proactive refresh, single replay on 401, shared token cache.
+    metrics (MetricsRecorder): Per-endpoint latency histograms and counters; register hooks to export them.
     project_handler (ProjectHandler): Handles project-related operations.
     stat_handler (IemapStat): Handles statistical data operations.
+    ai_handler (AIHandler): Handles AI-related operations.
 
 Methods:
-    __init__: Initializes the IemapMI instance with default values.
+    __init__: Initializes the IemapMI instance and its shared HTTP client.
     authenticate: Authenticates a user with the IEMI API and stores the JWT token.
+    aclose: Closes the shared HTTP client (if owned by the instance).
+    histograms: Returns the latency histograms of every endpoint called.
     handle_exception: Static method to handle exceptions in asyncio event loops.
     print_version: Static method to print the version of the IemapMI module.
 """
-    def __init__(self) -> None:
+    def __init__(
+            self,
+            timeout: float = settings.HTTP_TIMEOUT,
+            connect_timeout: float = settings.HTTP_CONNECT_TIMEOUT,
+            max_connections: int = settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections: int = settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry: float = settings.HTTP_KEEPALIVE_EXPIRY,
+            http2: bool = settings.HTTP2,
+            client: Optional[httpx.AsyncClient] = None,
+            cache: Optional[ResponseCache] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            circuit_breaker: Optional[CircuitBreaker] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            metrics: Optional[MetricsRecorder] = None,
+            compression: Optional[str] = settings.REQUEST_COMPRESSION,
+            token_cache: Optional[TokenFileCache] = None,
+            refresh_margin: float = settings.AUTH_REFRESH_MARGIN
+    ) -> None:
         """
-        Initialize IemapMI with base URL.
+        Initialize IemapMI and the HTTP client shared by all handlers.
 
         Args:
-            base_url (HttpUrl): Base URL for the API.
+            timeout (float): Read/write/pool timeout in seconds.
+            connect_timeout (float): Connection timeout in seconds.
+            max_connections (int): Maximum number of concurrent connections.
+            max_keepalive_connections (int): Maximum number of idle connections kept alive.
+            keepalive_expiry (float): Seconds an idle connection is kept in the pool.
+            http2 (bool): Enable HTTP/2 (requires the optional ``h2`` package).
+            client (Optional[httpx.AsyncClient]): Externally managed client to use instead of
+                building one. An external client is not closed by ``aclose()``.
+            cache (Optional[ResponseCache]): Cache for read-only endpoints, also used as persistent
+                backing for geoCGNN predictions. Defaults to None (no caching).
+            retry_policy (Optional[RetryPolicy]): Retry/backoff policy for all requests.
+                Defaults to the settings defaults; use ``RetryPolicy(max_attempts=1)`` to disable retries.
+            circuit_breaker (Optional[CircuitBreaker]): Circuit breaker shared by all requests.
+                Defaults to the settings defaults.
+            rate_limiter (Optional[RateLimiter]): Token buckets per endpoint class shared by all
+                handlers. Defaults to no limits.
+            metrics (Optional[MetricsRecorder]): Recorder of the request metrics, e.g. with hooks
+                already registered. Defaults to a new recorder.
+            compression (Optional[str]): Content coding (``"gzip"``, ``"br"`` or ``"zstd"``) of large
+                request bodies (project payloads, predictions and text file uploads), for servers
+                that accept compressed requests. Defaults to None. Responses are always negotiated.
+            token_cache (Optional[TokenFileCache]): File sharing the JWT token with other processes
+                of the same user, so parallel jobs log in once. Defaults to None (memory only).
+            refresh_margin (float): Seconds before expiry at which the JWT token is refreshed.
         """
+        self._owns_client = client is None
+        self.client: httpx.AsyncClient = client if client is not None else build_async_client(
+            timeout=timeout,
+            connect_timeout=connect_timeout,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            http2=http2
+        )
 
+        self.cache = cache
+        self.request_layer = RequestLayer(self.client, retry_policy=retry_policy, circuit_breaker=circuit_breaker,
+                                          rate_limiter=rate_limiter, metrics=metrics, compression=compression)
+        self.metrics = self.request_layer.metrics
+        self.auth = AuthManager(self.request_layer, refresh_margin=refresh_margin, token_cache=token_cache)
+        self.auth.add_listener(self._set_token)
         self.token: Optional[str] = None
-        self.project_handler = ProjectHandler(self.token)
-        self.stat_handler = IemapStat(self.token)
-        self.ai_handler = AIHandler()
+        self.project_handler = ProjectHandler(self.token, client=self.client, cache=self.cache,
+                                              request_layer=self.request_layer)
+        self.stat_handler = IemapStat(self.token, client=self.client, cache=self.cache,
+                                      request_layer=self.request_layer)
+        self.ai_handler = AIHandler(
+            client=self.client,
+            prediction_cache=PredictionCache(store=self.cache) if self.cache is not None else None,
+            request_layer=self.request_layer
+        )
+
+    async def __aenter__(self) -> "IemapMI":
+        return self
+
+    async def __aexit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc_value: Optional[BaseException],
+            traceback: Optional[TracebackType]
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close the shared HTTP client and release pooled connections.
+        """
+        if self._owns_client:
+            await self.client.aclose()
 
-    async def authenticate(self, username: str, password: str) -> None:
+    def histograms(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Return the latency histograms (total and server time) of every endpoint called.
+
+        Returns:
+            Dict[str, Dict[str, Dict[str, Any]]]: Histogram snapshots keyed by ``"METHOD /path"``
+            (see ``MetricsRecorder.histograms``).
+        """
+        return self.metrics.histograms()
+
+    async def authenticate(self, username: str, password: str, use_cache: bool = True) -> None:
         """
            Authenticate the user and obtain a JWT token.
 
+           The credentials are kept by ``auth`` to refresh the token before it expires, so
+           long jobs do not fail with 401 when the token lapses.
+
            Args:
                username (str): Username for authentication.
                password (str): Password for authentication.
+               use_cache (bool): Reuse a valid token of the same user from the token cache, if any.
+                   Defaults to True.
            """
-        endpoint = settings.AUTH_JWT_LOGIN
-        data = {
-            'username': username,
-            'password': password
-        }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(endpoint, data=data)
-            response.raise_for_status()
-            self.token = response.json().get('access_token')
-            # Update the token in the project and stat handlers
-            self.project_handler.token = self.token
-            self.stat_handler.token = self.token
+        await self.auth.login(username, password, use_cache=use_cache)
+
+    def _set_token(self, token: Optional[str]) -> None:
+        # Update the token in the project and stat handlers
+        self.token = token
+        self.project_handler.token = token
+        self.stat_handler.token = token
 
     @staticmethod
     def handle_exception(loop: asyncio.AbstractEventLoop, context: Dict[str, Any]) -> None:
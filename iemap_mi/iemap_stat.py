@@ -1,33 +1,51 @@
 from typing import Optional, Dict, Any
 import httpx
 from iemap_mi.models import StatsResponse
-from iemap_mi.utils import get_headers
+from iemap_mi.utils import get_headers, build_async_client
 from iemap_mi.settings import settings
+from iemap_mi.cache import ResponseCache, cached_get_bytes
+from iemap_mi.request_layer import RequestLayer
+from iemap_mi.rate_limiter import EndpointClass
+from iemap_mi.metrics import endpoint_label
 
 
 class IemapStat:
-    def __init__(self, token: Optional[str] = None) -> None:
+    def __init__(self, token: Optional[str] = None, client: Optional[httpx.AsyncClient] = None,
+                 cache: Optional[ResponseCache] = None, request_layer: Optional[RequestLayer] = None) -> None:
         """
-        Initialize IemapStat with base URL and JWT token.
+        Initialize IemapStat with JWT token and shared HTTP client.
 
         Args:
 
             token (Optional[str]): JWT token for authentication. Defaults to None.
+            client (Optional[httpx.AsyncClient]): Pooled HTTP client shared with the other handlers.
+                Defaults to a new client built with the settings defaults.
+            cache (Optional[ResponseCache]): Cache for statistics responses. Defaults to None (no caching).
+            request_layer (Optional[RequestLayer]): Request layer (retries, circuit breaker) shared
+                with the other handlers. Defaults to a new one wrapping ``client``.
         """
 
         self.token = token
+        self.client = client if client is not None else build_async_client()
+        self.cache = cache
+        self.request_layer = request_layer if request_layer is not None else RequestLayer(self.client)
 
     async def get_stats(self) -> StatsResponse:
         """
         Get statistics from the API.
 
+        Concurrent calls share a single request and receive the same StatsResponse object.
+
         Returns:
             StatsResponse: Response containing statistics data.
         """
         endpoint = settings.STATS
         headers = get_headers(self.token)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(endpoint, headers=headers)
-            response.raise_for_status()
-            return StatsResponse(**response.json())
+        async def fetch() -> StatsResponse:
+            body = await cached_get_bytes(self.request_layer, endpoint, headers=headers, cache=self.cache,
+                                          token=self.token, endpoint_class=EndpointClass.OTHER)
+            return StatsResponse.model_validate_json(body)
+
+        return await self.request_layer.coalescer.run(("GET", endpoint, self.token), fetch,
+                                                      endpoint=endpoint_label(endpoint))
@@ -0,0 +1,315 @@
+# iemap_mi/metrics.py
+import bisect
+import logging
+import time
+from collections import defaultdict
+from typing import Optional, Dict, Any, List, Callable, Iterable, Tuple
+
+import httpx
+
+from iemap_mi.__version__ import __version__
+from iemap_mi.models import RequestEvent
+from iemap_mi.settings import settings
+
+# opentelemetry is optional: install opentelemetry-api (and an SDK/exporter) to use OpenTelemetryHook
+try:
+    from opentelemetry import metrics as otel_metrics
+
+    OPENTELEMETRY_AVAILABLE = True
+except ImportError:
+    OPENTELEMETRY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MetricsHook = Callable[[RequestEvent], None]
+
+
+def endpoint_label(url: Any) -> str:
+    """Return the path of a URL, used to group metrics by endpoint."""
+    return httpx.URL(str(url)).path
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed bucket bounds (Prometheus style).
+
+    Attributes:
+        bounds (Tuple[float, ...]): Upper bounds of the buckets; a final +Inf bucket is implicit.
+        counts (List[int]): Number of observations per bucket (not cumulative).
+        count (int): Total number of observations.
+        sum (float): Sum of the observed values.
+    """
+
+    def __init__(self, bounds: Iterable[float] = settings.METRICS_LATENCY_BUCKETS) -> None:
+        self.bounds: Tuple[float, ...] = tuple(sorted(bounds))
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add an observation."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile by linear interpolation inside the bucket that contains it.
+
+        Args:
+            q (float): Quantile between 0 and 1, e.g. 0.99.
+
+        Returns:
+            Optional[float]: Estimated value, None without observations. Values in the +Inf
+            bucket are reported as the largest finite bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                if index == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.bounds[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return count, sum, mean, p50/p90/p99 and the cumulative bucket counts."""
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += bucket_count
+            buckets[bound] = cumulative
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+class MetricsRecorder:
+    """
+    Aggregates the RequestEvent of every API call and forwards it to hooks.
+
+    Latency histograms (total and server time) are kept per ``"METHOD /path"`` endpoint,
+    together with counters of requests by status, retries, cache hits, bytes and calls
+    coalesced into an identical request already in flight.
+    Hooks are called synchronously with each event; exceptions raised by a hook are
+    logged and never affect the request.
+
+    Example:
+        >>> client = IemapMI()
+        >>> client.metrics.add_hook(lambda event: print(event.endpoint, event.status, event.duration))
+        >>> ...
+        >>> client.histograms()["GET /rest/api/v1/project/query/"]["duration"]["p99"]
+        >>> print(client.metrics.to_prometheus())
+    """
+
+    def __init__(self, bounds: Iterable[float] = settings.METRICS_LATENCY_BUCKETS,
+                 hooks: Optional[Iterable[MetricsHook]] = None) -> None:
+        """
+        Args:
+            bounds (Iterable[float]): Upper bounds (seconds) of the latency histogram buckets.
+            hooks (Optional[Iterable[MetricsHook]]): Callables receiving each RequestEvent.
+        """
+        self.bounds = tuple(bounds)
+        self.hooks: List[MetricsHook] = list(hooks or [])
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all the aggregated metrics (hooks are kept)."""
+        self.durations: Dict[str, Histogram] = defaultdict(lambda: Histogram(self.bounds))
+        self.server_times: Dict[str, Histogram] = defaultdict(lambda: Histogram(self.bounds))
+        self.requests: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.retries: Dict[str, int] = defaultdict(int)
+        self.cache_hits: Dict[str, int] = defaultdict(int)
+        self.bytes_sent: Dict[str, int] = defaultdict(int)
+        self.bytes_received: Dict[str, int] = defaultdict(int)
+        self.coalesced: Dict[str, int] = defaultdict(int)
+
+    def add_hook(self, hook: MetricsHook) -> None:
+        """Register a callable receiving each RequestEvent."""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: MetricsHook) -> None:
+        """Unregister a hook."""
+        self.hooks.remove(hook)
+
+    def record(self, event: RequestEvent) -> None:
+        """
+        Aggregate an event and pass it to the hooks.
+
+        Args:
+            event (RequestEvent): Instrumentation record of a call.
+        """
+        key = f"{event.method} {event.endpoint}"
+        self.durations[key].observe(event.duration)
+        if event.server_time is not None:
+            self.server_times[key].observe(event.server_time)
+        self.requests[(key, str(event.status) if event.status is not None else event.error or "error")] += 1
+        self.retries[key] += event.attempts - 1
+        self.cache_hits[key] += event.cache_hit
+        self.bytes_sent[key] += event.bytes_sent
+        self.bytes_received[key] += event.bytes_received
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.exception(f"Metrics hook {hook!r} failed")
+
+    def record_coalesced(self, method: str, endpoint: str) -> None:
+        """Count a call served by an identical request already in flight (no event is recorded)."""
+        self.coalesced[f"{method} {endpoint}"] += 1
+
+    def histograms(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Return the latency histograms of every endpoint.
+
+        Returns:
+            Dict[str, Dict[str, Dict[str, Any]]]: ``{"METHOD /path": {"duration": ..., "server_time": ...}}``
+            with the ``Histogram.snapshot`` of each.
+        """
+        return {key: {"duration": histogram.snapshot(), "server_time": self.server_times[key].snapshot()}
+                for key, histogram in sorted(self.durations.items())}
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Return counters and latency percentiles of every endpoint."""
+        summary: Dict[str, Dict[str, Any]] = {}
+        for key, histogram in sorted(self.durations.items()):
+            summary[key] = {
+                "requests": histogram.count,
+                "statuses": {status: n for (endpoint, status), n in self.requests.items() if endpoint == key},
+                "retries": self.retries[key],
+                "cache_hits": self.cache_hits[key],
+                "bytes_sent": self.bytes_sent[key],
+                "bytes_received": self.bytes_received[key],
+                "coalesced": self.coalesced[key],
+                "p50": histogram.quantile(0.5),
+                "p99": histogram.quantile(0.99),
+            }
+        return summary
+
+    def to_prometheus(self, prefix: str = "iemap_mi") -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): Metric name prefix. Defaults to ``"iemap_mi"``.
+
+        Returns:
+            str: Exposition text, e.g. to serve from a ``/metrics`` endpoint or a textfile collector.
+        """
+        lines: List[str] = []
+
+        def labels(key: str, **extra: str) -> str:
+            method, endpoint = key.split(" ", 1)
+            pairs = {"method": method, "endpoint": endpoint, **extra}
+            return "{" + ",".join(f'{name}="{value}"' for name, value in pairs.items()) + "}"
+
+        for name, histograms in (("request_duration_seconds", self.durations),
+                                 ("server_time_seconds", self.server_times)):
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for key, histogram in sorted(histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.bounds + (float("inf"),), histogram.counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{prefix}_{name}_bucket{labels(key, le=le)} {cumulative}")
+                lines.append(f"{prefix}_{name}_sum{labels(key)} {histogram.sum}")
+                lines.append(f"{prefix}_{name}_count{labels(key)} {histogram.count}")
+
+        lines.append(f"# TYPE {prefix}_requests_total counter")
+        for (key, status), count in sorted(self.requests.items()):
+            lines.append(f"{prefix}_requests_total{labels(key, status=status)} {count}")
+        for name, counters in (("retries_total", self.retries), ("cache_hits_total", self.cache_hits),
+                               ("bytes_sent_total", self.bytes_sent), ("bytes_received_total", self.bytes_received),
+                               ("coalesced_total", self.coalesced)):
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, count in sorted(counters.items()):
+                lines.append(f"{prefix}_{name}{labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryHook:
+    """
+    Metrics hook recording each RequestEvent with OpenTelemetry instruments.
+
+    Requires ``opentelemetry-api``; configure a MeterProvider (SDK and exporter) in the
+    application to actually export the data.
+
+    Example:
+        >>> client.metrics.add_hook(OpenTelemetryHook())
+    """
+
+    def __init__(self, meter: Any = None) -> None:
+        """
+        Args:
+            meter (Any): OpenTelemetry Meter. Defaults to ``metrics.get_meter("iemap_mi")``.
+
+        Raises:
+            ImportError: If opentelemetry-api is not installed.
+        """
+        if not OPENTELEMETRY_AVAILABLE:
+            raise ImportError("opentelemetry-api is required for OpenTelemetryHook: pip install opentelemetry-api")
+        meter = meter if meter is not None else otel_metrics.get_meter("iemap_mi", __version__)
+        self.duration = meter.create_histogram("iemap_mi.client.request.duration", unit="s",
+                                               description="Duration of IEMAP API calls")
+        self.server_time = meter.create_histogram("iemap_mi.client.server.time", unit="s",
+                                                  description="Time from request sent to response headers")
+        self.retries = meter.create_counter("iemap_mi.client.retries", description="Retried attempts")
+        self.bytes_received = meter.create_counter("iemap_mi.client.bytes_received", unit="By")
+        self.bytes_sent = meter.create_counter("iemap_mi.client.bytes_sent", unit="By")
+
+    def __call__(self, event: RequestEvent) -> None:
+        attributes = {
+            "http.request.method": event.method,
+            "url.path": event.endpoint,
+            "http.response.status_code": event.status if event.status is not None else 0,
+            "iemap_mi.endpoint_class": event.endpoint_class or "",
+            "iemap_mi.cache_hit": event.cache_hit,
+        }
+        self.duration.record(event.duration, attributes)
+        if event.server_time is not None:
+            self.server_time.record(event.server_time, attributes)
+        self.retries.add(event.attempts - 1, attributes)
+        self.bytes_received.add(event.bytes_received, attributes)
+        self.bytes_sent.add(event.bytes_sent, attributes)
+
+
+class RequestTrace:
+    """
+    httpcore ``trace`` extension collecting connect, TLS and server timings of an attempt.
+    """
+
+    def __init__(self) -> None:
+        self.started: Dict[str, float] = {}
+        self.timings: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        # event names look like "connection.connect_tcp.started" or "http11.receive_response_headers.complete"
+        name, _, stage = event_name.rpartition(".")
+        step = name.rpartition(".")[2]
+        if stage == "started":
+            self.started[step] = time.perf_counter()
+        elif stage in ("complete", "failed") and step in self.started:
+            self.timings[step] = time.perf_counter() - self.started.pop(step)
+
+    @property
+    def connect_time(self) -> Optional[float]:
+        return self.timings.get("connect_tcp")
+
+    @property
+    def tls_time(self) -> Optional[float]:
+        return self.timings.get("start_tls")
+
+    @property
+    def server_time(self) -> Optional[float]:
+        return self.timings.get("receive_response_headers")
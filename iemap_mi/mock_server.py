@@ -0,0 +1,297 @@
+# iemap_mi/mock_server.py
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+from urllib.parse import parse_qs
+
+import httpx
+
+from iemap_mi.compression import available_encodings, compress_bytes, decompress_bytes
+from iemap_mi.metrics import endpoint_label
+from iemap_mi.settings import settings
+
+ELEMENTS = ("Li", "Na", "K", "Mg", "Fe", "Co", "Ni", "Mn", "P", "S", "O", "F", "C", "N", "Si", "Ti")
+AFFILIATIONS = ("ENEA", "CNR", "IIT", "UNIBO", "POLITO")
+METHODS = (("DFT", "VASP", False), ("MD", "LAMMPS", False), ("XRD", "Bruker D8", True),
+           ("Karl-Fischer titration", "Mettler Toledo", True))
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def make_jwt(subject: str, expires_in: float) -> str:
+    """
+    Build an unsigned JWT with ``sub`` and ``exp`` claims, as issued by the mock server.
+
+    Args:
+        subject (str): Value of the ``sub`` claim.
+        expires_in (float): Seconds until expiry.
+
+    Returns:
+        str: Encoded token.
+    """
+    header = _b64url(json.dumps({"alg": "none", "typ": "JWT"}).encode())
+    payload = _b64url(json.dumps({"sub": subject, "exp": int(time.time() + expires_in)}).encode())
+    return f"{header}.{payload}.{_b64url(hashlib.sha256(payload.encode()).digest())}"
+
+
+class MockIemapServer:
+    """
+    In-process stand-in for the IEMAP REST API and the geoCGNN endpoint.
+
+    The server is an async handler for ``httpx.MockTransport``: no socket is opened, so
+    benchmarks and tests measure the client alone, reproducibly. It emulates login,
+    project list/query/add, file upload, statistics and predictions over a synthetic
+    catalog, with configurable latency, payload size and error rate. Like the real server it
+    honors ``fields_output`` projections, compresses large responses with the best coding
+    offered in ``Accept-Encoding`` and accepts compressed request bodies.
+
+    Attributes:
+        projects (List[Dict[str, Any]]): Synthetic catalog, in list-endpoint format.
+        requests (Dict[str, int]): Number of requests received per URL path.
+        uploaded_bytes (int): Total size of the upload request bodies, as received (possibly compressed).
+
+    Example:
+        >>> server = MockIemapServer(n_projects=1000, latency=0.02, error_rate=0.01)
+        >>> async with IemapMI(client=httpx.AsyncClient(transport=server.transport())) as client:
+        ...     await client.authenticate("user", "password")
+        ...     projects = await client.project_handler.fetch_all_projects(page_size=100)
+    """
+
+    def __init__(
+            self,
+            n_projects: int = 1000,
+            sites: int = 8,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            error_rate: float = 0.0,
+            token_ttl: float = 3600.0,
+            seed: int = 0
+    ) -> None:
+        """
+        Args:
+            n_projects (int): Number of projects in the synthetic catalog. Defaults to 1000.
+            sites (int): Number of sites of each project structure, controlling the payload size. Defaults to 8.
+            latency (float): Fixed delay in seconds added to every response. Defaults to 0.
+            jitter (float): Maximum random delay in seconds added to the latency. Defaults to 0.
+            error_rate (float): Probability of answering 503 instead of serving a request. Defaults to 0.
+            token_ttl (float): Lifetime in seconds of the issued JWT tokens. Defaults to 3600.
+            seed (int): Seed of the data and error generators. Defaults to 0.
+        """
+        if not 0 <= error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self._random = random.Random(seed)
+        self.projects: List[Dict[str, Any]] = [self._make_project(index, sites) for index in range(n_projects)]
+        self.requests: Dict[str, int] = {}
+        self.uploaded_bytes = 0
+        self._inserted = 0
+        self._routes = {
+            ("POST", endpoint_label(settings.AUTH_JWT_LOGIN)): self._login,
+            ("GET", endpoint_label(settings.PROJECT_LIST)): self._list,
+            ("GET", endpoint_label(settings.PROJECT_QUERY)): self._query,
+            ("POST", endpoint_label(settings.PROJECT_ADD)): self._add,
+            ("POST", endpoint_label(settings.ADD_FILE_TO_PROJECT)): self._add_file,
+            ("GET", endpoint_label(settings.STATS)): self._stats,
+            ("POST", endpoint_label(f"{settings.AI_GEOCGNN}ai_materials:predict_what")): self._predict,
+        }
+
+    def _make_project(self, index: int, sites: int) -> Dict[str, Any]:
+        rnd = self._random
+        elements = rnd.sample(ELEMENTS, rnd.randint(2, 5))
+        method, agent, is_experiment = rnd.choice(METHODS)
+        created = datetime(2023, 1, 1) + timedelta(hours=index)
+        lattice = {field: f"{rnd.uniform(3, 12):.4f}" for field in ("a", "b", "c")}
+        lattice.update(alpha="90.0", beta="90.0", gamma=rnd.choice(["90.0", "120.0"]))
+        return {
+            "identifier": None,
+            "iemap_id": f"iemap-{index:07d}",
+            "provenance": {"affiliation": rnd.choice(AFFILIATIONS), "email": f"user{index % 97}@enea.it",
+                           "createdAt": created.isoformat(), "updatedAt": created.isoformat()},
+            "project": {"name": "Materials for Batteries", "label": "MB", "description": "IEMAP project"},
+            "process": {"method": method, "agent": {"name": agent, "version": "1.0"}, "isExperiment": is_experiment},
+            "material": {
+                "formula": "".join(f"{element}{rnd.randint(1, 4)}" for element in elements),
+                "elements": elements,
+                "input": {
+                    "lattice": lattice,
+                    "sites": [[round(rnd.random(), 6) for _ in range(3)] for _ in range(sites)],
+                    "species": [rnd.choice(elements) for _ in range(sites)],
+                    "cell": [[float(lattice["a"]), 0.0, 0.0], [0.0, float(lattice["b"]), 0.0],
+                             [0.0, 0.0, float(lattice["c"])]],
+                },
+            },
+            "parameters": [{"name": "temperature", "value": rnd.choice([300, 500, 800]), "unit": "K"}],
+            "properties": [{"name": "energy", "value": f"{rnd.uniform(-10, 0):.3f}", "unit": "eV"}],
+        }
+
+    @staticmethod
+    def _query_document(project: Dict[str, Any]) -> Dict[str, Any]:
+        document = {key: value for key, value in project.items() if key != "identifier"}
+        document["provenance"] = {**project["provenance"], "email": "****"}
+        document["files"] = []
+        return document
+
+    def transport(self) -> httpx.MockTransport:
+        """Return an httpx transport routing requests to the mock server."""
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """
+        Serve a request.
+
+        Args:
+            request (httpx.Request): Request sent by the client.
+
+        Returns:
+            httpx.Response: Emulated response (404 for unknown endpoints).
+        """
+        path = request.url.path
+        self.requests[path] = self.requests.get(path, 0) + 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        await request.aread()
+        wire_size = len(request.content)
+        if "Content-Encoding" in request.headers:
+            headers = {key: value for key, value in request.headers.items()
+                       if key.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+            request = httpx.Request(request.method, request.url, headers=headers,
+                                    content=decompress_bytes(request.content, request.headers["Content-Encoding"]))
+        if path == endpoint_label(settings.ADD_FILE_TO_PROJECT):
+            self.uploaded_bytes += wire_size
+        if self.error_rate and self._random.random() < self.error_rate:
+            return httpx.Response(503, json={"detail": "Service temporarily unavailable"})
+        route = self._routes.get((request.method, path))
+        if route is None:
+            return httpx.Response(404, json={"detail": "Not Found"})
+        return self._encode(request, route(request))
+
+    @staticmethod
+    def _encode(request: httpx.Request, response: httpx.Response) -> httpx.Response:
+        # the body is returned as a stream, so the client reads (and counts) it as on a real connection
+        accepted = {coding.split(";")[0].strip() for coding in request.headers.get("Accept-Encoding", "").split(",")}
+        encoding = next((coding for coding in available_encodings() if coding in accepted), None)
+        body = response.content
+        headers = {"Content-Type": response.headers.get("Content-Type", "application/json")}
+        if encoding is not None and len(body) >= 1024:
+            body = compress_bytes(body, encoding)
+            headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(body))
+        return httpx.Response(response.status_code, headers=headers, stream=httpx.ByteStream(body))
+
+    def _authorized(self, request: httpx.Request) -> bool:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme != "Bearer" or token.count(".") != 2:
+            return False
+        try:
+            payload = token.split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except ValueError:
+            return False
+        return claims.get("exp", 0) > time.time()
+
+    def _login(self, request: httpx.Request) -> httpx.Response:
+        form = {key: values[0] for key, values in parse_qs(request.content.decode()).items()}
+        if not form.get("username") or not form.get("password"):
+            return httpx.Response(400, json={"detail": "LOGIN_BAD_CREDENTIALS"})
+        return httpx.Response(200, json={"access_token": make_jwt(form["username"], self.token_ttl),
+                                         "token_type": "bearer"})
+
+    def _list(self, request: httpx.Request) -> httpx.Response:
+        page_size = int(request.url.params.get("page_size", 10))
+        page_number = int(request.url.params.get("page_number", 1))
+        skip = (page_number - 1) * page_size
+        return httpx.Response(200, json={
+            "skip": skip,
+            "page_size": page_size,
+            "page_number": page_number,
+            "page_tot": -(-len(self.projects) // page_size),
+            "number_docs": len(self.projects),
+            "data": self.projects[skip:skip + page_size],
+        })
+
+    def _query(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        matches = self.projects
+        if "isExperiment" in params:
+            is_experiment = params["isExperiment"].lower() == "true"
+            matches = [p for p in matches if p["process"]["isExperiment"] == is_experiment]
+        if "material_any_element" in params:
+            wanted = set(params["material_any_element"].split(","))
+            matches = [p for p in matches if wanted & set(p["material"]["elements"])]
+        if "affiliation" in params:
+            matches = [p for p in matches if p["provenance"]["affiliation"] == params["affiliation"]]
+        if "start_date" in params:
+            matches = [p for p in matches if p["provenance"]["updatedAt"] >= params["start_date"]]
+        skip = int(params.get("skip", 0))
+        limit = int(params.get("limit", 100))
+        documents = [self._query_document(p) for p in matches[skip:skip + limit]]
+        fields_output = params.get("fields_output", "all")
+        if fields_output != "all":
+            documents = [self._project(document, fields_output.split(",")) for document in documents]
+        return httpx.Response(200, json=documents)
+
+    @classmethod
+    def _project(cls, document: Any, paths: List[str]) -> Any:
+        # MongoDB-style projection of dotted paths, applied to each item of embedded arrays
+        if isinstance(document, list):
+            return [cls._project(item, paths) for item in document]
+        if not isinstance(document, dict):
+            return document
+        selected: Dict[str, List[str]] = {}
+        for path in paths:
+            key, _, rest = path.partition(".")
+            if key in document:
+                selected.setdefault(key, []).append(rest)
+        return {key: document[key] if "" in rests else cls._project(document[key], rests)
+                for key, rests in selected.items()}
+
+    def _add(self, request: httpx.Request) -> httpx.Response:
+        if not self._authorized(request):
+            return httpx.Response(401, json={"detail": "Unauthorized"})
+        payload = json.loads(request.content)
+        missing = [key for key in ("project", "material", "process", "parameters", "properties") if key not in payload]
+        if missing:
+            return httpx.Response(422, json={"detail": [{"loc": ["body", key], "msg": "Field required"}
+                                                        for key in missing]})
+        self._inserted += 1
+        return httpx.Response(200, json={"inserted_id": f"{self._inserted:024x}"})
+
+    def _add_file(self, request: httpx.Request) -> httpx.Response:
+        if not self._authorized(request):
+            return httpx.Response(401, json={"detail": "Unauthorized"})
+        body = request.content
+        return httpx.Response(200, json={
+            "file_hash": hashlib.sha256(body).hexdigest(),
+            "file_name": request.url.params.get("file_name", "upload"),
+            "file_size": str(len(body)),
+            "uploaded": True,
+        })
+
+    def _stats(self, request: httpx.Request) -> httpx.Response:
+        counts: Dict[str, int] = {}
+        for project in self.projects:
+            affiliation = project["provenance"]["affiliation"]
+            counts[affiliation] = counts.get(affiliation, 0) + 1
+        by_affiliation = [{"affiliation": affiliation, "n": n} for affiliation, n in sorted(counts.items())]
+        return httpx.Response(200, json={"data": {
+            "totalProj": len(self.projects),
+            "totalUsers": 97,
+            "countProj": by_affiliation,
+            "countFiles": [{"affiliation": affiliation, "n": 0} for affiliation in sorted(counts)],
+            "totalUsersRegistered": 97,
+        }})
+
+    def _predict(self, request: httpx.Request) -> httpx.Response:
+        digest = hashlib.sha256(request.content).digest()
+        return httpx.Response(200, json={"prediction": round(-5 + digest[0] / 25.5, 4)})
@@ -185,6 +185,34 @@ class CreateProjectResponse(BaseModel):
     inserted_id: str
 
 
+class RejectedRecord(BaseModel):
+    """
+    Represents an input record rejected by validation.
+
+    Attributes:
+        index (int): Position of the record in the input.
+        payload (Any): The raw record.
+        errors (List[Dict[str, Any]]): Validation errors, each with ``loc``, ``msg`` and ``type`` keys.
+    """
+    index: int
+    payload: Any
+    errors: List[Dict[str, Any]]
+
+
+class CreateProjectsReport(BaseModel):
+    """
+    Represents the outcome of a bulk project creation.
+
+    Attributes:
+        created (Dict[int, CreateProjectResponse]): Response for each created record, by input index.
+        rejected (Dict[int, RejectedRecord]): Records that failed validation, by input index.
+        failed (Dict[int, str]): Error message for each valid record whose submission failed, by input index.
+    """
+    created: Dict[int, CreateProjectResponse] = {}
+    rejected: Dict[int, RejectedRecord] = {}
+    failed: Dict[int, str] = {}
+
+
 class Provenance(BaseModel):
     affiliation: str
     email: EmailStr
@@ -273,6 +301,42 @@ class FileInfo(BaseModel):
 
 
 
+class FileUploadResult(BaseModel):
+    """
+    Represents the outcome of a streamed file upload.
+
+    Attributes:
+        file_path (str): Path of the uploaded file.
+        content_hash (str): Hash of the file content, computed while uploading.
+        bytes_sent (int): Number of bytes of the file sent.
+        elapsed (float): Duration of the upload in seconds.
+        throughput (float): Upload throughput in bytes per second.
+        response (Dict[str, Any]): Response from the API.
+    """
+    file_path: str
+    content_hash: str
+    bytes_sent: int
+    elapsed: float
+    throughput: float
+    response: Dict[str, Any]
+
+
+class FileUploadReport(BaseModel):
+    """
+    Represents the outcome of one file of a bulk upload.
+
+    Attributes:
+        file_path (str): Path of the file.
+        file_info (Optional[FileInfo]): File information returned by the API, or of the already attached file.
+        skipped (bool): True if an identical file was already attached to the project.
+        error (Optional[str]): Error message, if the upload failed.
+    """
+    file_path: str
+    file_info: Optional[FileInfo] = None
+    skipped: bool = False
+    error: Optional[str] = None
+
+
 class PropertyModel(BaseModel):
     name: str
     value: Any
@@ -318,3 +382,109 @@ class ProjectQueryModel(BaseModel):
     parameters: List[ParameterModel]
     properties: List[PropertyModel]
     files: List[FileModel] = None
+
+
+class PredictionResult(BaseModel):
+    """
+    Represents the outcome of a single prediction in a batch.
+
+    Attributes:
+        path (str): Path of the .cif file.
+        prediction (Optional[Dict[str, Any]]): JSON response from the geoCGNN model, if successful.
+        error (Optional[str]): Error message, if the prediction failed.
+        attempts (int): Number of attempts made (0 if no request was sent for this file).
+        duplicate_of (Optional[str]): File holding the same structure whose result was reused, if any.
+    """
+    path: str
+    prediction: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 1
+    duplicate_of: Optional[str] = None
+
+
+class PredictionBatchSummary(BaseModel):
+    """
+    Represents the summary of a batch of predictions.
+
+    Attributes:
+        total (int): Number of files in the batch.
+        succeeded (int): Number of successful predictions.
+        failed (int): Number of failed predictions.
+        elapsed (float): Wall-clock duration in seconds.
+        throughput (float): Completed predictions per second.
+        failures (Dict[str, str]): Error message for each failed file path.
+        rejected (int): Files rejected by local validation, without any request.
+        duplicates (int): Files answered with the result of an identical structure.
+    """
+    total: int
+    succeeded: int
+    failed: int
+    elapsed: float
+    throughput: float
+    failures: Dict[str, str]
+    rejected: int = 0
+    duplicates: int = 0
+
+
+class SyncReport(BaseModel):
+    """
+    Represents the outcome of a catalog synchronization.
+
+    Attributes:
+        inserted (int): Projects added to the local store.
+        updated (int): Projects whose content changed.
+        unchanged (int): Projects re-fetched but identical to the stored ones.
+        deleted (int): Projects removed because they no longer exist on the server.
+        rejected (int): Projects skipped because they failed validation (queried again next run).
+        deletions_refused (int): Projects missing on the server but kept locally because the
+            deletion exceeded ``max_delete_fraction`` (see ``CatalogSync``).
+        full_scan (bool): True if the ids on the server were queried to find deletions.
+        watermark (Optional[datetime]): Watermark after the run: latest ``updatedAt`` seen,
+            kept below the oldest rejected project.
+    """
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    rejected: int = 0
+    deletions_refused: int = 0
+    full_scan: bool = False
+    watermark: Optional[datetime] = None
+
+
+class RequestEvent(BaseModel):
+    """
+    Represents the instrumentation record of a single API call (all attempts included).
+
+    Attributes:
+        method (str): HTTP method.
+        endpoint (str): URL path of the endpoint, without query parameters.
+        endpoint_class (Optional[str]): Endpoint class (list, query, upload, ai, other).
+        status (Optional[int]): Final HTTP status code, None if no response was received.
+        error (Optional[str]): Exception type if the call failed without a response.
+        attempts (int): Number of attempts made (retries + 1).
+        cache_hit (bool): True if served from the response cache (fresh entry or 304 revalidation).
+        bytes_sent (int): Request body size of the last attempt (0 when unknown, e.g. streamed).
+        bytes_received (int): Response bytes received on the wire by the last attempt (body size
+            for fresh cache hits).
+        duration (float): Wall-clock time of the call in seconds, including backoff and rate-limit waits.
+        rate_limit_wait (float): Seconds spent waiting for the client-side rate limiter.
+        connect_time (Optional[float]): TCP connect time (DNS resolution included), None if a pooled
+            connection was reused.
+        tls_time (Optional[float]): TLS handshake time, None if a pooled connection was reused.
+        server_time (Optional[float]): Time from request sent to response headers received.
+    """
+    method: str
+    endpoint: str
+    endpoint_class: Optional[str] = None
+    status: Optional[int] = None
+    error: Optional[str] = None
+    attempts: int = 1
+    cache_hit: bool = False
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    duration: float = 0.0
+    rate_limit_wait: float = 0.0
+    connect_time: Optional[float] = None
+    tls_time: Optional[float] = None
+    server_time: Optional[float] = None
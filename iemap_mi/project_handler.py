@@ -1,28 +1,71 @@
+import asyncio
 import logging
+import os
+import time
 import httpx
-from pydantic import TypeAdapter, ValidationError
-from typing import Optional, Dict, Any, Union, List
+from pydantic import ValidationError
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, Union, List, Callable, AsyncIterator, Deque, Type, Iterable, Tuple
 from iemap_mi.models import (ProjectResponse, IEMAPProject, CreateProjectResponse,
-                             ProjectQueryModel)
+                             ProjectQueryModel, FlattenedProjectBase, FileUploadResult, FileInfo,
+                             FileUploadReport, RejectedRecord, CreateProjectsReport)
 from iemap_mi.settings import settings
-from iemap_mi.utils import get_headers
+from iemap_mi.cache import ResponseCache, cached_get_bytes
+from iemap_mi.request_layer import RequestLayer
+from iemap_mi.metrics import endpoint_label
+from iemap_mi.rate_limiter import EndpointClass
+from iemap_mi.utils import get_headers, build_async_client, static_compatible, HashingReader, validate_file_extension
+from iemap_mi.validation import validate_records, error_details
+from iemap_mi.projection import Projection
+from iemap_mi.compact import CompactProject
+from iemap_mi._utils_hash import hash_file
+
+logger = logging.getLogger(__name__)
+
+# records streamed by iter_projects: validated models or lightweight compact records
+ProjectRecord = Union[FlattenedProjectBase, CompactProject]
+
+
+def _validate_chunk(start: int, records: List[Dict[str, Any]]
+                    ) -> List[Tuple[int, Optional[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """Validate a chunk of project records; module level so it can run in a process pool."""
+    results = []
+    for offset, record in enumerate(records):
+        try:
+            results.append((start + offset, IEMAPProject.model_validate(record).model_dump(), []))
+        except ValidationError as e:
+            results.append((start + offset, None, error_details(e)))
+    return results
 
 
 class ProjectHandler:
-    def __init__(self, token: Optional[str] = None) -> None:
+    def __init__(self, token: Optional[str] = None, client: Optional[httpx.AsyncClient] = None,
+                 cache: Optional[ResponseCache] = None, request_layer: Optional[RequestLayer] = None) -> None:
         """
-        Initialize ProjectHandler with base URL and JWT token.
+        Initialize ProjectHandler with JWT token and shared HTTP client.
 
         Args:
             token (Optional[str]): JWT token for authentication. Defaults to None.
+            client (Optional[httpx.AsyncClient]): Pooled HTTP client shared with the other handlers.
+                Defaults to a new client built with the settings defaults.
+            cache (Optional[ResponseCache]): Cache for project list and query responses.
+                Defaults to None (no caching).
+            request_layer (Optional[RequestLayer]): Request layer (retries, circuit breaker) shared
+                with the other handlers. Defaults to a new one wrapping ``client``.
         """
 
         self.token = token
+        self.client = client if client is not None else build_async_client()
+        self.cache = cache
+        self.request_layer = request_layer if request_layer is not None else RequestLayer(self.client)
 
     async def get_projects(self, page_size: int = 10, page_number: int = 1) -> ProjectResponse:
         """
         Get paginated list of projects.
 
+        Concurrent calls for the same page share a single request and receive the same object.
+
         Args:
             page_size (int): Number of results to return in a single page. Defaults to 10.
             page_number (int): Actual page number returned. Defaults to 1.
@@ -34,10 +77,125 @@ class ProjectHandler:
         params = {'page_size': page_size, 'page_number': page_number}
         headers = get_headers(self.token)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(endpoint, headers=headers, params=params)
-            response.raise_for_status()
-            return ProjectResponse(**response.json())
+        async def fetch() -> ProjectResponse:
+            body = await cached_get_bytes(self.request_layer, endpoint, params=params, headers=headers,
+                                          cache=self.cache, token=self.token, endpoint_class=EndpointClass.LIST)
+            return ProjectResponse.model_validate_json(body)
+
+        return await self.request_layer.coalescer.run(("GET", endpoint, page_size, page_number, self.token), fetch,
+                                                      endpoint=endpoint_label(endpoint))
+
+    async def fetch_all_projects(
+            self,
+            page_size: int = 100,
+            concurrency: int = 4,
+            progress: Optional[Callable[[int, int], None]] = None
+    ) -> List[Any]:
+        """
+        Fetch the whole project catalog with bounded parallelism.
+
+        The first page is fetched to learn ``page_tot``; the remaining pages are then
+        requested concurrently (at most ``concurrency`` in flight) and concatenated in page order.
+
+        Args:
+            page_size (int): Number of results to return in a single page. Defaults to 100.
+            concurrency (int): Maximum number of pages fetched at the same time. Defaults to 4.
+            progress (Optional[Callable[[int, int], None]]): Called after each page with the number
+                of projects fetched so far and the total number of documents.
+
+        Returns:
+            List[Any]: All projects, in the same order as sequential paging would return them.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        first_page = await self.get_projects(page_size=page_size, page_number=1)
+        total_docs = first_page.number_docs
+        fetched = len(first_page.data)
+        if progress:
+            progress(fetched, total_docs)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_page(page_number: int) -> List[Any]:
+            nonlocal fetched
+            async with semaphore:
+                response = await self.get_projects(page_size=page_size, page_number=page_number)
+            fetched += len(response.data)
+            if progress:
+                progress(fetched, total_docs)
+            return response.data
+
+        pages = await asyncio.gather(*(fetch_page(page_number)
+                                       for page_number in range(2, first_page.page_tot + 1)))
+
+        projects = list(first_page.data)
+        for page in pages:
+            projects.extend(page)
+        return projects
+
+    async def iter_projects(
+            self,
+            page_size: int = 100,
+            prefetch: int = 2,
+            model: Type[ProjectRecord] = FlattenedProjectBase
+    ) -> AsyncIterator[ProjectRecord]:
+        """
+        Stream validated projects page by page.
+
+        While the current page is consumed, up to ``prefetch`` following pages are requested
+        in the background, so memory is bounded by the read-ahead window rather than by the
+        size of the catalog.
+
+        Args:
+            page_size (int): Number of results to return in a single page. Defaults to 100.
+            prefetch (int): Number of pages requested ahead of the consumer. Defaults to 2.
+            model (Type[ProjectRecord]): Model used to validate each project,
+                e.g. FlattenedProjectHashEmail, or CompactProject for lightweight records.
+                Defaults to FlattenedProjectBase.
+
+        Yields:
+            ProjectRecord: Validated projects (instances of ``model``) in catalog order.
+
+        Example:
+            >>> async for project in client.project_handler.iter_projects(page_size=50):
+            ...     print(project.iemap_id)
+        """
+        if prefetch < 0:
+            raise ValueError("prefetch must be a non-negative integer")
+
+        first_page = await self.get_projects(page_size=page_size, page_number=1)
+        page_tot = first_page.page_tot
+        next_page = 2
+        pending: Deque[asyncio.Task] = deque()
+
+        def schedule() -> None:
+            nonlocal next_page
+            while len(pending) < max(prefetch, 1) and next_page <= page_tot:
+                pending.append(asyncio.ensure_future(
+                    self.get_projects(page_size=page_size, page_number=next_page)))
+                next_page += 1
+
+        try:
+            data = first_page.data
+            while True:
+                if prefetch:
+                    schedule()
+                for project in data:
+                    yield model.model_validate(project)
+                if not prefetch:
+                    schedule()
+                if not pending:
+                    break
+                response = await pending.popleft()
+                if not response.data:
+                    break
+                data = response.data
+        finally:
+            for task in pending:
+                task.cancel()
+            # wait for the cancellations, so no request outlives the generator
+            await asyncio.gather(*pending, return_exceptions=True)
 
     async def create_project(self, project_data: IEMAPProject) -> CreateProjectResponse:
         """
@@ -49,15 +207,100 @@ class ProjectHandler:
         Returns:
             CreateProjectResponse: Response containing the inserted ID of the new project.
         """
+        return await self._submit_project(project_data.model_dump())
+
+    async def _submit_project(self, payload: Dict[str, Any]) -> CreateProjectResponse:
         endpoint = settings.PROJECT_ADD
         headers = get_headers(self.token)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(endpoint, json=project_data.dict(), headers=headers)
-            response.raise_for_status()
-            return CreateProjectResponse(**response.json())
+        # not idempotent: only retried if the request never reached the server
+        response = await self.request_layer.post(endpoint, json=payload, headers=headers,
+                                                 endpoint_class=EndpointClass.UPLOAD, compress=True)
+        response.raise_for_status()
+        return CreateProjectResponse(**response.json())
+
+    async def create_projects(
+            self,
+            records: Iterable[Dict[str, Any]],
+            concurrency: int = 4,
+            processes: Optional[int] = None,
+            chunk_size: int = 1000
+    ) -> CreateProjectsReport:
+        """
+        Validate and create many projects.
+
+        All records are validated first (optionally in a process pool, as validation is
+        CPU-bound); invalid records are collected with their errors instead of being printed,
+        and valid ones are submitted with at most ``concurrency`` requests in flight.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): Project dictionaries, as accepted by ``build_project_payload``.
+            concurrency (int): Maximum number of creation requests in flight. Defaults to 4.
+            processes (Optional[int]): Number of worker processes used for validation.
+                Defaults to None (validate in the current process).
+            chunk_size (int): Number of records validated per worker task. Defaults to 1000.
+
+        Returns:
+            CreateProjectsReport: Created, rejected and failed records keyed by input index.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        valid, rejected = await self.validate_project_payloads(records, processes=processes, chunk_size=chunk_size)
+        report = CreateProjectsReport(rejected=rejected)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def submit(index: int, payload: Dict[str, Any]) -> None:
+            async with semaphore:
+                try:
+                    report.created[index] = await self._submit_project(payload)
+                except (httpx.HTTPError, RuntimeError, ValidationError) as e:
+                    report.failed[index] = str(e)
+
+        await asyncio.gather(*(submit(index, payload) for index, payload in valid.items()))
+        report.created = dict(sorted(report.created.items()))
+        report.failed = dict(sorted(report.failed.items()))
+        return report
+
+    @staticmethod
+    async def validate_project_payloads(
+            records: Iterable[Dict[str, Any]],
+            processes: Optional[int] = None,
+            chunk_size: int = 1000
+    ) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, RejectedRecord]]:
+        """
+        Validate many project dictionaries against ``IEMAPProject``.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): Project dictionaries.
+            processes (Optional[int]): Number of worker processes. Defaults to None (current process).
+            chunk_size (int): Number of records validated per worker task. Defaults to 1000.
 
-    async def add_file_to_project(self, project_id: str, file_path: str, file_name: Optional[str] = None) -> Dict[
+        Returns:
+            Tuple[Dict[int, Dict[str, Any]], Dict[int, RejectedRecord]]: Validated payloads and
+            rejected records, both keyed by input index.
+        """
+        records = list(records)
+        chunks = [(start, records[start:start + chunk_size]) for start in range(0, len(records), chunk_size)]
+        if processes:
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                results = await asyncio.gather(*(loop.run_in_executor(pool, _validate_chunk, start, chunk)
+                                                 for start, chunk in chunks))
+        else:
+            results = [_validate_chunk(start, chunk) for start, chunk in chunks]
+
+        valid: Dict[int, Dict[str, Any]] = {}
+        rejected: Dict[int, RejectedRecord] = {}
+        for chunk_result in results:
+            for index, payload, errors in chunk_result:
+                if errors:
+                    rejected[index] = RejectedRecord(index=index, payload=records[index], errors=errors)
+                else:
+                    valid[index] = payload
+        return valid, rejected
+
+    async def add_file_to_project(self, project_id: str, file_path: str, file_name: Optional[str] = None,
+                                  progress: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[
         str, Any]:
         """
         Add a file to a project.
@@ -66,29 +309,142 @@ class ProjectHandler:
             project_id (str): The ID of the project to add the file to.
             file_path (str): The path to the file to be uploaded.
             file_name (Optional[str]): The name of the file. Defaults to None.
+            progress (Optional[Callable[[int, Optional[int]], None]]): Called after each uploaded chunk
+                with the bytes sent so far and the file size.
 
         Returns:
             Dict[str, Any]: Response from the API.
         """
+        result = await self.upload_file_to_project(project_id, file_path, file_name=file_name, progress=progress)
+        return result.response
+
+    async def upload_file_to_project(
+            self,
+            project_id: str,
+            file_path: str,
+            file_name: Optional[str] = None,
+            progress: Optional[Callable[[int, Optional[int]], None]] = None,
+            chunk_size: int = settings.UPLOAD_CHUNK_SIZE,
+            hash_algorithm: str = settings.FILE_HASH_ALGORITHM
+    ) -> FileUploadResult:
+        """
+        Stream a file to a project in bounded chunks, hashing it on the fly.
+
+        Memory use is constant regardless of the file size, and the returned content hash
+        can be compared with ``FileModel.hash`` to skip re-uploading unchanged files.
+
+        Args:
+            project_id (str): The ID of the project to add the file to.
+            file_path (str): The path to the file to be uploaded.
+            file_name (Optional[str]): The name of the file. Defaults to None.
+            progress (Optional[Callable[[int, Optional[int]], None]]): Called after each uploaded chunk
+                with the bytes sent so far and the file size.
+            chunk_size (int): Maximum size in bytes of each chunk read from disk.
+            hash_algorithm (str): Name of the hashlib algorithm used for the content hash.
+
+        Returns:
+            FileUploadResult: API response, content hash and throughput of the upload.
+        """
         endpoint = settings.ADD_FILE_TO_PROJECT
         headers = get_headers(self.token)
         params = {"project_id": project_id}
         if file_name:
             params["file_name"] = file_name
 
-        allowed_extensions = {"pdf", "doc", "docs", "xls", "xlsx", "rt", "cif", "dat", "csv", "png", "jpg", "tif"}
-        if not any(file_path.lower().endswith(ext) for ext in allowed_extensions):
-            raise ValueError(f"File extension not allowed. Allowed extensions are: {', '.join(allowed_extensions)}")
+        validate_file_extension(file_path)
+        # text formats shrink well; images, PDFs and office files are already compressed
+        compress = os.path.splitext(file_path)[1].lower().lstrip(".") in settings.COMPRESSIBLE_FILE_EXTENSIONS
 
-        async with httpx.AsyncClient() as client:
-            with open(file_path, "rb") as file:
-                files = {"file": (file_name or file_path, file)}
-                response = await client.post(endpoint, params=params, headers=headers, files=files)
-                response.raise_for_status()
-                return response.json()
+        with open(file_path, "rb") as file:
+            reader = HashingReader(file, chunk_size=chunk_size, hash_algorithm=hash_algorithm, progress=progress)
+            files = {"file": (file_name or file_path, reader)}
+            started = time.perf_counter()
+            response = await self.request_layer.post(endpoint, params=params, headers=headers, files=files,
+                                                     endpoint_class=EndpointClass.UPLOAD, compress=compress)
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
 
-    @staticmethod
+        return FileUploadResult(
+            file_path=file_path,
+            content_hash=reader.hexdigest(),
+            bytes_sent=reader.bytes_read,
+            elapsed=elapsed,
+            throughput=reader.bytes_read / elapsed if elapsed > 0 else 0.0,
+            response=response.json()
+        )
+
+    async def add_files_to_project(
+            self,
+            project_id: str,
+            paths: Iterable[str],
+            concurrency: int = 4,
+            existing_hashes: Optional[Iterable[str]] = None,
+            hash_algorithm: str = settings.FILE_HASH_ALGORITHM
+    ) -> List[FileUploadReport]:
+        """
+        Upload many files to a project concurrently, skipping files already attached.
+
+        All extensions are validated before anything is sent. Files are then hashed in a
+        thread pool and compared with the hashes of the files attached to the project
+        (``ProjectQueryModel.files``); only new files are uploaded, at most ``concurrency`` at a time.
+        Identical files within ``paths`` are uploaded once.
+
+        Args:
+            project_id (str): The ID of the project to add the files to.
+            paths (Iterable[str]): Paths of the files to upload.
+            concurrency (int): Maximum number of uploads in flight. Defaults to 4.
+            existing_hashes (Optional[Iterable[str]]): Hashes of the files already attached.
+                Defaults to None, in which case the project is queried to obtain them.
+            hash_algorithm (str): Name of the hashlib algorithm matching ``FileModel.hash``.
+
+        Returns:
+            List[FileUploadReport]: One report per input path, in input order.
+
+        Raises:
+            ValueError: If any file has an extension that is not allowed.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        paths = list(paths)
+        for file_path in paths:
+            validate_file_extension(file_path)
+
+        attached: Dict[str, FileInfo] = {}
+        if existing_hashes is None:
+            projects = await self.query_projects(id=project_id) or []
+            for project in projects:
+                for file in project.files or []:
+                    attached[file.hash] = FileInfo(file_hash=file.hash, file_name=file.name,
+                                                   file_size=str(file.size), uploaded=False)
+        else:
+            attached = {file_hash: None for file_hash in existing_hashes}
+
+        hashes = await asyncio.gather(*(asyncio.to_thread(hash_file, file_path, hash_algorithm)
+                                        for file_path in paths))
+        semaphore = asyncio.Semaphore(concurrency)
+        # identical files within the batch are uploaded once
+        first_index = {}
+        for index, file_hash in enumerate(hashes):
+            first_index.setdefault(file_hash, index)
+
+        async def upload(index: int, file_path: str, file_hash: str) -> FileUploadReport:
+            if file_hash in attached or first_index[file_hash] != index:
+                return FileUploadReport(file_path=file_path, file_info=attached.get(file_hash), skipped=True)
+            async with semaphore:
+                try:
+                    result = await self.upload_file_to_project(project_id, file_path,
+                                                               file_name=os.path.basename(file_path),
+                                                               hash_algorithm=hash_algorithm)
+                except (httpx.HTTPError, OSError, RuntimeError) as e:
+                    return FileUploadReport(file_path=file_path, error=str(e))
+            return FileUploadReport(file_path=file_path, file_info=FileInfo(**result.response))
+
+        return list(await asyncio.gather(*(upload(index, file_path, file_hash)
+                                           for index, (file_path, file_hash) in enumerate(zip(paths, hashes)))))
+
+    @static_compatible
     async def query_projects(
+            self,
             response_model: Optional[str] = None,
             id: Optional[str] = None,
             fields_output: Optional[str] = 'all',
@@ -113,12 +469,15 @@ class ProjectHandler:
             skip: int = 0,
             sort: Optional[str] = None,
             start_date: Optional[str] = None,
-            end_date: Optional[str] = None
+            end_date: Optional[str] = None,
+            trusted: bool = False,
+            on_reject: Optional[Callable[[RejectedRecord], None]] = None,
+            projection: Optional[Union[Projection, Iterable[str]]] = None
     ) -> List[ProjectQueryModel]:
         """
         Query projects with specified parameters.
-        This method is a static method and does not require an instance of the class to be called.
         No authentication is required to call this method.
+        Concurrent identical queries share a single request (the result models are shared objects).
 
         Args:
             response_model (Optional[str]): Response model.
@@ -146,10 +505,22 @@ class ProjectHandler:
             sort (Optional[str]): Sort.
             start_date (Optional[str]): Start date.
             end_date (Optional[str]): End date.
+            trusted (bool): Skip validation of the results (see ``validation.construct``),
+                for bulk pulls of known-good server data. Defaults to False.
+            on_reject (Optional[Callable[[RejectedRecord], None]]): Called for each result that
+                fails validation, with its absolute index (``skip`` + position), raw payload and
+                error locations. Malformed results are skipped (and logged) either way.
+            projection (Optional[Union[Projection, Iterable[str]]]): Fields to return, as a Projection
+                or dotted field paths (e.g. ``["iemap_id", "material.formula"]``). Sets ``fields_output``
+                and returns instances of the partial model of the projection. Defaults to None.
 
         Returns:
-            ProjectQueryResponse: Query response.
+            List[ProjectQueryModel]: Valid query results, in server order (partial models with a projection).
         """
+        if projection is not None and not isinstance(projection, Projection):
+            projection = Projection(*projection)
+        if projection is not None:
+            fields_output = projection.fields_output
         endpoint = settings.PROJECT_QUERY
         params = {
             key: value for key, value in {
@@ -181,21 +552,117 @@ class ProjectHandler:
             }.items() if value is not None
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(endpoint, params=params)
-            response.raise_for_status()
+        model = projection.model if projection is not None else ProjectQueryModel
 
-        try:
-            adapter = TypeAdapter(ProjectQueryModel)
-            results: List[ProjectQueryModel] = [adapter.validate_python(single_result) for single_result in
-                                                response.json()]
-            return results
-        except ValidationError as e:
-            print("Validation error occurred:")
-            print(e.json(indent=4))
+        async def fetch() -> Tuple[List[ProjectQueryModel], List[RejectedRecord]]:
+            body = await cached_get_bytes(self.request_layer, endpoint, params=params, cache=self.cache,
+                                          endpoint_class=EndpointClass.QUERY)
+            results, rejected = validate_records(model, body, trusted=trusted, start=skip)
+            for record in rejected:
+                logger.warning(f"Skipping invalid query result {record.index}: "
+                               f"{[error['loc'] for error in record.errors]}")
+            return results, rejected
+
+        key = ("GET", endpoint, tuple(sorted(params.items())), model, trusted)
+        results, rejected = await self.request_layer.coalescer.run(key, fetch, endpoint=endpoint_label(endpoint))
+        if on_reject is not None:
+            for record in rejected:
+                on_reject(record)
+        # the list may be shared with concurrent callers: each one gets its own copy
+        return list(results)
+
+    async def iter_query(
+            self,
+            window: int = 100,
+            min_window: int = 10,
+            max_window: int = 1000,
+            target_latency: float = 1.0,
+            concurrency: int = 1,
+            skip: int = 0,
+            **filters: Any
+    ) -> AsyncIterator[ProjectQueryModel]:
+        """
+        Stream the results of a query, advancing ``skip`` automatically.
+
+        The window (``limit``) grows while responses arrive faster than ``target_latency``
+        and shrinks when they are slower, within ``[min_window, max_window]``. Only the
+        requests are timed (the slowest of each round), not the time spent by the consumer. With
+        ``concurrency > 1`` several consecutive windows are requested at the same time.
+        Iteration stops on the first empty window. A short window may mean that the server
+        caps ``limit``: the window is reduced to the number of results received (which also
+        bounds its growth) and iteration continues right after them.
+
+        Args:
+            window (int): Initial number of results requested per call. Defaults to 100.
+            min_window (int): Lower bound for the adaptive window. Defaults to 10.
+            max_window (int): Upper bound for the adaptive window. Defaults to 1000.
+            target_latency (float): Latency in seconds used to grow/shrink the window. Defaults to 1.0.
+            concurrency (int): Number of windows fetched concurrently. Defaults to 1.
+            skip (int): Number of results to skip before the first window. Defaults to 0.
+            **filters: Any keyword argument accepted by ``query_projects`` except ``limit`` and ``skip``.
+
+        Yields:
+            ProjectQueryModel: Query results in server order.
+
+        Example:
+            >>> async for doc in client.project_handler.iter_query(material_any_element="Li"):
+            ...     print(doc.material.formula)
+        """
+        if not 0 < min_window <= max_window:
+            raise ValueError("window bounds must satisfy 0 < min_window <= max_window")
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        for reserved in ("limit", "skip"):
+            filters.pop(reserved, None)
+        on_reject = filters.pop("on_reject", None)
+
+        window = min(max(window, min_window), max_window)
+
+        async def fetch_window(window_skip: int, limit: int) -> Tuple[List[ProjectQueryModel], int, float]:
+            # rejected results still count towards the window, so they do not end the iteration
+            rejected: List[RejectedRecord] = []
+            started = time.perf_counter()
+            results = await self.query_projects(limit=limit, skip=window_skip, on_reject=rejected.append, **filters)
+            latency = time.perf_counter() - started
+            if on_reject is not None:
+                for record in rejected:
+                    on_reject(record)
+            return results, len(results) + len(rejected), latency
+
+        while True:
+            tasks = [asyncio.ensure_future(fetch_window(skip + i * window, window)) for i in range(concurrency)]
+            elapsed = 0.0
+            next_skip = skip + concurrency * window
+            try:
+                for index, task in enumerate(tasks):
+                    results, received, latency = await task
+                    elapsed = max(elapsed, latency)
+                    for result in results:
+                        yield result
+                    if received == 0:
+                        return
+                    if received < window:
+                        # end of the results or a server-side cap on limit: the next windows of this
+                        # round started too far, resume right after the results received
+                        next_skip = skip + index * window + received
+                        max_window = received
+                        min_window = min(min_window, received)
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            skip = next_skip
+
+            if elapsed < target_latency:
+                window = min(window * 2, max_window)
+            elif elapsed > 2 * target_latency:
+                window = max(window // 2, min_window)
+            window = min(window, max_window)
 
     @staticmethod
-    def build_project_payload(data: Dict[str, Any]) -> Dict[str, Any]:
+    def build_project_payload(data: Dict[str, Any],
+                              on_reject: Optional[Callable[[RejectedRecord], None]] = None) -> Dict[str, Any]:
         """
         Build and validate a JSON payload for the "/api/v1/project/add" endpoint.
 
@@ -204,14 +671,13 @@ class ProjectHandler:
 
         Args:
             data (Dict[str, Any]): A dictionary containing the project details.
+            on_reject (Optional[Callable[[RejectedRecord], None]]): Called with the rejected record
+                (raw payload and error locations) if validation fails. Errors are also logged.
 
         Returns:
             Dict[str, Any]: A validated dictionary representation of the project payload.
                             Returns an empty dictionary if validation fails.
 
-        Raises:
-            ValidationError: If the provided data is not valid according to the Pydantic model.
-
         Example:
             >>> data = {
             ...     "project": {
@@ -257,10 +723,12 @@ class ProjectHandler:
             ...     print("Payload is invalid.")
         """
         try:
-            project_request = IEMAPProject(**data)
-            return project_request.dict()
+            return IEMAPProject.model_validate(data).model_dump()
         except ValidationError as e:
-            print("Validation Error: The provided data is not valid.")
-            for error in e.errors():
-                print(f"Error in field '{'.'.join(map(str, error['loc']))}': {error['msg']} (type: {error['type']})")
+            record = RejectedRecord(index=0, payload=data, errors=error_details(e))
+            logger.warning("Validation Error: The provided data is not valid.\n" + "\n".join(
+                f"Error in field '{'.'.join(map(str, error['loc']))}': {error['msg']} (type: {error['type']})"
+                for error in record.errors))
+            if on_reject is not None:
+                on_reject(record)
             return {}
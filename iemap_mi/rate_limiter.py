@@ -0,0 +1,145 @@
+# iemap_mi/rate_limiter.py
+import asyncio
+import time
+from enum import Enum
+from typing import Optional, Dict, Mapping
+
+
+class EndpointClass(Enum):
+    """
+    Enumeration of endpoint classes that can be rate limited independently.
+    """
+    LIST = "list"
+    QUERY = "query"
+    UPLOAD = "upload"
+    AI = "ai"
+    OTHER = "other"
+
+
+class TokenBucket:
+    """
+    Asynchronous token bucket.
+
+    Tokens are added at ``rate`` per second up to ``capacity``; each request consumes one.
+    Waiting callers reserve their token in arrival order, so concurrent requests are spread
+    evenly instead of bursting when tokens become available.
+
+    Attributes:
+        rate (float): Tokens added per second (sustained requests per second).
+        capacity (float): Maximum number of tokens (burst size).
+        acquired (int): Number of tokens handed out.
+        waited (int): Number of acquisitions that had to wait.
+        total_wait (float): Cumulative waiting time in seconds.
+        max_wait (float): Longest waiting time in seconds.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        """
+        Initialize the bucket full.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (Optional[float]): Burst size. Defaults to ``max(rate, 1)``.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.acquired = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """
+        Wait until a token is available and consume it.
+
+        Returns:
+            float: Time waited in seconds.
+        """
+        async with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.acquired += 1
+        if wait > 0:
+            self.waited += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            await asyncio.sleep(wait)
+        return wait
+
+    @property
+    def current_wait(self) -> float:
+        """Return the time in seconds a request arriving now would wait."""
+        now = time.monotonic()
+        tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        return max(1 - tokens, 0.0) / self.rate
+
+    def metrics(self) -> Dict[str, float]:
+        """Return waiting-time metrics of the bucket."""
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "total_wait": self.total_wait,
+            "max_wait": self.max_wait,
+            "mean_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+            "current_wait": self.current_wait,
+        }
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter shared by all handlers of an IemapMI instance.
+
+    Holds one TokenBucket per endpoint class; classes without a bucket are not limited.
+
+    Attributes:
+        buckets (Dict[EndpointClass, TokenBucket]): Bucket of each limited endpoint class.
+    """
+
+    def __init__(self, buckets: Optional[Mapping[EndpointClass, TokenBucket]] = None) -> None:
+        """
+        Initialize the rate limiter.
+
+        Args:
+            buckets (Optional[Mapping[EndpointClass, TokenBucket]]): Bucket of each limited endpoint class.
+
+        Example:
+            >>> limiter = RateLimiter({EndpointClass.QUERY: TokenBucket(rate=5, capacity=10),
+            ...                        EndpointClass.AI: TokenBucket(rate=1)})
+        """
+        self.buckets: Dict[EndpointClass, TokenBucket] = dict(buckets or {})
+
+    @classmethod
+    def from_rates(cls, rates: Mapping[EndpointClass, float]) -> "RateLimiter":
+        """Build a limiter from requests-per-second values, using default burst sizes."""
+        return cls({endpoint_class: TokenBucket(rate) for endpoint_class, rate in rates.items()})
+
+    async def acquire(self, endpoint_class: Optional[EndpointClass]) -> float:
+        """
+        Wait for a token of the given endpoint class.
+
+        Args:
+            endpoint_class (Optional[EndpointClass]): Class of the endpoint being called.
+
+        Returns:
+            float: Time waited in seconds (0 if the class is not limited).
+        """
+        bucket = self.buckets.get(endpoint_class) if endpoint_class is not None else None
+        if bucket is None:
+            return 0.0
+        return await bucket.acquire()
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Return waiting-time metrics of every bucket, keyed by endpoint class value."""
+        return {endpoint_class.value: bucket.metrics() for endpoint_class, bucket in self.buckets.items()}
@@ -0,0 +1,358 @@
+# iemap_mi/request_layer.py
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from typing import Optional, Any, Dict, FrozenSet, Iterable
+
+import httpx
+
+from iemap_mi.settings import settings
+from iemap_mi.rate_limiter import RateLimiter, EndpointClass
+from iemap_mi.metrics import MetricsRecorder, RequestTrace, endpoint_label
+from iemap_mi.models import RequestEvent
+from iemap_mi.compression import CompressedStream, check_encoding, compress_request
+from iemap_mi.coalesce import Coalescer
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a request is refused because the circuit breaker is open."""
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for transient failures.
+
+    Idempotent requests are retried on transport errors and on ``retry_statuses``;
+    non-idempotent requests (e.g. project creation) are retried only when the connection
+    could not be established, i.e. when the request surely never reached the server.
+
+    Attributes:
+        max_attempts (int): Total number of attempts, including the first one.
+        backoff_base (float): Base delay in seconds, doubled after each attempt.
+        backoff_max (float): Maximum delay in seconds between two attempts.
+        retry_statuses (FrozenSet[int]): HTTP status codes considered transient.
+    """
+
+    def __init__(
+            self,
+            max_attempts: int = settings.RETRY_MAX_ATTEMPTS,
+            backoff_base: float = settings.RETRY_BACKOFF_BASE,
+            backoff_max: float = settings.RETRY_BACKOFF_MAX,
+            retry_statuses: Iterable[int] = settings.RETRY_STATUSES
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses: FrozenSet[int] = frozenset(retry_statuses)
+
+    def backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """
+        Return the delay before the next attempt, honoring ``Retry-After`` when present.
+
+        Args:
+            attempt (int): Number of the attempt that just failed (1-based).
+            response (Optional[httpx.Response]): Failed response, if any.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def is_safe_to_retry(exc: Exception, idempotent: bool) -> bool:
+        """Return True if a transport error can be retried for the given kind of request."""
+        if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            return True
+        return idempotent and isinstance(exc, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the server is down.
+
+    After ``failure_threshold`` consecutive failed attempts the circuit opens and requests
+    raise CircuitOpenError for ``reset_timeout`` seconds; then a single trial request is
+    let through (half-open) and its outcome closes or re-opens the circuit.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before a trial request.
+        failures (int): Current number of consecutive failures.
+        opened_at (Optional[float]): Monotonic time the circuit was opened, None when closed.
+    """
+
+    def __init__(self, failure_threshold: int = settings.CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = settings.CIRCUIT_RESET_TIMEOUT) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Return ``"closed"``, ``"open"`` or ``"half-open"``."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_request(self) -> bool:
+        """
+        Raise CircuitOpenError if the request must not be sent.
+
+        Returns:
+            bool: True if the request is the trial request of a half-open circuit.
+        """
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial_in_flight):
+            raise CircuitOpenError("Circuit breaker is open: the IEMAP server is failing, request not sent.")
+        if state == "half-open":
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """Let another trial request through, e.g. when the trial was cancelled without an outcome."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit when the threshold is reached."""
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a ``Retry-After`` header (delay in seconds or HTTP date).
+
+    Args:
+        value (Optional[str]): Header value.
+
+    Returns:
+        Optional[float]: Delay in seconds, or None if missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class RequestLayer:
+    """
+    Single entry point for the HTTP requests of all handlers.
+
+    Applies the rate limiter, the retry policy and the circuit breaker around the shared
+    httpx.AsyncClient, and records a RequestEvent for every call.
+
+    Attributes:
+        client (httpx.AsyncClient): Pooled HTTP client.
+        retry_policy (RetryPolicy): Retry/backoff policy.
+        circuit_breaker (CircuitBreaker): Circuit breaker shared by all requests.
+        rate_limiter (RateLimiter): Client-side rate limiter shared by all requests.
+        metrics (MetricsRecorder): Latency histograms, counters and hooks of all requests.
+        compression (Optional[str]): Content coding of the request bodies sent with ``compress=True``.
+        compression_min_size (int): Minimum body size in bytes worth compressing.
+        coalescer (Coalescer): Single-flight of identical concurrent reads, used by the handlers.
+        auth (Optional[AuthManager]): Token manager attached with ``AuthManager(request_layer)``;
+            requests carrying an ``Authorization`` header then get its current token and are
+            replayed once after a refresh when answered with 401.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 metrics: Optional[MetricsRecorder] = None,
+                 compression: Optional[str] = settings.REQUEST_COMPRESSION,
+                 compression_min_size: int = settings.REQUEST_COMPRESSION_MIN_SIZE,
+                 coalesce: bool = settings.COALESCE_READS) -> None:
+        """
+        Initialize the request layer.
+
+        Args:
+            client (httpx.AsyncClient): Pooled HTTP client.
+            retry_policy (Optional[RetryPolicy]): Retry policy. Defaults to the settings defaults.
+            circuit_breaker (Optional[CircuitBreaker]): Circuit breaker. Defaults to the settings defaults.
+            rate_limiter (Optional[RateLimiter]): Rate limiter. Defaults to no limits.
+            metrics (Optional[MetricsRecorder]): Metrics recorder. Defaults to a new one without hooks.
+            compression (Optional[str]): Content coding (``"gzip"``, ``"deflate"``, ``"br"`` or ``"zstd"``)
+                of large request bodies, for servers that accept compressed requests.
+                Defaults to None (bodies are sent as they are).
+            compression_min_size (int): Minimum body size in bytes worth compressing.
+            coalesce (bool): Let identical concurrent reads share one request. Defaults to True.
+
+        Raises:
+            ImportError: If ``compression`` needs a package that is not installed.
+        """
+        self.client = client
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.metrics = metrics if metrics is not None else MetricsRecorder()
+        if compression is not None:
+            check_encoding(compression)
+        self.compression = compression
+        self.compression_min_size = compression_min_size
+        self.coalescer = Coalescer(self.metrics, enabled=coalesce)
+        self.auth = None
+
+    async def request(self, method: str, url: str, idempotent: Optional[bool] = None,
+                      endpoint_class: Optional[EndpointClass] = None, compress: bool = False,
+                      retry: bool = True, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request, retrying transient failures.
+
+        The last response is returned when retries are exhausted, so callers keep using
+        ``raise_for_status()``; the last transport error is raised instead if no response
+        was received.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Endpoint URL.
+            idempotent (Optional[bool]): Whether the request can be safely repeated.
+                Defaults to True for GET/HEAD/OPTIONS/PUT/DELETE and False otherwise.
+            endpoint_class (Optional[EndpointClass]): Class of the endpoint, selecting the
+                rate-limit bucket. Defaults to None (not limited).
+            compress (bool): Compress the body with ``compression``, if configured and the body
+                is at least ``compression_min_size`` bytes. Defaults to False.
+            retry (bool): Retry transient failures with ``retry_policy``. Set to False when the
+                caller has its own retry loop. Defaults to True.
+            **kwargs: Keyword arguments forwarded to ``httpx.AsyncClient.request``.
+
+        Returns:
+            httpx.Response: Response from the server.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            httpx.TransportError: If the last attempt failed without a response.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        event = RequestEvent(method=method.upper(), endpoint=endpoint_label(url),
+                             endpoint_class=endpoint_class.value if endpoint_class is not None else None)
+        started = time.perf_counter()
+        try:
+            response = await self._send(method, url, idempotent, endpoint_class, compress, retry, event, kwargs)
+        except BaseException as e:
+            event.error = type(e).__name__
+            raise
+        finally:
+            event.duration = time.perf_counter() - started
+            self.metrics.record(event)
+        return response
+
+    async def _send(self, method: str, url: str, idempotent: bool, endpoint_class: Optional[EndpointClass],
+                    compress: bool, retry: bool, event: RequestEvent, kwargs: Dict[str, Any]) -> httpx.Response:
+        policy = self.retry_policy
+        max_attempts = policy.max_attempts if retry else 1
+        extensions = kwargs.pop("extensions", None) or {}
+        authorized = self.auth is not None and "Authorization" in (kwargs.get("headers") or {})
+        replayed = False
+        attempt = 0
+        while True:
+            attempt += 1
+            event.attempts = attempt
+            if authorized:
+                token = await self.auth.get_token()
+                if token is not None:
+                    kwargs["headers"] = {**kwargs["headers"], "Authorization": f"Bearer {token}"}
+            event.rate_limit_wait += await self.rate_limiter.acquire(endpoint_class)
+            trial = self.circuit_breaker.before_request()
+            trace = RequestTrace()
+            # streamed compressed bodies have no Content-Length: the stream counts the bytes sent
+            compressed_stream: Optional[CompressedStream] = None
+            try:
+                if compress and self.compression is not None:
+                    request = compress_request(
+                        self.client.build_request(method, url, extensions={**extensions, "trace": trace}, **kwargs),
+                        self.compression, self.compression_min_size)
+                    if isinstance(request.stream, CompressedStream):
+                        compressed_stream = request.stream
+                    response = await self.client.send(request)
+                else:
+                    response = await self.client.request(method, url, extensions={**extensions, "trace": trace},
+                                                         **kwargs)
+            except httpx.TransportError as e:
+                self.circuit_breaker.record_failure()
+                if attempt >= max_attempts or not policy.is_safe_to_retry(e, idempotent):
+                    raise
+                delay = policy.backoff(attempt)
+                logger.warning(f"{method} {url} failed ({e!r}), retrying in {delay:.2f}s "
+                               f"(attempt {attempt}/{max_attempts})")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # cancelled, or failed before reaching the server: no outcome for the circuit
+                if trial:
+                    self.circuit_breaker.release_trial()
+                raise
+
+            event.status = response.status_code
+            event.cache_hit = response.status_code == 304
+            event.bytes_sent = compressed_stream.bytes_sent if compressed_stream is not None else int(
+                response.request.headers.get("Content-Length", 0))
+            event.bytes_received = response.num_bytes_downloaded
+            event.connect_time = trace.connect_time
+            event.tls_time = trace.tls_time
+            event.server_time = trace.server_time
+
+            if response.status_code >= 500:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+
+            # the token expired or was revoked: the request was rejected, replay it once with a new token
+            if response.status_code == 401 and authorized and not replayed and self.auth.can_refresh:
+                replayed = True
+                logger.warning(f"{method} {url} returned 401, refreshing the token and replaying the request")
+                await response.aclose()
+                await self.auth.refresh(token)
+                continue
+
+            # 429 means the request was rejected before processing: safe to repeat even if not idempotent
+            retryable = response.status_code in policy.retry_statuses and (
+                    idempotent or response.status_code == 429)
+            if not retryable or attempt >= max_attempts:
+                return response
+
+            delay = policy.backoff(attempt, response)
+            logger.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.2f}s "
+                           f"(attempt {attempt}/{max_attempts})")
+            await response.aclose()
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a GET request (see ``request``)."""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, idempotent: bool = False, **kwargs: Any) -> httpx.Response:
+        """Send a POST request (see ``request``), not retried after reaching the server unless idempotent."""
+        return await self.request("POST", url, idempotent=idempotent, **kwargs)
@@ -13,5 +13,62 @@ class APISettings:
 
     # Add other endpoints as needed
 
+    # Defaults for the shared HTTP connection pool owned by IemapMI
+    HTTP_TIMEOUT = 30.0
+    HTTP_CONNECT_TIMEOUT = 10.0
+    HTTP_MAX_CONNECTIONS = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+    HTTP_KEEPALIVE_EXPIRY = 30.0
+    HTTP2 = False
+
+    # File uploads: allowed extensions, chunk size (bytes) and hash computed while streaming
+    ALLOWED_FILE_EXTENSIONS = frozenset(
+        {"pdf", "doc", "docs", "docx", "xls", "xlsx", "rt", "cif", "dat", "csv", "png", "jpg", "tif"})
+    UPLOAD_CHUNK_SIZE = 1024 * 1024
+    FILE_HASH_ALGORITHM = "sha256"
+
+    # Opt-in compression of request bodies ("gzip", "deflate", "br", "zstd" or None), applied to
+    # project payloads, predictions and uploads of the text-based file types below
+    REQUEST_COMPRESSION = None
+    REQUEST_COMPRESSION_MIN_SIZE = 16 * 1024
+    REQUEST_COMPRESSION_LEVELS = {"gzip": 6, "deflate": 6, "br": 5, "zstd": 3}
+    COMPRESSIBLE_FILE_EXTENSIONS = frozenset({"cif", "dat", "csv", "rt"})
+
+    # Defaults for the opt-in response cache of read-only endpoints (TTLs in seconds)
+    CACHE_PATH = "~/.cache/iemap_mi/responses.sqlite"
+    CACHE_DEFAULT_TTL = 300.0
+    CACHE_MAX_BYTES = 256 * 1024 * 1024
+    CACHE_TTLS = {
+        PROJECT_LIST: 300.0,
+        PROJECT_QUERY: 300.0,
+        STATS: 60.0,
+        AI_GEOCGNN: 30 * 24 * 3600.0,
+    }
+    PREDICTION_CACHE_MAX_ENTRIES = 4096
+
+    # Local copy of the project catalog (incremental sync, offline queries; max age in seconds)
+    CATALOG_PATH = "~/.cache/iemap_mi/catalog.sqlite"
+    CATALOG_MAX_AGE = 3600.0
+    # A sync refuses to delete more than this fraction of the local projects at once
+    CATALOG_MAX_DELETE_FRACTION = 0.5
+
+    # Defaults for retries (exponential backoff with jitter) and the circuit breaker
+    RETRY_MAX_ATTEMPTS = 4
+    RETRY_BACKOFF_BASE = 0.5
+    RETRY_BACKOFF_MAX = 30.0
+    RETRY_STATUSES = (429, 502, 503, 504)
+    CIRCUIT_FAILURE_THRESHOLD = 10
+    CIRCUIT_RESET_TIMEOUT = 30.0
+
+    # Identical concurrent reads (project list/query, stats) share a single request
+    COALESCE_READS = True
+
+    # JWT lifecycle: refresh this many seconds before expiry; tokens shared across processes in this file
+    AUTH_REFRESH_MARGIN = 60.0
+    TOKEN_CACHE_PATH = "~/.cache/iemap_mi/tokens.json"
+
+    # Upper bounds (seconds) of the latency histogram buckets of the request metrics
+    METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
 
 settings = APISettings()
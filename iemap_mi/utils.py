@@ -1,5 +1,12 @@
+import functools
+import hashlib
+import os
+import warnings
+import httpx
 from iemap_mi.models import FlattenedProjectBase
-from typing import Optional, Dict, Any
+from iemap_mi.settings import settings
+from iemap_mi.compression import accept_encoding
+from typing import Optional, Dict, Any, BinaryIO, Callable
 
 
 def get_headers(token: Optional[str]) -> Dict[str, str]:
@@ -18,6 +25,179 @@ def get_headers(token: Optional[str]) -> Dict[str, str]:
     return headers
 
 
+def build_async_client(
+        timeout: float = settings.HTTP_TIMEOUT,
+        connect_timeout: float = settings.HTTP_CONNECT_TIMEOUT,
+        max_connections: int = settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = settings.HTTP_KEEPALIVE_EXPIRY,
+        http2: bool = settings.HTTP2,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+) -> httpx.AsyncClient:
+    """
+    Build a long-lived, pooled httpx.AsyncClient.
+
+    The client offers every response coding available (zstd and brotli when the optional
+    packages are installed, then gzip and deflate), so large JSON responses are transferred
+    compressed and decoded transparently.
+
+    Args:
+        timeout (float): Read/write/pool timeout in seconds.
+        connect_timeout (float): Connection timeout in seconds.
+        max_connections (int): Maximum number of concurrent connections.
+        max_keepalive_connections (int): Maximum number of idle connections kept alive.
+        keepalive_expiry (float): Seconds an idle connection is kept in the pool.
+        http2 (bool): Enable HTTP/2 (requires the optional ``h2`` package).
+        transport (Optional[httpx.AsyncBaseTransport]): Custom transport, e.g. for testing.
+
+    Returns:
+        httpx.AsyncClient: Client to be shared by all handlers.
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry
+    )
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        limits=limits,
+        http2=http2,
+        transport=transport,
+        headers={"Accept-Encoding": accept_encoding()}
+    )
+
+
+class static_compatible:
+    """
+    Decorator for handler methods that used to be static methods.
+
+    Called on an instance, the method behaves normally. Called on the class, as the former
+    static method was (``ProjectHandler.query_projects(...)``), it emits a DeprecationWarning
+    and runs on a temporary handler with its own client, closed after the call.
+    """
+
+    def __init__(self, method: Callable[..., Any]) -> None:
+        self.method = method
+        functools.update_wrapper(self, method)
+
+    def __get__(self, instance: Any, owner: type) -> Callable[..., Any]:
+        if instance is not None:
+            return self.method.__get__(instance, owner)
+        method = self.method
+
+        @functools.wraps(method)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            warnings.warn(f"Calling {owner.__name__}.{method.__name__} on the class is deprecated and opens a "
+                          f"new connection per call: use the handlers of an IemapMI client instead",
+                          DeprecationWarning, stacklevel=2)
+
+            async def run() -> Any:
+                async with build_async_client() as client:
+                    return await method(owner(client=client), *args, **kwargs)
+
+            return run()
+
+        return call
+
+
+def get_field(obj: Any, key: str) -> Any:
+    """
+    Read a field from a pydantic model or from the equivalent raw dictionary.
+
+    Args:
+        obj (Any): Model, dictionary or None.
+        key (str): Field name.
+
+    Returns:
+        Any: Field value, or None if missing.
+    """
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(key)
+    return getattr(obj, key, None)
+
+
+def validate_file_extension(file_path: str) -> None:
+    """
+    Check that a file has one of the extensions accepted by the IEMAP file storage.
+
+    Args:
+        file_path (str): Path or name of the file.
+
+    Raises:
+        ValueError: If the extension is not allowed.
+    """
+    extension = os.path.splitext(file_path)[1].lower().lstrip(".")
+    if extension not in settings.ALLOWED_FILE_EXTENSIONS:
+        raise ValueError(f"File extension not allowed for '{file_path}'. "
+                         f"Allowed extensions are: {', '.join(sorted(settings.ALLOWED_FILE_EXTENSIONS))}")
+
+
+class HashingReader:
+    """
+    Wrap a binary file so that reading it also hashes the content and reports progress.
+
+    httpx reads multipart files chunk by chunk, so wrapping the file handle keeps memory
+    constant and computes the content hash during the upload pass, without a second read.
+    Seeking back to the start (e.g. when a request is retried) resets hash and counters.
+
+    Attributes:
+        bytes_read (int): Number of bytes read since the last rewind.
+        total (Optional[int]): Size of the file, if known.
+    """
+
+    def __init__(self, file: BinaryIO, chunk_size: int = settings.UPLOAD_CHUNK_SIZE,
+                 hash_algorithm: str = settings.FILE_HASH_ALGORITHM,
+                 progress: Optional[Callable[[int, Optional[int]], None]] = None) -> None:
+        """
+        Args:
+            file (BinaryIO): File opened in binary mode.
+            chunk_size (int): Maximum number of bytes returned by a single read.
+            hash_algorithm (str): Name of a hashlib algorithm.
+            progress (Optional[Callable[[int, Optional[int]], None]]): Called after each chunk
+                with the bytes read so far and the total size.
+        """
+        self._file = file
+        self._chunk_size = chunk_size
+        self._hash_algorithm = hash_algorithm
+        self._progress = progress
+        self._hash = hashlib.new(hash_algorithm)
+        self.bytes_read = 0
+        try:
+            self.total: Optional[int] = os.fstat(file.fileno()).st_size
+        except (AttributeError, OSError):
+            self.total = None
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self._chunk_size:
+            size = self._chunk_size
+        chunk = self._file.read(size)
+        if chunk:
+            self._hash.update(chunk)
+            self.bytes_read += len(chunk)
+            if self._progress:
+                self._progress(self.bytes_read, self.total)
+        return chunk
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        position = self._file.seek(offset, whence)
+        if position == 0:
+            self._hash = hashlib.new(self._hash_algorithm)
+            self.bytes_read = 0
+        return position
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def hexdigest(self) -> str:
+        """Return the hash of the content read so far."""
+        return self._hash.hexdigest()
+
+
 def flatten_project_data(project: FlattenedProjectBase) -> Dict[str, Any]:
     """Flatten the project data for better compatibility with pandas DataFrame."""
     flattened = {
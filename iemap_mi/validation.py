@@ -0,0 +1,168 @@
+# iemap_mi/validation.py
+import json
+import types
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from iemap_mi.models import RejectedRecord
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[ModelT]) -> TypeAdapter:
+    """
+    Return the TypeAdapter for ``List[model]``, built once per model.
+
+    Building a TypeAdapter compiles a validator, which is far more expensive than using it.
+
+    Args:
+        model (Type[ModelT]): Pydantic model of the list items.
+
+    Returns:
+        TypeAdapter: Adapter validating lists of ``model``.
+    """
+    return TypeAdapter(List[model])
+
+
+@lru_cache(maxsize=None)
+def _temporal_adapter(annotation: type) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def _construct_temporal(annotation: type, value: Any) -> Any:
+    # JSON carries dates as strings: parse them so trusted records match the annotations
+    if not isinstance(value, str):
+        return value
+    try:
+        return _temporal_adapter(annotation).validate_python(value)
+    except ValidationError:
+        return value
+
+
+def _model_class(annotation: Any) -> Any:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+def _construct_value(annotation: Any, value: Any) -> Any:
+    model = _model_class(annotation)
+    if model is not None:
+        return construct(model, value) if isinstance(value, dict) else value
+    if annotation in (datetime, date):
+        return _construct_temporal(annotation, value)
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin in (list, List) and args and isinstance(value, list):
+        return [_construct_value(args[0], item) for item in value]
+    if origin is Union or origin is types.UnionType:
+        for arg in args:
+            if _model_class(arg) is not None or get_origin(arg) in (list, List) or arg in (datetime, date):
+                return _construct_value(arg, value)
+    return value
+
+
+def construct(model: Type[ModelT], data: Dict[str, Any]) -> ModelT:
+    """
+    Build a model instance without validation, recursing into nested models.
+
+    ``model_construct`` alone leaves nested models as plain dictionaries; here every
+    field annotated with a model (or a list/optional of models) is constructed as well,
+    and ``datetime``/``date`` fields are parsed from their ISO strings. Other values are
+    not coerced. Only use it on data known to be valid, e.g. documents returned by the
+    IEMAP server.
+
+    Args:
+        model (Type[ModelT]): Pydantic model.
+        data (Dict[str, Any]): Raw data.
+
+    Returns:
+        ModelT: Unvalidated model instance.
+    """
+    values = {
+        name: _construct_value(field.annotation, data[name])
+        for name, field in model.model_fields.items() if name in data
+    }
+    return model.model_construct(**values)
+
+
+def validate_list(model: Type[ModelT], data: Union[bytes, str, List[Any]], trusted: bool = False) -> List[ModelT]:
+    """
+    Validate a list of records with the cached adapter of ``model``.
+
+    Raw JSON (bytes or str) is validated in a single pass with ``validate_json``, without
+    building intermediate Python objects.
+
+    Args:
+        model (Type[ModelT]): Pydantic model of the records.
+        data (Union[bytes, str, List[Any]]): Raw JSON array or already decoded list.
+        trusted (bool): Skip validation and build the models with ``construct``. Defaults to False.
+
+    Returns:
+        List[ModelT]: Model instances.
+
+    Raises:
+        ValidationError: If a record is not valid (not raised in trusted mode).
+    """
+    if trusted:
+        records = json.loads(data) if isinstance(data, (bytes, str)) else data
+        return [construct(model, record) for record in records]
+    if isinstance(data, (bytes, str)):
+        return list_adapter(model).validate_json(data)
+    return list_adapter(model).validate_python(data)
+
+
+def error_details(error: ValidationError) -> List[Dict[str, Any]]:
+    """
+    Return the errors of a ValidationError as plain dictionaries.
+
+    Args:
+        error (ValidationError): Validation error.
+
+    Returns:
+        List[Dict[str, Any]]: One ``{"loc", "msg", "type"}`` dictionary per error.
+    """
+    return [{"loc": list(e["loc"]), "msg": e["msg"], "type": e["type"]} for e in error.errors()]
+
+
+def validate_records(
+        model: Type[ModelT],
+        data: Union[bytes, str, List[Any]],
+        trusted: bool = False,
+        start: int = 0
+) -> Tuple[List[ModelT], List[RejectedRecord]]:
+    """
+    Validate a list of records, keeping the valid ones when some records are malformed.
+
+    The whole list is validated in one pass first; only if that fails the records are
+    validated one by one, so a single bad record does not discard the others.
+
+    Args:
+        model (Type[ModelT]): Pydantic model of the records.
+        data (Union[bytes, str, List[Any]]): Raw JSON array or already decoded list.
+        trusted (bool): Skip validation (see ``validate_list``). Defaults to False.
+        start (int): Index of the first record, e.g. the ``skip`` of the query. Defaults to 0.
+
+    Returns:
+        Tuple[List[ModelT], List[RejectedRecord]]: Valid records in input order and rejected
+        records with their index, raw payload and error locations.
+    """
+    try:
+        return validate_list(model, data, trusted=trusted), []
+    except ValidationError:
+        pass
+    records = json.loads(data) if isinstance(data, (bytes, str)) else data
+    if not isinstance(records, list):
+        raise ValueError(f"Expected a JSON array of records, got {type(records).__name__}")
+    valid: List[ModelT] = []
+    rejected: List[RejectedRecord] = []
+    for offset, record in enumerate(records):
+        try:
+            valid.append(model.model_validate(record))
+        except ValidationError as e:
+            rejected.append(RejectedRecord(index=start + offset, payload=record, errors=error_details(e)))
+    return valid, rejected
@@ -1,5 +1,6 @@
 # tests/conftest.py
 import os
+import httpx
 import pytest
 
 
@@ -8,3 +9,72 @@ def credentials() -> tuple[str, str]:
     username = os.getenv("TEST_USERNAME", "default_username")
     password = os.getenv("TEST_PASSWORD", "default_password")
     return username, password
+
+
+def make_stats_payload() -> dict:
+    """Build a minimal response of the stats endpoint."""
+    return {"data": {"totalProj": 1, "totalUsers": 1, "countProj": [], "countFiles": [],
+                     "totalUsersRegistered": 1}}
+
+
+def make_project(index: int) -> dict:
+    """Build a raw project document as returned by the project list endpoint."""
+    return {
+        "identifier": None,
+        "iemap_id": f"iemap-{index:05d}",
+        "provenance": {"affiliation": "ENEA", "email": f"user{index}@enea.it",
+                       "createdAt": "2024-01-01T00:00:00", "updatedAt": "2024-01-02T00:00:00"},
+        "project": {"name": "Materials for Batteries", "label": "MB", "description": None},
+        "process": {"method": "DFT", "agent": {"name": "VASP", "version": "6"}, "isExperiment": False},
+        "material": {"formula": "LiFePO4", "elements": ["Li", "Fe", "P", "O"]},
+        "parameters": [{"name": "time", "value": 20, "unit": "s"}],
+        "properties": [{"name": "energy", "value": "1.0", "unit": "eV"}],
+    }
+
+
+@pytest.fixture
+def catalog() -> list[dict]:
+    return [make_project(i) for i in range(23)]
+
+
+@pytest.fixture
+def list_handler(catalog: list[dict]):
+    """MockTransport handler emulating the paginated project list endpoint."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        page_size = int(request.url.params["page_size"])
+        page_number = int(request.url.params["page_number"])
+        skip = (page_number - 1) * page_size
+        return httpx.Response(200, json={
+            "skip": skip,
+            "page_size": page_size,
+            "page_number": page_number,
+            "page_tot": -(-len(catalog) // page_size),
+            "number_docs": len(catalog),
+            "data": catalog[skip:skip + page_size],
+        })
+    return handler
+
+
+def make_query_doc(index: int) -> dict:
+    """Build a raw document as returned by the project query endpoint."""
+    doc = make_project(index)
+    doc.pop("identifier")
+    doc["provenance"]["email"] = "****"
+    doc["project"]["description"] = "IEMAP project"
+    doc["files"] = []
+    return doc
+
+
+@pytest.fixture
+def query_catalog() -> list[dict]:
+    return [make_query_doc(i) for i in range(57)]
+
+
+@pytest.fixture
+def query_handler(query_catalog: list[dict]):
+    """MockTransport handler emulating the project query endpoint (limit/skip windows)."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        limit = int(request.url.params.get("limit", 100))
+        skip = int(request.url.params.get("skip", 0))
+        return httpx.Response(200, json=query_catalog[skip:skip + limit])
+    return handler
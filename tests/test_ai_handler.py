@@ -0,0 +1,172 @@
+import asyncio
+from pathlib import Path
+import httpx
+import pytest
+from iemap_mi.ai_handler import AIHandler, PredictionType
+from iemap_mi.cache import PredictionCache, ResponseCache
+from iemap_mi.request_layer import RequestLayer, RetryPolicy
+
+
+async def _collect(batch) -> dict:
+    return {Path(result.path).name: result async for result in batch}
+
+
+@pytest.mark.asyncio
+async def test_prediction_memoized_by_cif_content(tmp_path) -> None:
+    """
+    Test that the same structure in different files is inferred once per prediction type.
+    """
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"prediction": 1.5})
+
+    first = tmp_path / "a.cif"
+    second = tmp_path / "b.cif"
+    first.write_bytes(b"# generated using pymatgen\ndata_LiF\n_cell_length_a 4.0\n")
+    second.write_bytes(b"# other comment\r\n\r\ndata_LiF\r\n_cell_length_a 4.0  \r\n")
+
+    store = ResponseCache(":memory:")
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        ai_handler = AIHandler(client=client, prediction_cache=PredictionCache(store=store))
+        prediction = await ai_handler.get_prediction(str(first), PredictionType.FORMATION_ENERGY)
+        assert prediction == {"prediction": 1.5}
+        # callers get their own copy of cached predictions
+        prediction["prediction"] = 0.0
+        assert await ai_handler.get_prediction(str(second), PredictionType.FORMATION_ENERGY) == {"prediction": 1.5}
+        assert len(calls) == 1
+        await ai_handler.get_prediction(str(second), PredictionType.REDOX_POTENTIAL)
+        assert len(calls) == 2
+
+        # persistent backing survives a fresh in-memory cache
+        other = AIHandler(client=client, prediction_cache=PredictionCache(store=store))
+        await other.get_prediction(str(first), PredictionType.REDOX_POTENTIAL)
+        assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_predict_many_retries_and_summary(tmp_path) -> None:
+    """
+    Test that predict_many streams every file, retries transient failures and summarizes the batch.
+    """
+    attempts: dict[str, int] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = request.content
+        name = next((name for name in ("bad", "flaky", "invalid") if f"data_{name}".encode() in body), "ok")
+        attempts[name] = attempts.get(name, 0) + 1
+        if name == "bad" or (name == "flaky" and attempts[name] == 1):
+            return httpx.Response(503, text="unavailable")
+        if name == "invalid":
+            return httpx.Response(422, text="invalid structure")
+        return httpx.Response(200, json={"prediction": name})
+
+    for index in range(5):
+        (tmp_path / f"ok{index}.cif").write_bytes(f"data_ok\n_cell_length_a {index}\n".encode())
+    (tmp_path / "flaky.cif").write_bytes(b"data_flaky\n")
+    (tmp_path / "bad.cif").write_bytes(b"data_bad\n")
+    (tmp_path / "invalid.cif").write_bytes(b"data_invalid\n")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        request_layer = RequestLayer(client, retry_policy=RetryPolicy(max_attempts=3, backoff_base=0.0))
+        batch = AIHandler(client=client, request_layer=request_layer).predict_many(
+            str(tmp_path), PredictionType.FORMATION_ENERGY, concurrency=3, retries=1, retry_delay=0.0)
+        results = {result.path: result async for result in batch}
+
+    assert len(results) == 8
+    assert results[str(tmp_path / "flaky.cif")].attempts == 2
+    # only the batch retries: the request layer makes a single attempt per item attempt
+    assert attempts["bad"] == 2
+    # permanent errors are not retried
+    assert results[str(tmp_path / "invalid.cif")].attempts == 1
+    assert batch.summary.succeeded == 6
+    assert sorted(batch.summary.failures) == [str(tmp_path / "bad.cif"), str(tmp_path / "invalid.cif")]
+
+
+@pytest.mark.asyncio
+async def test_predict_many_reports_unreadable_paths(tmp_path) -> None:
+    """
+    Test that a path that cannot be read yields a failed result instead of stalling the batch.
+    """
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"prediction": -3.2})
+
+    (tmp_path / "a.cif").write_bytes(b"data_a\n")
+    (tmp_path / "folder.cif").mkdir()
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        batch = AIHandler(client=client).predict_many(str(tmp_path), PredictionType.FORMATION_ENERGY)
+        results = await asyncio.wait_for(_collect(batch), timeout=5)
+
+    assert results["a.cif"].prediction == {"prediction": -3.2}
+    assert "cannot be read" in results["folder.cif"].error
+    assert (batch.summary.total, batch.summary.succeeded, batch.summary.failed) == (2, 1, 1)
+
+    # repeated paths are predicted and counted once
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        path = str(tmp_path / "a.cif")
+        batch = AIHandler(client=client).predict_many([path, path], PredictionType.FORMATION_ENERGY)
+        assert len(await _collect(batch)) == 1
+    assert (batch.summary.total, batch.summary.succeeded) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_predict_many_stopped_early_cancels_workers(tmp_path) -> None:
+    """
+    Test that leaving the iteration early cancels and awaits the predictions in flight.
+    """
+    in_flight = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        in_flight.append(request)
+        try:
+            if b"data_slow" in request.content:
+                await asyncio.sleep(60)
+            return httpx.Response(200, json={"prediction": 1.0})
+        finally:
+            in_flight.remove(request)
+
+    (tmp_path / "a.cif").write_bytes(b"data_fast\n")
+    (tmp_path / "b.cif").write_bytes(b"data_slow\n")
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        batch = AIHandler(client=client).predict_many(str(tmp_path), PredictionType.FORMATION_ENERGY,
+                                                      concurrency=2)
+        iterator = batch.__aiter__()
+        await iterator.__anext__()
+        await iterator.aclose()
+        assert in_flight == []
+    assert batch.summary.total == 2
+
+
+@pytest.mark.asyncio
+async def test_predict_many_validates_and_dedupes(tmp_path) -> None:
+    """
+    Test that malformed files are rejected and duplicate structures are sent once.
+    """
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"prediction": -3.2})
+
+    example = (Path(__file__).resolve().parent.parent / "example_cif" / "mp-2064.cif").read_text()
+    (tmp_path / "a.cif").write_text(example)
+    (tmp_path / "b.cif").write_text(example.replace("# generated using pymatgen", "# copy").replace(" 1\n", " 1.0\n"))
+    (tmp_path / "broken.cif").write_text("data_broken\n_cell_length_a 4.0\n")
+    (tmp_path / "ragged.cif").write_text(example[:example.index("loop_\n _atom_site_type_symbol")] + (
+        "loop_\n_atom_site_label\n_atom_site_fract_x\n_atom_site_fract_y\nRb0 0 0\nF1 0.5 0.5\n"
+        "_atom_site_fract_z 0.5\n"))
+    (tmp_path / "folder.cif").mkdir()
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        batch = AIHandler(client=client).predict_many(str(tmp_path), PredictionType.FORMATION_ENERGY, dedupe=True)
+        results = {Path(result.path).name: result async for result in batch}
+
+    assert len(calls) == 1
+    assert results["b.cif"].prediction == {"prediction": -3.2}
+    assert results["b.cif"].duplicate_of == str(tmp_path / "a.cif")
+    assert results["broken.cif"].attempts == 0 and "cell" in results["broken.cif"].error
+    assert "_atom_site_fract_z" in results["ragged.cif"].error
+    assert results["folder.cif"].attempts == 0
+    assert (batch.summary.succeeded, batch.summary.rejected, batch.summary.duplicates) == (2, 3, 1)
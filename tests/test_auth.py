@@ -0,0 +1,77 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import pytest
+from iemap_mi.auth import TokenFileCache, decode_jwt_expiry
+from iemap_mi.iemap_mi import IemapMI
+from iemap_mi.mock_server import MockIemapServer, make_jwt
+from iemap_mi.models import IEMAPProject, Project, Material, Process, Agent
+
+LOGIN = "/rest/auth/jwt/login"
+
+PROJECT = IEMAPProject(
+    project=Project(name="Materials for Batteries", label="MB", description="IEMAP project"),
+    material=Material(formula="LiFePO4"),
+    process=Process(method="DFT", agent=Agent(name="VASP", version="6"), isExperiment=False),
+    parameters=[],
+    properties=[],
+)
+
+
+@pytest.mark.asyncio
+async def test_expired_token_refreshed_once() -> None:
+    """
+    Test that concurrent requests with an expired token trigger a single login, and that a
+    rejected token is refreshed and the request replayed once.
+    """
+    server = MockIemapServer(n_projects=1)
+    async with IemapMI(client=httpx.AsyncClient(transport=server.transport())) as client:
+        await client.authenticate("user", "password")
+        assert decode_jwt_expiry(client.token) > 0
+
+        client.auth._set_token(make_jwt("user", expires_in=-10))
+        results = await asyncio.gather(*(client.project_handler.create_project(PROJECT) for _ in range(20)))
+        assert len(results) == 20
+        assert server.requests[LOGIN] == 2
+        assert client.project_handler.token == client.auth.token
+
+        # the server rejects a token the client cannot decode: 401, refresh, single replay
+        client.auth._set_token("opaque-token")
+        await client.project_handler.create_project(PROJECT)
+        assert server.requests[LOGIN] == 3
+        assert server.requests["/rest/api/v1/project/add"] == 22
+
+
+@pytest.mark.asyncio
+async def test_token_shared_through_file_cache(tmp_path) -> None:
+    """
+    Test that a second client of the same user reuses the token stored by the first one.
+    """
+    server = MockIemapServer(n_projects=1)
+    token_cache = TokenFileCache(str(tmp_path / "tokens.json"))
+    async with IemapMI(client=httpx.AsyncClient(transport=server.transport()), token_cache=token_cache) as first:
+        await first.authenticate("user", "password")
+    async with IemapMI(client=httpx.AsyncClient(transport=server.transport()), token_cache=token_cache) as second:
+        await second.authenticate("user", "password")
+        await second.project_handler.create_project(PROJECT)
+
+    assert second.token == first.token
+    assert server.requests[LOGIN] == 1
+    assert (tmp_path / "tokens.json").stat().st_mode & 0o777 == 0o600
+
+
+def _save_tokens(path: str, worker: int) -> None:
+    cache = TokenFileCache(path)
+    for index in range(25):
+        cache.save(f"{worker}-{index}", "token")
+
+
+def test_file_cache_keeps_concurrent_writes(tmp_path) -> None:
+    """
+    Test that tokens saved at the same time by several processes are all kept.
+    """
+    path = str(tmp_path / "tokens.json")
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_save_tokens, [path] * 4, range(4)))
+    assert len(TokenFileCache(path)._read()) == 100
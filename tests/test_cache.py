@@ -0,0 +1,67 @@
+import httpx
+import pytest
+from iemap_mi.cache import ResponseCache
+from iemap_mi.iemap_mi import IemapMI
+from iemap_mi.mock_server import make_jwt
+from iemap_mi.settings import settings
+from tests.conftest import make_stats_payload
+
+
+def test_make_key_normalizes_params() -> None:
+    """
+    Test that key order and None values do not change the cache key, while the token does.
+    """
+    key = ResponseCache.make_key("url", {"a": 1, "b": None, "c": True})
+    assert key == ResponseCache.make_key("url", {"c": "true", "a": "1"})
+    assert key != ResponseCache.make_key("url", {"a": 1, "c": True}, token="jwt")
+
+
+def test_make_key_survives_token_refresh() -> None:
+    """
+    Test that tokens issued to the same user share cache entries, unlike tokens of other users.
+    """
+    key = ResponseCache.make_key("url", token=make_jwt("alice", 60))
+    assert key == ResponseCache.make_key("url", token=make_jwt("alice", 3600))
+    assert key != ResponseCache.make_key("url", token=make_jwt("bob", 60))
+
+
+def test_lru_eviction() -> None:
+    """
+    Test that least recently used entries are evicted above max_bytes.
+    """
+    now = iter(range(100))
+    cache = ResponseCache(":memory:", max_bytes=10, clock=lambda: float(next(now)))
+    cache.store("a", "url", b"12345")
+    cache.store("b", "url", b"12345")
+    cache.lookup("a")
+    cache.store("c", "url", b"12345")
+    assert cache.lookup("b") is None
+    assert cache.lookup("a") is not None
+    assert cache.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_stats_and_revalidation() -> None:
+    """
+    Test cache hits and ETag revalidation of an expired entry.
+    """
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=make_stats_payload(), headers={"ETag": '"v1"'})
+
+    cache = ResponseCache(":memory:", ttls={settings.STATS: 60.0})
+    external = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    async with IemapMI(client=external, cache=cache) as client:
+        await client.stat_handler.get_stats()
+        await client.stat_handler.get_stats()
+        assert calls == [None]
+        cache.ttls[settings.STATS] = 0.0
+        stats = await client.stat_handler.get_stats()
+    await external.aclose()
+    assert stats.data.totalProj == 1
+    assert calls == [None, '"v1"']
+    assert cache.stats == {"hits": 2, "misses": 1, "revalidations": 1, "evictions": 0}
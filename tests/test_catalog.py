@@ -0,0 +1,129 @@
+import httpx
+from datetime import datetime
+import pytest
+from iemap_mi.catalog import CatalogStore, CatalogSync, CatalogMirror
+from iemap_mi.project_handler import ProjectHandler
+from tests.conftest import make_query_doc
+
+
+@pytest.fixture
+def server():
+    """Mutable catalog served by a MockTransport for both the list and query endpoints."""
+    state = {"docs": [make_query_doc(i) for i in range(12)], "start_dates": []}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        docs = state["docs"]
+        if "/query/" in request.url.path:
+            start_date = request.url.params.get("start_date")
+            state["start_dates"].append(start_date)
+            if start_date:
+                docs = [d for d in docs if d["provenance"]["updatedAt"][:10] >= start_date]
+            limit = int(request.url.params["limit"])
+            skip = int(request.url.params["skip"])
+            return httpx.Response(200, json=docs[skip:skip + limit])
+        page_size = int(request.url.params["page_size"])
+        page_number = int(request.url.params["page_number"])
+        skip = (page_number - 1) * page_size
+        return httpx.Response(200, json={"skip": skip, "page_size": page_size, "page_number": page_number,
+                                         "page_tot": -(-len(docs) // page_size), "number_docs": len(docs),
+                                         "data": docs[skip:skip + page_size]})
+
+    state["handler"] = handler
+    return state
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync(server) -> None:
+    """
+    Test that a second run only re-queries recent changes and detects updates and deletions.
+    """
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server["handler"])) as client:
+        sync = CatalogSync(ProjectHandler(client=client), CatalogStore(":memory:"), page_size=5)
+        report = await sync.run()
+        assert (report.inserted, report.updated, report.deleted) == (12, 0, 0)
+        assert sync.store.count() == 12
+
+        # one project updated later, one deleted
+        server["docs"][3]["properties"][0]["value"] = "2.0"
+        server["docs"][3]["provenance"]["updatedAt"] = "2024-03-01T00:00:00"
+        del server["docs"][7]
+        report = await sync.run()
+
+    assert "2024-01-01" in server["start_dates"]
+    assert (report.inserted, report.updated, report.deleted) == (0, 1, 1)
+    assert report.full_scan
+    assert sync.store.get(server["docs"][3]["iemap_id"])["properties"][0]["value"] == "2.0"
+    assert sync.watermark.isoformat() == "2024-03-01T00:00:00"
+
+
+@pytest.mark.asyncio
+async def test_mirror_answers_locally(server) -> None:
+    """
+    Test that the mirror answers indexed filters offline and falls back to the server when stale.
+    """
+    server["docs"][2]["material"]["elements"] = ["Na", "Fe", "P", "O"]
+    server["docs"][2]["process"]["isExperiment"] = True
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server["handler"])) as client:
+        mirror = CatalogMirror(ProjectHandler(client=client), CatalogStore(":memory:"), max_age=60.0)
+        assert mirror.is_stale
+        await mirror.refresh()
+        requests_after_sync = len(server["start_dates"])
+
+        docs = await mirror.query_projects(material_any_element="Na,K")
+        assert [d.iemap_id for d in docs] == [server["docs"][2]["iemap_id"]]
+        assert len(await mirror.query_projects(material_all_elements="Li,Fe", isExperiment=False)) == 11
+        assert len(await mirror.query_projects(parameterName="time", parameterValue="20.0", limit=5, skip=10)) == 2
+        assert len(await mirror.query_projects(experimentMethod="DFT")) == 1
+        assert await mirror.query_projects(experimentInstrument="XRD") == []
+        assert len(server["start_dates"]) == requests_after_sync
+        assert mirror.local_queries == 5
+
+        mirror.max_age = 0.0
+        assert len(await mirror.query_projects(material_formula="LiFePO4", limit=100)) == 12
+        assert mirror.server_queries == 1
+
+
+@pytest.mark.asyncio
+async def test_sync_keeps_rejected_projects(server) -> None:
+    """
+    Test that invalid projects are counted, never deleted locally and queried again by later runs.
+    """
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server["handler"])) as client:
+        sync = CatalogSync(ProjectHandler(client=client), CatalogStore(":memory:"), page_size=5)
+        await sync.run()
+
+        # one project becomes invalid, one is inserted and another deleted in the same window
+        server["docs"][4]["provenance"]["updatedAt"] = "2024-02-01T00:00:00"
+        server["docs"][4]["material"] = "invalid"
+        server["docs"][9] = {**server["docs"][9], "iemap_id": "iemap-new"}
+        server["docs"][9]["provenance"] = {**server["docs"][9]["provenance"], "updatedAt": "2024-03-01T00:00:00"}
+        report = await sync.run()
+        assert (report.inserted, report.deleted, report.rejected) == (1, 1, 1)
+        assert sync.store.get(server["docs"][4]["iemap_id"]) is not None
+        assert sync.watermark < datetime(2024, 2, 1)
+
+        report = await sync.run(full=True)
+        assert (report.deleted, report.rejected) == (0, 1)
+        assert sync.store.get(server["docs"][4]["iemap_id"]) is not None
+        assert server["start_dates"][-1] is None
+
+
+@pytest.mark.asyncio
+async def test_sync_refuses_mass_deletion(server) -> None:
+    """
+    Test that a run keeps the local projects when most of them are missing from the server scan.
+    """
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server["handler"])) as client:
+        sync = CatalogSync(ProjectHandler(client=client), CatalogStore(":memory:"), page_size=5)
+        await sync.run()
+
+        # truncated id scan: only a few projects come back
+        server["docs"] = server["docs"][:3]
+        report = await sync.run()
+        assert (report.deleted, report.deletions_refused) == (0, 9)
+        assert sync.store.count() == 12
+
+        sync.max_delete_fraction = None
+        report = await sync.run()
+    assert (report.deleted, report.deletions_refused) == (9, 0)
+    assert sync.store.count() == 3
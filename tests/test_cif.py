@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pytest
+from iemap_mi.cif import CifError, parse_cif
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "example_cif"
+
+
+def test_parse_and_fingerprint() -> None:
+    """
+    Test that a structure written in another setting, origin and site order has the same fingerprint.
+    """
+    content = (EXAMPLES / "mp-2064.cif").read_text()
+    structure = parse_cif(content)
+    assert structure.reduced_formula == "FRb"
+    assert structure.frac_coords.shape == (2, 3)
+    assert structure.volume == pytest.approx(38.28799076)
+
+    # same RbF cell with b' = a + b (gamma = 45 degrees), origin on F and sites swapped
+    rewritten = (
+        "data_other\n"
+        "_cell_length_a 3.37044718(3)\n_cell_length_b 4.76653211\n_cell_length_c 3.37044718\n"
+        "_cell_angle_alpha 90\n_cell_angle_beta 90\n_cell_angle_gamma 45.0\n"
+        "loop_\n_symmetry_equiv_pos_as_xyz\n'x, y, z'\n"
+        "loop_\n_atom_site_label\n_atom_site_fract_x\n_atom_site_fract_y\n_atom_site_fract_z\n"
+        "F1 0.0 0.0 0.0\nRb1 0.0 0.5 0.5  # body centre\n"
+    )
+    assert parse_cif(rewritten).fingerprint() == structure.fingerprint()
+    assert parse_cif((EXAMPLES / "mp-1003402.cif").read_bytes()).fingerprint() != structure.fingerprint()
+
+    # CsCl-type RbRb generated from a single site by the centring operation
+    centred = content.replace("'x, y, z'", "'x, y, z'\n 2 'x+1/2, y+1/2, z+1/2'").replace("F  F1", "Rb  Rb1")
+    centred = centred[:centred.index("  Rb  Rb1")]
+    assert parse_cif(centred).expand()[1].shape == (2, 3)
+    assert parse_cif(centred).reduced_formula == "Rb"
+
+
+@pytest.mark.parametrize("old, new", [
+    ("_cell_length_a   3.37044718", "_cell_length_a   0"),
+    ("_cell_length_b   3.37044718", "_cell_length_b   nan"),
+    ("_cell_length_c   3.37044718", "_cell_length_c   inf"),
+    ("_cell_angle_gamma   90.00000000", ""),
+    ("Rb  Rb0", "Xx  Xx0"),
+    ("0.50000000  1\n", "half  1\n"),
+    ("'x, y, z'", "'x, y, w'"),
+])
+def test_malformed_cif_rejected(old: str, new: str) -> None:
+    """
+    Test that invalid cells, elements, numbers and symmetry operations raise CifError.
+    """
+    content = (EXAMPLES / "mp-2064.cif").read_text()
+    with pytest.raises(CifError):
+        parse_cif(content.replace(old, new))
@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+import pytest
+from iemap_mi.iemap_mi import IemapMI
+from iemap_mi.mock_server import MockIemapServer
+from iemap_mi.request_layer import RetryPolicy
+
+STATS = "/rest/api/v1/stats"
+QUERY = "/rest/api/v1/project/query/"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_coalesced() -> None:
+    """
+    Test that identical concurrent reads share one request and that the coalesced calls are counted.
+    """
+    server = MockIemapServer(n_projects=20, latency=0.05)
+    async with IemapMI(client=httpx.AsyncClient(transport=server.transport())) as client:
+        stats = await asyncio.gather(*(client.stat_handler.get_stats() for _ in range(20)))
+        queries = await asyncio.gather(*(client.project_handler.query_projects(isExperiment=flag)
+                                         for flag in [True, False] * 5))
+
+        # one caller cancelled: the shared request still completes for the others
+        calls = [asyncio.ensure_future(client.stat_handler.get_stats()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        calls[0].cancel()
+        remaining = await asyncio.gather(*calls[1:])
+        summary = client.metrics.summary()
+
+    assert all(result is stats[0] for result in stats)
+    assert server.requests[STATS] == 2 and remaining[0] is remaining[1]
+    assert server.requests[QUERY] == 2
+    assert queries[0] == queries[2] and queries[0] is not queries[2]
+    assert summary[f"GET {STATS}"]["coalesced"] == 19 + 2
+    assert summary[f"GET {QUERY}"]["coalesced"] == 8
+    assert "iemap_mi_coalesced_total" in client.metrics.to_prometheus()
+
+
+@pytest.mark.asyncio
+async def test_shared_request_cancelled_with_last_caller() -> None:
+    """
+    Test that the shared request is cancelled, and finished, once every caller is cancelled.
+    """
+    server = MockIemapServer(n_projects=5, latency=0.5)
+    async with IemapMI(client=httpx.AsyncClient(transport=server.transport())) as client:
+        calls = [asyncio.ensure_future(client.stat_handler.get_stats()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+        assert client.request_layer.coalescer.in_flight == 0
+        assert client.metrics.summary()[f"GET {STATS}"]["statuses"] == {"CancelledError": 1}
+
+
+@pytest.mark.asyncio
+async def test_coalesced_errors_shared() -> None:
+    """
+    Test that a failed shared request raises in every caller and is not reused afterwards.
+    """
+    server = MockIemapServer(n_projects=5, latency=0.02, error_rate=1.0)
+    async with IemapMI(client=httpx.AsyncClient(transport=server.transport()),
+                       retry_policy=RetryPolicy(max_attempts=1)) as client:
+        results = await asyncio.gather(*(client.stat_handler.get_stats() for _ in range(5)), return_exceptions=True)
+        assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+        assert client.request_layer.coalescer.in_flight == 0
+        server.error_rate = 0.0
+        assert (await client.stat_handler.get_stats()).data.totalProj == 5
+
+    assert server.requests[STATS] == 2
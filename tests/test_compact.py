@@ -0,0 +1,46 @@
+import httpx
+import pytest
+from iemap_mi.compact import CompactProject
+from iemap_mi.element_index import ElementIndex
+from iemap_mi.models import FlattenedProjectBase
+from iemap_mi.project_handler import ProjectHandler
+from tests.conftest import make_project
+
+
+def _project_with_structure(index: int) -> dict:
+    project = make_project(index)
+    project["material"]["input"] = {
+        "lattice": {"a": "4.2", "b": "4.2", "c": "6.00", "alpha": "90", "beta": "90.0", "gamma": "120.0"},
+        "sites": [[0.0, 0.0, 0.0], [0.5, 0.5, 0.25]],
+        "species": ["Li", "O"],
+        "cell": [[4.2, 0.0, 0.0], [0.0, 4.2, 0.0], [0.0, 0.0, 6.0]],
+    }
+    return project
+
+
+def test_compact_round_trip() -> None:
+    """
+    Test that compact records convert back to the same pydantic model and share interned strings.
+    """
+    raw = [_project_with_structure(i) for i in range(2)]
+    records = [CompactProject.model_validate(project) for project in raw]
+
+    assert records[0].to_model() == FlattenedProjectBase.model_validate(raw[0])
+    assert not hasattr(records[0], "__dict__")
+    assert records[0].affiliation is records[1].affiliation
+    assert records[0].input.lattice[0] == 4.2
+    assert records[0].input.cell_array()[2][2] == 6.0
+    # records also work wherever raw dictionaries are accepted
+    assert ElementIndex(records).count(all_of=["Li", "O"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_iter_projects_compact_model(catalog: list[dict], list_handler) -> None:
+    """
+    Test that CompactProject can be used as the iter_projects model.
+    """
+    async with httpx.AsyncClient(transport=httpx.MockTransport(list_handler)) as client:
+        handler = ProjectHandler(client=client)
+        records = [record async for record in handler.iter_projects(page_size=10, model=CompactProject)]
+    assert all(isinstance(record, CompactProject) for record in records)
+    assert [record.iemap_id for record in records] == [p["iemap_id"] for p in catalog]
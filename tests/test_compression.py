@@ -0,0 +1,63 @@
+import httpx
+import pytest
+from iemap_mi import compression
+from iemap_mi.compression import compress_bytes, decompress_bytes, available_encodings, accept_encoding
+from iemap_mi.iemap_mi import IemapMI
+from iemap_mi.mock_server import MockIemapServer
+
+
+@pytest.mark.parametrize("encoding", available_encodings())
+def test_compress_round_trip(encoding: str) -> None:
+    """
+    Test that every available coding decompresses to the original body.
+    """
+    body = b'{"formula": "LiFePO4"}' * 1000
+    compressed = compress_bytes(body, encoding)
+    assert len(compressed) < len(body) // 10
+    assert decompress_bytes(compressed, encoding) == body
+
+
+def test_accept_encoding_offers_decodable_codings(monkeypatch) -> None:
+    """
+    Test that codings httpx cannot decode are not advertised, even if they can be compressed.
+    """
+    monkeypatch.setattr(compression, "ZSTANDARD_AVAILABLE", True)
+    monkeypatch.setattr(compression, "HTTPX_DECODES_ZSTD", False)
+    assert "zstd" in available_encodings()
+    assert "zstd" not in accept_encoding()
+    monkeypatch.setattr(compression, "HTTPX_DECODES_ZSTD", True)
+    assert accept_encoding().startswith("zstd")
+
+
+def test_version_tuple() -> None:
+    """
+    Test that pre-release and local suffixes do not break the httpx version check.
+    """
+    assert compression._version_tuple("0.27.1") == (0, 27, 1)
+    assert compression._version_tuple("0.28.0rc1") == (0, 28, 0)
+    assert compression._version_tuple("1.0.dev3") == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_compressed_uploads_and_responses(tmp_path) -> None:
+    """
+    Test that text uploads are sent compressed and responses are negotiated and decoded.
+    """
+    server = MockIemapServer(n_projects=200, sites=8)
+    path = tmp_path / "measure.csv"
+    path.write_bytes(b"time,voltage\n" + b"".join(f"{i},{i % 7}.25\n".encode() for i in range(20000)))
+    size = path.stat().st_size
+
+    async with IemapMI(client=httpx.AsyncClient(transport=server.transport()), compression="gzip") as client:
+        await client.authenticate("user", "password")
+        result = await client.project_handler.upload_file_to_project("p1", str(path))
+        docs = await client.project_handler.query_projects(limit=200)
+
+    assert result.bytes_sent == size
+    assert int(result.response["file_size"]) > size
+    assert server.uploaded_bytes < size // 4
+    summary = client.metrics.summary()
+    assert summary["POST /rest/api/v1/project/add/file/"]["bytes_sent"] == server.uploaded_bytes
+    # gzip-encoded JSON is decoded transparently and counted compressed
+    assert len(docs) == 200
+    assert summary["GET /rest/api/v1/project/query/"]["bytes_received"] < len(str(server.projects)) // 3
@@ -0,0 +1,33 @@
+from iemap_mi.element_index import ElementIndex
+from iemap_mi.models import FlattenedProjectBase
+from tests.conftest import make_project
+
+
+def _project(index: int, formula: str, elements: list[str]) -> dict:
+    project = make_project(index)
+    project["material"] = {"formula": formula, "elements": elements}
+    return project
+
+
+def test_composition_queries() -> None:
+    """
+    Test all/any/none-of, element-count and formula-prefix queries.
+    """
+    projects = [
+        _project(0, "LiFePO4", ["Li", "Fe", "P", "O"]),
+        _project(1, "LiCoO2", ["Li", "Co", "O"]),
+        _project(2, "NaFePO4", ["Na", "Fe", "P", "O"]),
+        _project(3, "Li2O", ["Li", "O"]),
+    ]
+    index = ElementIndex(projects[:3])
+    index.add(FlattenedProjectBase.model_validate(projects[3]))
+
+    assert index.positions(all_of=["Li", "O"]) == [0, 1, 3]
+    assert index.positions(all_of=["Li", "O"], none_of=["Co"]) == [0, 3]
+    assert index.positions(any_of=["Na", "Co"]) == [1, 2]
+    assert index.positions(min_elements=3, max_elements=3) == [1]
+    assert index.positions(formula_prefix="Li") == [0, 1, 3]
+    assert index.positions(formula_prefix="LiF", all_of=["P"]) == [0]
+    assert index.count(all_of=["Xe"]) == 0
+    assert index.search(any_of=["Na"])[0]["iemap_id"] == "iemap-00002"
+    assert index.element_counts()["O"] == 4
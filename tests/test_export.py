@@ -0,0 +1,50 @@
+import math
+import pytest
+from iemap_mi.export import ColumnarExporter
+from iemap_mi.models import FlattenedProjectBase
+from tests.conftest import make_project
+
+
+def _with_structure(project: dict) -> dict:
+    project["material"]["input"] = {
+        "lattice": {"a": "4.0", "b": "4.0", "c": "4.0", "alpha": "90", "beta": "90", "gamma": "90"},
+        "sites": [[0.0, 0.0, 0.0], [0.5, 0.5, 0.5]],
+        "species": ["Li", "F"],
+        "cell": [[4.0, 0.0, 0.0], [0.0, 4.0, 0.0], [0.0, 0.0, 4.0]],
+    }
+    return project
+
+
+def test_columns_from_raw_and_models() -> None:
+    """
+    Test that raw dictionaries and validated models fill the same typed columns.
+    """
+    raw = [_with_structure(make_project(0)), make_project(1)]
+    exporter = ColumnarExporter()
+    exporter.extend(raw)
+    exporter.append(FlattenedProjectBase.model_validate(make_project(2)))
+
+    columns = exporter.to_columns()
+    projects = columns["projects"]
+    assert projects["iemap_id"] == ["iemap-00000", "iemap-00001", "iemap-00002"]
+    assert projects["material_elements"][2] == ["Li", "Fe", "P", "O"]
+    assert projects["input_lattice_a"][0] == 4.0
+    assert math.isnan(projects["input_lattice_a"][1])
+    assert projects["input_cell"][0][2] == [0.0, 0.0, 4.0]
+    assert columns["parameters"]["project_row"] == [0, 1, 2]
+    assert columns["parameters"]["value_numeric"] == [20.0, 20.0, 20.0]
+    assert columns["properties"]["value"] == ["1.0", "1.0", "1.0"]
+
+
+def test_arrow_export() -> None:
+    """
+    Test typed Arrow output.
+    """
+    pa = pytest.importorskip("pyarrow")
+    exporter = ColumnarExporter()
+    exporter.extend([_with_structure(make_project(0)), make_project(1)])
+    tables = exporter.to_arrow()
+    assert tables["projects"].num_rows == 2
+    assert tables["projects"].schema.field("input_lattice_alpha").type == pa.float64()
+    assert tables["projects"].schema.field("provenance_created_at").type == pa.timestamp("us")
+    assert tables["parameters"].column("name").to_pylist() == ["time", "time"]
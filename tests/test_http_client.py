@@ -0,0 +1,39 @@
+import httpx
+import pytest
+from iemap_mi.iemap_mi import IemapMI
+from iemap_mi.settings import settings
+from tests.conftest import make_stats_payload
+
+
+@pytest.mark.asyncio
+async def test_handlers_share_client() -> None:
+    """
+    Test that all handlers use the single client owned by IemapMI.
+    """
+    async with IemapMI() as client:
+        assert client.project_handler.client is client.client
+        assert client.stat_handler.client is client.client
+        assert client.ai_handler.client is client.client
+    assert client.client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_authenticate_updates_handlers() -> None:
+    """
+    Test that authentication goes through the shared client and propagates the token.
+    """
+    def handler(request: httpx.Request) -> httpx.Response:
+        if str(request.url) == settings.AUTH_JWT_LOGIN:
+            return httpx.Response(200, json={"access_token": "jwt"})
+        assert request.headers["Authorization"] == "Bearer jwt"
+        return httpx.Response(200, json=make_stats_payload())
+
+    external = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    async with IemapMI(client=external) as client:
+        await client.authenticate(username="user", password="secret")
+        stats = await client.stat_handler.get_stats()
+        assert client.project_handler.token == "jwt"
+        assert stats.data.totalProj == 1
+    # externally provided clients are left open
+    assert not external.is_closed
+    await external.aclose()
@@ -0,0 +1,58 @@
+import httpx
+import pytest
+from iemap_mi.cache import ResponseCache
+from iemap_mi.iemap_mi import IemapMI
+from iemap_mi.metrics import Histogram
+from iemap_mi.request_layer import RetryPolicy
+
+
+def test_histogram_quantiles() -> None:
+    """
+    Test bucket counts and interpolated quantiles.
+    """
+    histogram = Histogram([0.1, 0.5, 1.0])
+    for value in [0.05] * 50 + [0.3] * 40 + [0.8] * 9 + [5.0]:
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100
+    assert snapshot["buckets"][0.5] == 90
+    assert snapshot["buckets"][float("inf")] == 100
+    assert snapshot["p50"] == pytest.approx(0.1)
+    assert snapshot["p99"] == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_request_events_and_histograms() -> None:
+    """
+    Test that calls are recorded with retries and cache hits, and exposed through IemapMI.
+    """
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json=[])
+
+    events = []
+    cache = ResponseCache(":memory:")
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        client = IemapMI(client=http_client, cache=cache,
+                         retry_policy=RetryPolicy(max_attempts=2, backoff_base=0.0))
+        client.metrics.add_hook(events.append)
+        client.metrics.add_hook(lambda event: 1 / 0)  # failing hooks must not break requests
+        await client.project_handler.query_projects(limit=5)
+        await client.project_handler.query_projects(limit=5)
+    cache.close()
+
+    assert [(e.status, e.attempts, e.cache_hit) for e in events] == [(200, 2, False), (200, 1, True)]
+    assert events[0].endpoint == "/rest/api/v1/project/query/"
+    assert events[0].endpoint_class == "query"
+
+    key = "GET /rest/api/v1/project/query/"
+    assert client.histograms()[key]["duration"]["count"] == 2
+    assert client.metrics.summary()[key]["retries"] == 1
+    exposition = client.metrics.to_prometheus()
+    assert f'iemap_mi_requests_total{{method="GET",endpoint="/rest/api/v1/project/query/",status="200"}} 2' \
+           in exposition
+    assert 'iemap_mi_cache_hits_total{method="GET",endpoint="/rest/api/v1/project/query/"} 1' in exposition
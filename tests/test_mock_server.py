@@ -0,0 +1,49 @@
+import httpx
+import pytest
+from iemap_mi.benchmark import run_scenario, build_parser, SCENARIOS
+from iemap_mi.iemap_mi import IemapMI
+from iemap_mi.mock_server import MockIemapServer
+from iemap_mi.models import IEMAPProject, Project, Material, Process, Agent, Parameter, Property
+
+
+@pytest.mark.asyncio
+async def test_mock_server_endpoints() -> None:
+    """
+    Test the client end to end against the mock server.
+    """
+    server = MockIemapServer(n_projects=25, sites=2)
+    project = IEMAPProject(
+        project=Project(name="Materials for Batteries", label="MB", description="IEMAP project"),
+        material=Material(formula="LiFePO4"),
+        process=Process(method="DFT", agent=Agent(name="VASP", version="6"), isExperiment=False),
+        parameters=[Parameter(name="time", value=20, unit="s")],
+        properties=[Property(name="energy", value="1.0", unit="eV")],
+    )
+    async with IemapMI(client=httpx.AsyncClient(transport=server.transport())) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.project_handler.create_project(project)
+        await client.authenticate("user", "password")
+        created = await client.project_handler.create_project(project)
+        projects = await client.project_handler.fetch_all_projects(page_size=10)
+        experiments = await client.project_handler.query_projects(isExperiment=True)
+        stats = await client.stat_handler.get_stats()
+
+    assert created.inserted_id
+    assert [p["iemap_id"] for p in projects] == [p["iemap_id"] for p in server.projects]
+    assert experiments and all(doc.process.isExperiment for doc in experiments)
+    assert stats.data.totalProj == 25
+    assert server.requests["/rest/api/v1/project/list/"] == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("scenario", SCENARIOS)
+async def test_benchmark_scenarios(scenario: str) -> None:
+    """
+    Test that every benchmark scenario runs and reports its numbers.
+    """
+    options = build_parser().parse_args(["--projects", "30", "--page-size", "10", "--files", "3",
+                                         "--file-size", "1024", "--latency", "0", "--jitter", "0"])
+    result = await run_scenario(scenario, options)
+    assert result["items"] == (30 if scenario in ("paging", "querying") else 3)
+    assert result["requests"] > 0
+    assert result["p99_ms"] >= result["p50_ms"] >= 0
@@ -0,0 +1,233 @@
+import asyncio
+import hashlib
+import json
+import httpx
+import pytest
+from iemap_mi.models import FlattenedProjectBase
+from iemap_mi import utils
+from iemap_mi.project_handler import ProjectHandler
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_projects_preserves_order(catalog: list[dict], list_handler) -> None:
+    """
+    Test that concurrently fetched pages are returned in catalog order.
+    """
+    progress = []
+    async with httpx.AsyncClient(transport=httpx.MockTransport(list_handler)) as client:
+        handler = ProjectHandler(client=client)
+        projects = await handler.fetch_all_projects(page_size=5, concurrency=3,
+                                                    progress=lambda done, total: progress.append((done, total)))
+    assert [p["iemap_id"] for p in projects] == [p["iemap_id"] for p in catalog]
+    assert len(progress) == 5
+    assert progress[-1] == (len(catalog), len(catalog))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("prefetch", [0, 2])
+async def test_iter_projects_streams_validated_records(catalog: list[dict], list_handler, prefetch: int) -> None:
+    """
+    Test that iter_projects yields validated projects in order with bounded read-ahead.
+    """
+    requested = []
+
+    def counting_handler(request: httpx.Request) -> httpx.Response:
+        requested.append(int(request.url.params["page_number"]))
+        return list_handler(request)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(counting_handler)) as client:
+        handler = ProjectHandler(client=client)
+        iterator = handler.iter_projects(page_size=5, prefetch=prefetch)
+        first = await iterator.__anext__()
+        assert isinstance(first, FlattenedProjectBase)
+        # only the first page and the read-ahead window have been requested
+        assert len(requested) <= 1 + prefetch
+        rest = [project async for project in iterator]
+    assert [p.iemap_id for p in [first, *rest]] == [p["iemap_id"] for p in catalog]
+
+
+@pytest.mark.asyncio
+async def test_iter_projects_close_cancels_prefetch(list_handler) -> None:
+    """
+    Test that closing the iterator early waits for the read-ahead requests to be cancelled.
+    """
+    in_flight = []
+    prefetching = asyncio.Event()
+
+    async def slow_handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params["page_number"] != "1":
+            in_flight.append(request)
+            if len(in_flight) == 2:
+                prefetching.set()
+            try:
+                await asyncio.sleep(60)
+            finally:
+                in_flight.remove(request)
+        return list_handler(request)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(slow_handler)) as client:
+        iterator = ProjectHandler(client=client).iter_projects(page_size=5, prefetch=2)
+        await iterator.__anext__()
+        await asyncio.wait_for(prefetching.wait(), timeout=5)
+        await iterator.aclose()
+        assert in_flight == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [1, 3])
+async def test_iter_query_advances_skip(query_catalog: list[dict], query_handler, concurrency: int) -> None:
+    """
+    Test that iter_query walks all windows in order and stops on an empty page.
+    """
+    limits = []
+
+    def recording_handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["material_any_element"] == "Li"
+        limits.append(int(request.url.params["limit"]))
+        return query_handler(request)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(recording_handler)) as client:
+        handler = ProjectHandler(client=client)
+        docs = [doc async for doc in handler.iter_query(window=5, min_window=5, max_window=20,
+                                                         concurrency=concurrency, material_any_element="Li")]
+    assert [d.iemap_id for d in docs] == [d["iemap_id"] for d in query_catalog]
+    # fast responses grow the window up to max_window
+    assert max(limits) == 20
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [1, 3])
+async def test_iter_query_server_capped_limit(query_catalog: list[dict], query_handler, concurrency: int) -> None:
+    """
+    Test that a server returning fewer results than the requested limit does not end the iteration.
+    """
+    def capped_handler(request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        params["limit"] = str(min(int(params["limit"]), 7))
+        return query_handler(httpx.Request("GET", request.url.copy_with(params=params)))
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(capped_handler)) as client:
+        docs = [doc async for doc in ProjectHandler(client=client).iter_query(window=20, concurrency=concurrency)]
+    assert [d.iemap_id for d in docs] == [d["iemap_id"] for d in query_catalog]
+
+
+@pytest.mark.asyncio
+async def test_iter_query_ignores_consumer_time(query_handler) -> None:
+    """
+    Test that a slow consumer does not shrink the window of fast responses.
+    """
+    limits = []
+
+    def recording_handler(request: httpx.Request) -> httpx.Response:
+        limits.append(int(request.url.params["limit"]))
+        return query_handler(request)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(recording_handler)) as client:
+        async for _ in ProjectHandler(client=client).iter_query(window=10, min_window=5, max_window=20,
+                                                                 target_latency=0.02):
+            await asyncio.sleep(0.01)
+    assert limits[:2] == [10, 20]
+
+
+@pytest.mark.asyncio
+async def test_upload_file_streams_and_hashes(tmp_path) -> None:
+    """
+    Test that uploads are streamed in chunks and hashed during the upload pass.
+    """
+    content = b"0123456789" * 1000
+    path = tmp_path / "spectrum.dat"
+    path.write_bytes(content)
+    received = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        received.append(await request.aread())
+        return httpx.Response(200, json={"file_hash": "h", "file_name": "spectrum.dat",
+                                         "file_size": str(len(content)), "uploaded": True})
+
+    progress = []
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        handler_ = ProjectHandler(token="jwt", client=client)
+        result = await handler_.upload_file_to_project("p1", str(path), file_name="spectrum.dat", chunk_size=4096,
+                                                       progress=lambda sent, total: progress.append((sent, total)))
+    assert result.content_hash == hashlib.sha256(content).hexdigest()
+    assert result.bytes_sent == len(content)
+    assert result.response["uploaded"] is True
+    assert content in received[0]
+    assert progress == [(min(i * 4096, len(content)), len(content)) for i in range(1, 4)]
+
+
+@pytest.mark.asyncio
+async def test_add_files_to_project_skips_attached(tmp_path) -> None:
+    """
+    Test that bulk uploads validate extensions first and skip files already attached.
+    """
+    existing = tmp_path / "existing.csv"
+    existing.write_bytes(b"a,b\n1,2\n")
+    new = tmp_path / "new.csv"
+    new.write_bytes(b"a,b\n3,4\n")
+    duplicate = tmp_path / "copy_of_new.csv"
+    duplicate.write_bytes(b"a,b\n3,4\n")
+    uploaded = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        uploaded.append(request.url.params["file_name"])
+        return httpx.Response(200, json={"file_hash": "srv", "file_name": request.url.params["file_name"],
+                                         "file_size": "8", "uploaded": True})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        project_handler = ProjectHandler(token="jwt", client=client)
+        with pytest.raises(ValueError):
+            await project_handler.add_files_to_project("p1", [str(new), str(tmp_path / "foo.xdat")])
+        assert uploaded == []
+
+        reports = await project_handler.add_files_to_project(
+            "p1", [str(existing), str(new), str(duplicate)],
+            existing_hashes=[hashlib.sha256(existing.read_bytes()).hexdigest()])
+    assert [report.skipped for report in reports] == [True, False, True]
+    assert reports[1].file_info.uploaded is True
+    assert uploaded == ["new.csv"]
+
+
+def _project_record(name: str) -> dict:
+    return {
+        "project": {"name": name, "label": "MB", "description": "IEMAP"},
+        "material": {"formula": "C11H20N2F6S2O4"},
+        "process": {"method": "Karl-Fischer titration", "agent": {"name": "titrator", "version": None},
+                    "isExperiment": True},
+        "parameters": [{"name": "time", "value": 20, "unit": "s"}],
+        "properties": [{"name": "Moisture content", "value": "<2", "unit": "ppm"}],
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("processes", [None, 2])
+async def test_create_projects_reports_by_index(processes) -> None:
+    """
+    Test that bulk creation validates in batch, collects rejects and reports results by input index.
+    """
+    def handler(request: httpx.Request) -> httpx.Response:
+        name = json.loads(request.content)["project"]["name"]
+        if name == "fail":
+            return httpx.Response(400, json={"detail": "duplicated"})
+        return httpx.Response(200, json={"inserted_id": f"id-{name}"})
+
+    records = [_project_record("a"), {"project": {"name": "broken"}}, _project_record("fail"), _project_record("b")]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        report = await ProjectHandler(token="jwt", client=client).create_projects(
+            records, concurrency=2, processes=processes, chunk_size=2)
+    assert {index: response.inserted_id for index, response in report.created.items()} == {0: "id-a", 3: "id-b"}
+    assert list(report.rejected) == [1]
+    assert ["material"] in [error["loc"] for error in report.rejected[1].errors]
+    assert list(report.failed) == [2]
+
+
+@pytest.mark.asyncio
+async def test_query_projects_on_class_deprecated(query_handler, monkeypatch) -> None:
+    """
+    Test that the former static call of query_projects still works, with a DeprecationWarning.
+    """
+    monkeypatch.setattr(utils, "build_async_client",
+                        lambda: httpx.AsyncClient(transport=httpx.MockTransport(query_handler)))
+    with pytest.warns(DeprecationWarning, match="ProjectHandler.query_projects"):
+        docs = await ProjectHandler.query_projects(limit=3)
+    assert len(docs) == 3
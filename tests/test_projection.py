@@ -0,0 +1,39 @@
+import httpx
+import pytest
+from iemap_mi.iemap_mi import IemapMI
+from iemap_mi.mock_server import MockIemapServer
+from iemap_mi.projection import Projection, LIST_VIEW
+
+
+def test_projection_model() -> None:
+    """
+    Test that a projection validates its paths and builds typed nested partial models.
+    """
+    projection = Projection("iemap_id", "material.formula", "parameters.name", "material.elements")
+    assert projection.params() == {"fields_output": "iemap_id,material.formula,parameters.name,material.elements"}
+    doc = projection.model.model_validate({"iemap_id": "x", "material": {"formula": "LiF", "elements": ["Li", "F"],
+                                                                          "input": {"sites": []}},
+                                           "parameters": [{"name": "temperature"}]})
+    assert doc.material.elements == ["Li", "F"] and doc.parameters[0].name == "temperature"
+    assert not hasattr(doc.material, "input")
+    assert Projection("material.formula", "material").model is Projection("material.formula", "material").model
+    with pytest.raises(ValueError):
+        Projection("material.formula.value")
+
+
+@pytest.mark.asyncio
+async def test_query_with_projection() -> None:
+    """
+    Test that a projected query transfers a fraction of the bytes and returns partial models.
+    """
+    server = MockIemapServer(n_projects=50, sites=16)
+    async with IemapMI(client=httpx.AsyncClient(transport=server.transport())) as client:
+        full = await client.project_handler.query_projects(limit=50)
+        received_full = client.metrics.summary()["GET /rest/api/v1/project/query/"]["bytes_received"]
+        client.metrics.reset()
+        listed = await client.project_handler.query_projects(limit=50, projection=LIST_VIEW)
+        received_listed = client.metrics.summary()["GET /rest/api/v1/project/query/"]["bytes_received"]
+
+    assert [doc.material.formula for doc in listed] == [doc.material.formula for doc in full]
+    assert isinstance(listed[0], LIST_VIEW.model)
+    assert received_listed < received_full // 3
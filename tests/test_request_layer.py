@@ -0,0 +1,123 @@
+import asyncio
+import time
+import httpx
+import pytest
+from iemap_mi.rate_limiter import RateLimiter, TokenBucket, EndpointClass
+from iemap_mi.request_layer import RequestLayer, RetryPolicy, CircuitBreaker, CircuitOpenError, parse_retry_after
+
+
+def _layer(handler, **kwargs) -> RequestLayer:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return RequestLayer(client, retry_policy=RetryPolicy(backoff_base=0.0), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_idempotent_request_is_retried() -> None:
+    """
+    Test that transient 503 responses and connection errors are retried for GET requests.
+    """
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ReadError("connection reset")
+        if len(calls) == 2:
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"ok": True})
+
+    response = await _layer(handler).get("https://iemap.test/list")
+    assert response.json() == {"ok": True}
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_request_is_not_retried() -> None:
+    """
+    Test that a POST reaching the server is not repeated, unless it was rejected with 429.
+    """
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(503 if len(calls) == 1 else 200)
+
+    response = await _layer(handler).post("https://iemap.test/add", json={})
+    assert response.status_code == 503
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast() -> None:
+    """
+    Test that the circuit opens after consecutive failures and refuses further requests.
+    """
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(502)
+
+    layer = _layer(handler, circuit_breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60.0))
+    with pytest.raises(CircuitOpenError):
+        await layer.get("https://iemap.test/list")
+    assert len(calls) == 3
+    assert layer.circuit_breaker.state == "open"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_request_releases_circuit() -> None:
+    """
+    Test that cancelling the trial request of a half-open circuit lets the next request through.
+    """
+    started = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/slow":
+            started.set()
+            await asyncio.sleep(60)
+        return httpx.Response(200)
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    layer = _layer(handler, circuit_breaker=breaker)
+    assert breaker.state == "half-open"
+    trial = asyncio.ensure_future(layer.get("https://iemap.test/slow"))
+    await started.wait()
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+    assert (await layer.get("https://iemap.test/list")).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_parse_retry_after() -> None:
+    """
+    Test parsing of delay-seconds and invalid Retry-After values.
+    """
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_requests() -> None:
+    """
+    Test that a token bucket delays requests beyond the burst size and records wait metrics.
+    """
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200)
+
+    limiter = RateLimiter({EndpointClass.QUERY: TokenBucket(rate=50, capacity=2)})
+    layer = _layer(handler, rate_limiter=limiter)
+    started = time.perf_counter()
+    await asyncio.gather(*(layer.get("https://iemap.test/query", endpoint_class=EndpointClass.QUERY)
+                           for _ in range(5)))
+    # 2 burst tokens, then 3 requests spaced by 1/50 s
+    assert time.perf_counter() - started >= 0.05
+    metrics = limiter.metrics()["query"]
+    assert metrics == limiter.buckets[EndpointClass.QUERY].metrics() | {"current_wait": metrics["current_wait"]}
+    assert metrics["acquired"] == 5
+    assert metrics["waited"] == 3
+    # unlimited classes never wait
+    assert await limiter.acquire(EndpointClass.LIST) == 0.0
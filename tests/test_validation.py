@@ -0,0 +1,69 @@
+import json
+import httpx
+import pytest
+from iemap_mi.models import ProjectQueryModel, MaterialModel
+from iemap_mi.project_handler import ProjectHandler
+from iemap_mi.validation import list_adapter, validate_list
+
+
+def test_validate_list_json_and_trusted(query_catalog: list[dict]) -> None:
+    """
+    Test that JSON bytes, decoded lists and trusted construction give the same records.
+    """
+    body = json.dumps(query_catalog).encode()
+    validated = validate_list(ProjectQueryModel, body)
+    trusted = validate_list(ProjectQueryModel, body, trusted=True)
+
+    assert list_adapter(ProjectQueryModel) is list_adapter(ProjectQueryModel)
+    assert validated == validate_list(ProjectQueryModel, query_catalog)
+    # nested models are constructed too, not left as dictionaries
+    assert isinstance(trusted[0].material, MaterialModel)
+    assert trusted[0].material.formula == validated[0].material.formula
+    assert trusted[0].parameters[0].name == "time"
+    # datetime fields are parsed, as they are by validation
+    assert trusted[0].provenance.updatedAt == validated[0].provenance.updatedAt
+
+
+@pytest.mark.asyncio
+async def test_query_projects_trusted(query_catalog: list[dict], query_handler) -> None:
+    """
+    Test that query_projects returns the same results in validated and trusted mode.
+    """
+    async with httpx.AsyncClient(transport=httpx.MockTransport(query_handler)) as client:
+        handler = ProjectHandler(client=client)
+        validated = await handler.query_projects(limit=5)
+        trusted = await handler.query_projects(limit=5, trusted=True)
+    assert [r.iemap_id for r in trusted] == [r.iemap_id for r in validated]
+    assert trusted[0].provenance.affiliation == "ENEA"
+
+
+@pytest.mark.asyncio
+async def test_query_projects_keeps_valid_records(query_catalog: list[dict]) -> None:
+    """
+    Test that one malformed result is reported instead of discarding the whole page.
+    """
+    query_catalog[3].pop("material")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        skip = int(request.url.params["skip"])
+        return httpx.Response(200, json=query_catalog[skip:skip + int(request.url.params["limit"])])
+
+    rejected = []
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        results = await ProjectHandler(client=client).query_projects(limit=10, skip=0, on_reject=rejected.append)
+    assert len(results) == 9
+    assert "iemap-00003" not in [r.iemap_id for r in results]
+    assert [r.index for r in rejected] == [3]
+    assert rejected[0].payload["iemap_id"] == "iemap-00003"
+    assert rejected[0].errors[0]["loc"] == ["material"]
+
+
+def test_build_project_payload_reports_errors() -> None:
+    """
+    Test that build_project_payload returns {} and reports the error locations.
+    """
+    rejected = []
+    payload = ProjectHandler.build_project_payload({"project": {"name": "MB", "label": "MB"}},
+                                                   on_reject=rejected.append)
+    assert payload == {}
+    assert ["material"] in [error["loc"] for error in rejected[0].errors]